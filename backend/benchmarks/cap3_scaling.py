@@ -0,0 +1,65 @@
+"""
+Benchmark de escalamiento de la ingesta y los splines del capítulo 3.
+
+Mide la validación vectorizada (methods.cap3.inputs.prepare_points) y los
+splines lineal y cúbico (sin fórmulas ni imagen) con 10^3 a 10^6 puntos, y
+estima la pendiente en escala log-log: un valor cercano a 1 indica un costo
+casi lineal.
+
+Uso (desde backend/):
+    python benchmarks/cap3_scaling.py [--sizes 1000 10000 100000 1000000] [--repeat 3]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from methods.cap3.inputs import prepare_points
+from methods.cap3.SplineLineal import spline_lineal_interpolation
+from methods.cap3.SplineCubico import spline_cubico_interpolation
+
+
+CASES = {
+    'prepare_points': lambda x, y: prepare_points(x, y, sort=True),
+    'spline_lineal': lambda x, y: spline_lineal_interpolation(x, y, formulas=False, plot=False),
+    'spline_cubico': lambda x, y: spline_cubico_interpolation(x, y, formulas=False, plot=False),
+}
+
+
+def best_time(function, x, y, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(x, y)
+        best = min(best, time.perf_counter() - start)
+        if isinstance(result, dict) and result.get('error'):
+            raise RuntimeError(result['error'])
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10**3, 10**4, 10**5, 10**6])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    print(f"{'caso':<16}" + "".join(f"{n:>12}" for n in args.sizes) + f"{'pendiente':>12}")
+    for name, function in CASES.items():
+        times = []
+        for n in args.sizes:
+            # Puntos desordenados: incluye el costo de ordenar
+            x = rng.permutation(np.linspace(0.0, 1.0, n))
+            y = np.sin(6 * x)
+            times.append(best_time(function, x, y, args.repeat))
+        slope = np.polyfit(np.log(args.sizes), np.log(times), 1)[0] if len(times) > 1 else float('nan')
+        print(f"{name:<16}" + "".join(f"{t * 1e3:>10.2f}ms" for t in times) + f"{slope:>12.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,382 @@
+"""
+Suite de benchmarks de todos los métodos numéricos y de las rutas de la API.
+
+Cada caso se ejecuta para varios tamaños de problema (max_count en los
+métodos escalares del capítulo 1, número de carriles en los lotes, n de la
+matriz en el capítulo 2 y número de nodos en el capítulo 3) y registra el
+tiempo de reloj (mejor y mediana de --repeat corridas), la memoria pico
+(tracemalloc, en una corrida aparte para no afectar el tiempo) y las
+iteraciones realizadas. Las rutas se llaman con el cliente de pruebas de
+Flask, así que incluyen la lectura del cuerpo y la serialización.
+
+Los resultados se guardan en JSON junto con el commit actual, para comparar
+corridas entre commits con --compare.
+
+Uso (desde backend/):
+    python benchmarks/suite.py [--filter cap2] [--quick] [--repeat 3]
+                               [--output resultados.json] [--compare base.json]
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+BACKEND = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, BACKEND)
+
+from methods.cap1.Biseccion import bisection_method
+from methods.cap1.Newton import newton_method
+from methods.cap1.PuntoFijo import fixed_point_method
+from methods.cap1.RaicesMultiples import multiple_roots_method
+from methods.cap1.ReglaFalsa import false_position_method
+from methods.cap1.Secante import secant_method
+from methods.cap1.Batch import (bisection_batch, newton_batch, fixed_point_batch,
+                                multiple_roots_batch, false_position_batch, secant_batch)
+from methods.cap2.GaussSeidel import gaussSeidel_method
+from methods.cap2.Jacobi import jacobi_method
+from methods.cap2.Sor import sor_method
+from methods.cap3.Lagrange import lagrange_interpolation
+from methods.cap3.NewtonInterpolante import newton_interpolation
+from methods.cap3.SplineCubico import spline_cubico_interpolation
+from methods.cap3.SplineLineal import spline_lineal_interpolation
+from methods.cap3.Vandermonde import vandermonde_interpolation
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+# Problemas de prueba del capítulo 1 (raíz simple en [1, 2] y raíz doble en x = 1)
+F = 'x**3 - x - 2'
+DF = '3*x**2 - 1'
+# Punto fijo con convergencia lineal lenta (razón ~0.996): llega a max_count
+G = 'x - 0.001*(x**3 - x - 2)'
+F_MULTIPLE = '(x - 1)**2*(x + 2)'
+DF_MULTIPLE = '3*x**2 - 3'
+D2F_MULTIPLE = '6*x'
+
+# Columnas de b en los casos con varios lados derechos
+RHS_COLUMNS = 64
+
+# Tamaños por familia: completos y reducidos (--quick)
+SIZES = {
+    'max_count': ([100, 1000, 10000], [100, 1000]),
+    'lanes': ([100, 10000, 100000], [100, 10000]),
+    'n': ([50, 200, 800], [50, 200]),
+    'nodes': ([10, 100, 1000], [10, 100]),
+    'points': ([1000, 100000, 1000000], [1000, 100000]),
+}
+
+
+class Case:
+    """Un benchmark: `build(size, rng)` devuelve la función sin argumentos que se mide."""
+
+    def __init__(self, name, param, build):
+        self.name = name
+        self.param = param
+        self.build = build
+
+
+def iterations(result):
+    """Iteraciones realizadas según la forma del resultado (método, lote o respuesta JSON)."""
+    if not isinstance(result, dict):
+        return None
+    result = result.get('result', result)
+    history = result.get('iterations')
+    if hasattr(history, 'total'):
+        return max(history.total - 1, 0)
+    if isinstance(result.get('history'), dict):
+        return max(result['history']['total'] - 1, 0)
+    if isinstance(history, list) and history and isinstance(history[0], (int, float)):
+        # Lotes: iteraciones por carril
+        return int(max(history))
+    return None
+
+
+def failure(result):
+    """Mensaje de error del resultado, si lo hay."""
+    if isinstance(result, tuple):
+        status, body = result
+        if status >= 400:
+            return f"HTTP {status}: {body.get('error') if isinstance(body, dict) else body}"
+        return failure(body)
+    if isinstance(result, dict):
+        inner = result.get('result', result)
+        return result.get('error') or (inner.get('error') if isinstance(inner, dict) else None)
+    return None
+
+
+# Datos de entrada
+
+def dominant_matrix(n, rng):
+    """Matriz densa diagonalmente dominante (Jacobi, Gauss-Seidel y SOR convergen)."""
+    A = rng.random((n, n))
+    A[np.diag_indices(n)] += n
+    return A, rng.random(n), np.zeros(n)
+
+
+def nodes(n, rng):
+    # Nodos de Chebyshev: Lagrange/Newton/Vandermonde siguen siendo estables con muchos nodos
+    x = np.cos(np.pi * (2 * np.arange(n) + 1) / (2 * n))
+    return x, np.sin(3 * x) + rng.normal(0, 1e-3, n)
+
+
+def spline_points(n, rng):
+    x = np.sort(rng.random(n))
+    x[1:] = np.maximum(x[1:], np.nextafter(x[:-1], 2))
+    return x, np.sin(6 * x)
+
+
+# Casos sobre las funciones de methods/
+
+def method_cases():
+    scalar = {
+        'bisection': lambda m: bisection_method(F, 1.0, 2.0, 0.0, m),
+        'false_position': lambda m: false_position_method(F, 1.0, 2.0, 0.0, m),
+        'newton': lambda m: newton_method(F, DF, 1.5, 0.0, m),
+        'secant': lambda m: secant_method(F, 1.0, 2.0, 0.0, m),
+        'fixed_point': lambda m: fixed_point_method(F, G, 1.5, 0.0, m),
+        'multiple_roots': lambda m: multiple_roots_method(F_MULTIPLE, DF_MULTIPLE, D2F_MULTIPLE, 0.5, 0.0, m),
+    }
+    for name, run in scalar.items():
+        yield Case(f'cap1.{name}', 'max_count', lambda m, rng, run=run: (lambda: run(m)))
+
+    batch = {
+        'bisection': lambda k, rng: (bisection_batch, (F, 1.0 - rng.random(k) * 0.5, 2.0 + rng.random(k))),
+        'false_position': lambda k, rng: (false_position_batch, (F, 1.0 - rng.random(k) * 0.5, 2.0 + rng.random(k))),
+        'newton': lambda k, rng: (newton_batch, (F, DF, 1.0 + rng.random(k))),
+        'secant': lambda k, rng: (secant_batch, (F, 1.0 + rng.random(k), 2.0 + rng.random(k))),
+        'fixed_point': lambda k, rng: (fixed_point_batch, (F, G, 1.0 + rng.random(k))),
+        'multiple_roots': lambda k, rng: (multiple_roots_batch,
+                                          (F_MULTIPLE, DF_MULTIPLE, D2F_MULTIPLE, 0.5 + rng.random(k))),
+    }
+    for name, data in batch.items():
+        def build(k, rng, data=data):
+            function, args = data(k, rng)
+            return lambda: function(*args, 1e-10, 100)
+        yield Case(f'cap1.batch.{name}', 'lanes', build)
+
+    solvers = {
+        'jacobi': lambda A, b, x0: jacobi_method(A, b, x0, 1e-10, 500, 2),
+        'gauss_seidel': lambda A, b, x0: gaussSeidel_method(A, b, x0, 1e-10, 500, 2),
+        'sor': lambda A, b, x0: sor_method(A, b, x0, 1e-10, 500, 2, 1.1),
+    }
+    for name, solve in solvers.items():
+        def build(n, rng, solve=solve):
+            A, b, x0 = dominant_matrix(n, rng)
+            return lambda: solve(A, b, x0)
+        yield Case(f'cap2.{name}', 'n', build)
+
+        # Varios lados derechos en una sola llamada (b de n x RHS_COLUMNS)
+        def build_columns(n, rng, solve=solve):
+            A, _, _ = dominant_matrix(n, rng)
+            B = rng.random((n, RHS_COLUMNS))
+            return lambda: solve(A, B, np.zeros_like(B))
+        yield Case(f'cap2.{name}.rhs{RHS_COLUMNS}', 'n', build_columns)
+
+    interpolations = {
+        'lagrange': (lambda x, y: lagrange_interpolation(x, y, plot=False), nodes, 'nodes'),
+        'newton_interpolation': (lambda x, y: newton_interpolation(x, y, plot=False, register=False), nodes, 'nodes'),
+        'vandermonde': (lambda x, y: vandermonde_interpolation(x, y, plot=False), nodes, 'nodes'),
+        'spline_lineal': (lambda x, y: spline_lineal_interpolation(x, y, formulas=False, plot=False),
+                          spline_points, 'points'),
+        'spline_cubico': (lambda x, y: spline_cubico_interpolation(x, y, formulas=False, plot=False),
+                          spline_points, 'points'),
+    }
+    for name, (interpolate, points, param) in interpolations.items():
+        def build(n, rng, interpolate=interpolate, points=points):
+            x, y = points(n, rng)
+            return lambda: interpolate(x, y)
+        yield Case(f'cap3.{name}', param, build)
+
+
+# Casos sobre las rutas (cliente de pruebas de Flask)
+
+def route_cases(client):
+    def post(path, payload):
+        def run():
+            response = client.post(path, json=payload)
+            return response.status_code, response.get_json()
+        return run
+
+    scalar = {
+        'bisection': {'function_text': F, 'a': 1.0, 'b': 2.0},
+        'ReglaFalsa': {'function_text': F, 'a': 1.0, 'b': 2.0},
+        'newton': {'function_text': F, 'first_derivate_text': DF, 'x0': 1.5},
+        'secante': {'function_text': F, 'x0': 1.0, 'x1': 2.0},
+        # Con G la ruta no converge antes de max_count y respondería 400; con
+        # Steffensen converge en pocas iteraciones con una tolerancia alcanzable
+        'puntoFijo': {'function_text': F, 'g_function_text': G, 'x0': 1.5, 'acceleration': 'steffensen',
+                      'tol': 1e-12},
+        'raicesMultiples': {'function_text': F_MULTIPLE, 'first_derivate_text': DF_MULTIPLE,
+                            'second_derivate_text': D2F_MULTIPLE, 'x0': 0.5},
+    }
+    for route, fields in scalar.items():
+        yield Case(f'route./calculate/{route}', 'max_count',
+                   lambda m, rng, route=route, fields=fields: post(f'/calculate/{route}',
+                                                                   dict({'tol': 1e-300}, **fields, max_count=m)))
+
+    yield Case('route./calculate/newton/batch', 'lanes',
+               lambda k, rng: post('/calculate/newton/batch', {'function_text': F, 'first_derivate_text': DF,
+                                                               'x0': (1.0 + rng.random(k)).tolist(),
+                                                               'tol': 1e-10, 'max_count': 100}))
+
+    for route, extra in (('jacobi', {}), ('gaussSeidel', {}), ('sor', {'w': 1.1})):
+        def build(n, rng, route=route, extra=extra):
+            A, b, x0 = dominant_matrix(n, rng)
+            return post(f'/calculate/{route}', dict(extra, matrixA=A.tolist(), vectorB=b.tolist(),
+                                                    vectorX0=x0.tolist(), tol=1e-10, max_count=500, norm_type=2))
+        yield Case(f'route./calculate/{route}', 'n', build)
+
+    for route in ('lagrange', 'newton_interpolation', 'vandermonde'):
+        def build(n, rng, route=route):
+            x, y = nodes(n, rng)
+            return post(f'/calculate/{route}', {'x_values': x.tolist(), 'y_values': y.tolist(), 'plot': False})
+        yield Case(f'route./calculate/{route}', 'nodes', build)
+
+    for route in ('spline_lineal', 'spline_cubico'):
+        def build(n, rng, route=route):
+            x, y = spline_points(n, rng)
+            return post(f'/calculate/{route}', {'x_values': x.tolist(), 'y_values': y.tolist(),
+                                                'formulas': False, 'plot': False})
+        yield Case(f'route./calculate/{route}', 'points', build)
+
+    def evaluate(n, rng):
+        x, y = nodes(20, rng)
+        response = client.post('/calculate/lagrange', json={'x_values': x.tolist(), 'y_values': y.tolist(),
+                                                            'plot': False, 'register': True})
+        interpolant_id = response.get_json()['result']['id']
+        points = rng.uniform(-1, 1, n).astype('<f8').tobytes()
+
+        def run():
+            response = client.post(f'/evaluate/{interpolant_id}?derivatives=1', data=points,
+                                   content_type='application/octet-stream')
+            return response.status_code, None
+        return run
+    yield Case('route./evaluate/<id>', 'points', evaluate)
+
+    yield Case('route./plot', 'points',
+               lambda n, rng: post('/plot', {'function_text': 'sin(x)*x', 'x_min': -10, 'x_max': 10}))
+    yield Case('route./api/derivative', 'max_count',
+               lambda m, rng: post('/api/derivative', {'function_text': 'sin(x)**2*exp(x)/x', 'order': 2}))
+
+
+# Ejecución
+
+def measure(run, repeat):
+    """Tiempos de `repeat` corridas, memoria pico de una corrida adicional y el último resultado."""
+    result = run()  # precalentamiento: cachés, importaciones y procesos simbólicos
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = run()
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        run()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return times, peak, result
+
+
+def git_commit():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=BACKEND, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=BACKEND,
+                                    capture_output=True, text=True, check=True).stdout.strip())
+        return commit, dirty
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+
+
+def compare(results, baseline_path):
+    """Imprime la razón de tiempos (mejor) contra un archivo de resultados anterior."""
+    with open(baseline_path) as f:
+        baseline = {(r['name'], r['size']): r for r in json.load(f)['results']}
+    print(f"\n{'caso':<36}{'tamaño':>10}{'antes':>12}{'ahora':>12}{'razón':>9}")
+    for r in results:
+        old = baseline.get((r['name'], r['size']))
+        if old is None or not old.get('best_s') or not r.get('best_s'):
+            continue
+        ratio = r['best_s'] / old['best_s']
+        print(f"{r['name']:<36}{r['size']:>10}{old['best_s'] * 1e3:>10.2f}ms{r['best_s'] * 1e3:>10.2f}ms{ratio:>9.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--filter', default='', help="Solo los casos cuyo nombre contiene este texto")
+    parser.add_argument('--quick', action='store_true', help="Tamaños reducidos")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="Archivo JSON de salida (por defecto benchmarks/results/<commit>.json)")
+    parser.add_argument('--compare', help="Archivo JSON de una corrida anterior")
+    args = parser.parse_args()
+
+    from main import app
+    client = app.test_client()
+    cases = [case for case in list(method_cases()) + list(route_cases(client)) if args.filter in case.name]
+
+    results = []
+    print(f"{'caso':<36}{'tamaño':>10}{'mejor':>12}{'mediana':>12}{'pico':>10}{'iter':>8}")
+    for case in cases:
+        sizes = SIZES[case.param][1 if args.quick else 0]
+        if case.name in ('route./plot', 'route./api/derivative'):
+            sizes = sizes[:1]
+        for size in sizes:
+            rng = np.random.default_rng(args.seed)
+            record = {'name': case.name, 'param': case.param, 'size': size}
+            try:
+                times, peak, result = measure(case.build(size, rng), args.repeat)
+                record.update(best_s=min(times), median_s=statistics.median(times), times_s=times,
+                              peak_bytes=peak, iterations=iterations(result[1] if isinstance(result, tuple)
+                                                                     else result),
+                              error=failure(result))
+            except Exception as e:
+                record['error'] = f"{type(e).__name__}: {e}"
+            results.append(record)
+
+            if 'best_s' in record:
+                iters = '' if record['iterations'] is None else record['iterations']
+                print(f"{case.name:<36}{size:>10}{record['best_s'] * 1e3:>10.2f}ms{record['median_s'] * 1e3:>10.2f}ms"
+                      f"{record['peak_bytes'] / 2**20:>8.1f}MB{iters:>8}" + (f"  ({record['error']})" if record['error'] else ''))
+            else:
+                print(f"{case.name:<36}{size:>10}  {record['error']}")
+
+    commit, dirty = git_commit()
+    report = {
+        'meta': {
+            'commit': commit,
+            'dirty': dirty,
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'repeat': args.repeat,
+            'seed': args.seed,
+            'quick': args.quick,
+            'filter': args.filter,
+        },
+        'results': results,
+    }
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"{(commit or 'local')[:10]}{'-dirty' if dirty else ''}.json")
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=1)
+    print(f"\nResultados en {output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,41 +1,152 @@
-from flask import Flask, request, jsonify
+import os
+import time
+_import_started = time.perf_counter()
+
+from flask import Flask, Response, g, request
 from flask_cors import CORS
+from werkzeug.exceptions import HTTPException, NotFound
 # CAPITULO 1
-from methods.cap1.Biseccion import bisection_method
-from methods.cap1.Newton import newton_method
-from methods.cap1.PuntoFijo import fixed_point_method
-from methods.cap1.RaicesMultiples import multiple_roots_method
-from methods.cap1.ReglaFalsa import false_position_method
-from methods.cap1.Secante import secant_method
-
-# CAPITULO 2
-from methods.cap2.GaussSeidel import gaussSeidel_method
-from methods.cap2.Jacobi import jacobi_method
-from methods.cap2.Sor import sor_method
+from methods.cap1.Biseccion import bisection_method, bisection_iter
+from methods.cap1.Newton import newton_method, newton_iter
+from methods.cap1.PuntoFijo import fixed_point_method, fixed_point_iter
+from methods.cap1.RaicesMultiples import multiple_roots_method, multiple_roots_iter
+from methods.cap1.ReglaFalsa import false_position_method, false_position_iter
+from methods.cap1.Secante import secant_method, secant_iter
+from methods.cap1.Batch import (bisection_batch, newton_batch, fixed_point_batch,
+                                multiple_roots_batch, false_position_batch, secant_batch)
+
+# CAPITULO 2: usa SciPy, así que cada ruta importa su método la primera vez que se llama
+from methods.cap2.operators import operator_stats
+
+from methods.history import serialize_history
+from methods.streaming import STREAM_FORMATS, iteration_records, encode_record
+from methods.payload import load_payload, missing
+from methods.response import respond
+from methods.jobs import JobQueue
+from methods.warmup import install as install_warm_up, startup_report
+from methods import metrics
+from methods.metrics import stage
+from methods.profiling import enable_profiling
 
 # CAPITULO 3
 from methods.cap3.Lagrange import lagrange_interpolation
-from methods.cap3.NewtonInterpolante import newton_interpolation
+from methods.cap3.NewtonInterpolante import newton_interpolation, newton_append
 from methods.cap3.SplineCubico import spline_cubico_interpolation
 from methods.cap3.SplineLineal import spline_lineal_interpolation
 from methods.cap3.Vandermonde import vandermonde_interpolation
+from methods.cap3.registry import evaluate, registry_stats
 
-# DERIVATIVE CALCULATOR
-import sympy as sp
+# CACHÉ DE EXPRESIONES
+from methods.expression_cache import get_function, get_derivatives, cache_stats
+from methods.symbolic import SymbolicLimitError, derivative as symbolic_derivative, pool_stats
 
 app = Flask(__name__)
 CORS(app)
 
+# Frases que marcan una conclusión como error en cada capítulo
+CAP1_ERRORS = ['invalid', 'error', "isn't defined", 'division by zero', 'infinity', 'inadequate', 'exploded',
+               'does not change sign', 'not found', 'failed', 'cannot', 'unable']
+CAP2_ERRORS = ['invalid', 'error', "isn't defined", 'division by zero', 'infinity', 'inadequate', 'exploded',
+               'diverge', 'not converge']
+CAP3_ERRORS = ['invalid', 'error', "isn't defined", 'division by zero', 'infinity', 'inadequate', 'exploded',
+               'singular', 'not invertible']
+
+# Al transmitir, las filas ya se enviaron: solo se conserva la última en memoria
+STREAM_HISTORY = {"mode": "last_n", "n": 1}
+
+
+def stream_format(data):
+    """Formato de transmisión pedido ('ndjson' o 'sse'), o None para la respuesta completa."""
+    requested = data.get("stream") or request.args.get("stream")
+    if requested:
+        if requested not in STREAM_FORMATS:
+            raise ValueError(f"Invalid stream format: '{requested}'. Use 'ndjson' or 'sse'.")
+        return requested
+    accept = request.headers.get("Accept", "")
+    for name, mimetype in STREAM_FORMATS.items():
+        if mimetype in accept:
+            return name
+    return None
+
+
+def stream_response(generator, error_phrases, fmt):
+    """Envía cada iteración apenas se calcula y al final el resultado o el error."""
+    precision = request.args.get("precision", type=int)
+    records = (encode_record(record, fmt, precision) for record in iteration_records(generator, error_phrases))
+    return Response(records, mimetype=STREAM_FORMATS[fmt], headers={"Cache-Control": "no-cache",
+                                                                   "X-Accel-Buffering": "no"})
+
+
+# MÉTRICAS (ver methods.metrics): latencia por ruta y por etapa, iteraciones y tamaños
+@app.before_request
+def start_request_metrics():
+    g.metrics_started = time.perf_counter()
+    metrics.set_route(request.url_rule.rule if request.url_rule else "unmatched")
+
+
+@app.after_request
+def record_request_metrics(response):
+    started = g.get("metrics_started")
+    if started is None:
+        return response
+    route = metrics.current_route()
+    method, request_bytes = request.method, request.content_length
+
+    # Se registra al cerrar la respuesta: en las transmitidas incluye el envío del cuerpo
+    def record():
+        response_bytes = None if response.is_streamed else response.content_length
+        metrics.observe_request(route, method, response.status_code, time.perf_counter() - started,
+                                request_bytes, response_bytes)
+
+    response.call_on_close(record)
+    return response
+
+
 @app.route("/", methods=["GET"])
 def root_methodlab():
-    return jsonify({"message": "Welcome to methodlab API"}), 200
+    return respond({"message": "Welcome to methodlab API"}, 200)
+
+
+@app.route("/stats/expression_cache", methods=["GET"])
+def expression_cache_stats():
+    return respond(cache_stats(), 200)
+
+
+@app.route("/stats/interpolants", methods=["GET"])
+def interpolant_registry_stats():
+    return respond(registry_stats(), 200)
+
+
+@app.route("/stats/operators", methods=["GET"])
+def operator_cache_stats():
+    return respond(operator_stats(), 200)
+
+
+@app.route("/stats/startup", methods=["GET"])
+def startup_stats():
+    return respond(startup_report(), 200)
+
+
+@app.route("/stats/symbolic", methods=["GET"])
+def symbolic_pool_stats():
+    return respond(pool_stats(), 200)
+
+
+@app.route("/stats/jobs", methods=["GET"])
+def job_queue_stats():
+    return respond(jobs.stats(), 200)
+
+
+@app.route("/metrics", methods=["GET"])
+def prometheus_metrics():
+    return Response(metrics.render(), content_type=metrics.CONTENT_TYPE)
 
 
 # CAPITULO 1
 @app.route("/calculate/bisection", methods=["POST"])
 def calculate_bisection():
     try:
-        data = request.get_json(force=True)
+        data = load_payload(request)
         function_text = data.get("function_text")
         a = data.get("a")
         b = data.get("b")
@@ -43,85 +154,111 @@ def calculate_bisection():
         max_count = data.get("max_count")
 
         if any(v is None for v in (function_text, a, b, tol, max_count)):
-            return jsonify({"error": "All fields are required"}), 400
+            return respond({"error": "All fields are required"}, 400)
 
         a = float(a); b = float(b); tol = float(tol); max_count = int(max_count)
 
-        result = bisection_method(function_text, a, b, tol, max_count)
+        # Transmisión: una fila por iteración (NDJSON o Server-Sent Events)
+        fmt = stream_format(data)
+        if fmt:
+            return stream_response(bisection_iter(function_text, a, b, tol, max_count, data.get("history", STREAM_HISTORY)), CAP1_ERRORS, fmt)
+
+        result = bisection_method(function_text, a, b, tol, max_count, history=data.get("history"))
 
         # Verificar si hubo errores en el método
-        if result.get('conclusion') and any(error_phrase in result['conclusion'].lower() for error_phrase in 
-               ['invalid', 'error', "isn't defined", 'division by zero', 'infinity', 'inadequate', 'exploded', 'does not change sign', 'not found', 'failed', 'cannot', 'unable']):
-            return jsonify({"error": result['conclusion']}), 400
+        if result.get('conclusion') and any(error_phrase in result['conclusion'].lower() for error_phrase in CAP1_ERRORS):
+            return respond({"error": result['conclusion']}, 400)
 
-        return jsonify({"result": result}), 200
+        serialize_history(result)
+        return respond({"result": result}, 200)
 
     except ValueError as ve:
-        return jsonify({"error": str(ve)}), 400
+        return respond({"error": str(ve)}, 400)
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return respond({"error": str(e)}, 500)
 
 
 @app.route("/calculate/newton", methods=["POST"])
 def calculate_newton():
     try:
-        data = request.get_json(force=True)
+        data = load_payload(request)
         function_text = data.get("function_text")
         first_derivate_text = data.get("first_derivate_text")
         x0 = float(data.get("x0"))
         tol = float(data.get("tol"))
         max_count = int(data.get("max_count"))
 
-        if not function_text or not first_derivate_text or x0 is None or tol is None or max_count is None:
-            return jsonify({"error": "All fields are required"}), 400
+        # auto_derivatives: f' se calcula en el servidor (se ignora first_derivate_text)
+        if data.get("auto_derivatives"):
+            first_derivate_text = None
+        elif not first_derivate_text:
+            return respond({"error": "All fields are required"}, 400)
+
+        if not function_text or x0 is None or tol is None or max_count is None:
+            return respond({"error": "All fields are required"}, 400)
+
+        # Transmisión: una fila por iteración (NDJSON o Server-Sent Events)
+        fmt = stream_format(data)
+        if fmt:
+            return stream_response(newton_iter(function_text, first_derivate_text, x0, tol, max_count,
+                                               data.get("history", STREAM_HISTORY)), CAP1_ERRORS, fmt)
 
-        result = newton_method(function_text, first_derivate_text, x0, tol, max_count)
+        result = newton_method(function_text, first_derivate_text, x0, tol, max_count, history=data.get("history"))
 
         # Verificar si hubo errores en el método
-        if result.get('conclusion') and any(error_phrase in result['conclusion'].lower() for error_phrase in 
-               ['invalid', 'error', "isn't defined", 'division by zero', 'infinity', 'inadequate', 'exploded', 'does not change sign', 'not found', 'failed', 'cannot', 'unable']):
-            return jsonify({"error": result['conclusion']}), 400
+        if result.get('conclusion') and any(error_phrase in result['conclusion'].lower() for error_phrase in CAP1_ERRORS):
+            return respond({"error": result['conclusion']}, 400)
 
-        return jsonify({"result": result}), 200
+        serialize_history(result)
+        return respond({"result": result}, 200)
 
     except ValueError as ve:
-        return jsonify({"error": str(ve)}), 400
+        return respond({"error": str(ve)}, 400)
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return respond({"error": str(e)}, 500)
 
 
 @app.route("/calculate/puntoFijo", methods=["POST"])
 def calculete_puntoFijo():
     try:
-        data = request.get_json(force=True)
+        data = load_payload(request)
         function_text = data.get("function_text")
         g_function_text = data.get("g_function_text")
         x0 = float(data.get("x0"))
         tol = float(data.get("tol"))
         max_count = int(data.get("max_count"))
+        # Aceleración Δ²: "none", "aitken" o "steffensen"
+        acceleration = data.get("acceleration", "none")
 
         if not function_text or not g_function_text or x0 is None or tol is None or max_count is None:
-            return jsonify({"error": "All fields are required"}), 400
+            return respond({"error": "All fields are required"}, 400)
 
-        results = fixed_point_method(function_text, g_function_text, x0, tol, max_count)
+        # Transmisión: una fila por iteración (NDJSON o Server-Sent Events)
+        fmt = stream_format(data)
+        if fmt:
+            return stream_response(fixed_point_iter(function_text, g_function_text, x0, tol, max_count,
+                                                    data.get("history", STREAM_HISTORY), acceleration), CAP1_ERRORS, fmt)
+
+        results = fixed_point_method(function_text, g_function_text, x0, tol, max_count, history=data.get("history"),
+                                     acceleration=acceleration)
 
         # Verificar si hubo errores en el método
-        if results.get('conclusion') and any(error_phrase in results['conclusion'].lower() for error_phrase in 
-               ['invalid', 'error', "isn't defined", 'division by zero', 'infinity', 'inadequate', 'exploded', 'does not change sign', 'not found', 'failed', 'cannot', 'unable']):
-            return jsonify({"error": results['conclusion']}), 400
+        if results.get('conclusion') and any(error_phrase in results['conclusion'].lower() for error_phrase in CAP1_ERRORS):
+            return respond({"error": results['conclusion']}, 400)
 
-        return jsonify({"result": results}), 200
+        serialize_history(results)
+        return respond({"result": results}, 200)
 
     except ValueError as ve:
-        return jsonify({"error": str(ve)}), 400
+        return respond({"error": str(ve)}, 400)
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return respond({"error": str(e)}, 500)
 
 
 @app.route("/calculate/raicesMultiples", methods=["POST"])
 def calculate_raicesMultiples():
     try:
-        data = request.get_json(force=True)
+        data = load_payload(request)
         function_text = data.get("function_text")
         first_derivate_text = data.get("first_derivate_text")
         second_derivate_text = data.get("second_derivate_text")
@@ -129,28 +266,41 @@ def calculate_raicesMultiples():
         tol = float(data.get("tol"))
         max_count = int(data.get("max_count"))
 
-        if not function_text or not first_derivate_text or not second_derivate_text or x0 is None or tol is None or max_count is None:
-            return jsonify({"error": "All fields are required"}), 400
+        # auto_derivatives: f' y f'' se calculan en el servidor
+        if data.get("auto_derivatives"):
+            first_derivate_text = second_derivate_text = None
+        elif not first_derivate_text or not second_derivate_text:
+            return respond({"error": "All fields are required"}, 400)
+
+        if not function_text or x0 is None or tol is None or max_count is None:
+            return respond({"error": "All fields are required"}, 400)
 
-        results = multiple_roots_method(function_text, first_derivate_text, second_derivate_text, x0, tol, max_count)
+        # Transmisión: una fila por iteración (NDJSON o Server-Sent Events)
+        fmt = stream_format(data)
+        if fmt:
+            return stream_response(multiple_roots_iter(function_text, first_derivate_text, second_derivate_text, x0, tol,
+                                                       max_count, data.get("history", STREAM_HISTORY)), CAP1_ERRORS, fmt)
+
+        results = multiple_roots_method(function_text, first_derivate_text, second_derivate_text, x0, tol, max_count,
+                                        history=data.get("history"))
 
         # Verificar si hubo errores en el método
-        if results.get('conclusion') and any(error_phrase in results['conclusion'].lower() for error_phrase in 
-               ['invalid', 'error', "isn't defined", 'division by zero', 'infinity', 'inadequate', 'exploded', 'does not change sign', 'not found', 'failed', 'cannot', 'unable']):
-            return jsonify({"error": results['conclusion']}), 400
+        if results.get('conclusion') and any(error_phrase in results['conclusion'].lower() for error_phrase in CAP1_ERRORS):
+            return respond({"error": results['conclusion']}, 400)
 
-        return jsonify({"result": results}), 200
+        serialize_history(results)
+        return respond({"result": results}, 200)
 
     except ValueError as ve:
-        return jsonify({"error": str(ve)}), 400
+        return respond({"error": str(ve)}, 400)
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return respond({"error": str(e)}, 500)
 
 
 @app.route("/calculate/ReglaFalsa", methods=["POST"])
 def calculate_reglaFalsa():
     try:
-        data = request.get_json(force=True)
+        data = load_payload(request)
         function_text = data.get("function_text")
         a = float(data.get("a"))
         b = float(data.get("b"))
@@ -158,27 +308,32 @@ def calculate_reglaFalsa():
         max_count = int(data.get("max_count"))
 
         if any(v is None for v in (function_text, a, b, tol, max_count)):
-            return jsonify({"error": "All fields are required"}), 400
+            return respond({"error": "All fields are required"}, 400)
+
+        # Transmisión: una fila por iteración (NDJSON o Server-Sent Events)
+        fmt = stream_format(data)
+        if fmt:
+            return stream_response(false_position_iter(function_text, a, b, tol, max_count, data.get("history", STREAM_HISTORY)), CAP1_ERRORS, fmt)
 
-        result = false_position_method(function_text, a, b, tol, max_count)
+        result = false_position_method(function_text, a, b, tol, max_count, history=data.get("history"))
 
         # Verificar si hubo errores en el método
-        if result.get('conclusion') and any(error_phrase in result['conclusion'].lower() for error_phrase in 
-               ['invalid', 'error', "isn't defined", 'division by zero', 'infinity', 'inadequate', 'exploded', 'does not change sign', 'not found', 'failed', 'cannot', 'unable']):
-            return jsonify({"error": result['conclusion']}), 400
+        if result.get('conclusion') and any(error_phrase in result['conclusion'].lower() for error_phrase in CAP1_ERRORS):
+            return respond({"error": result['conclusion']}, 400)
 
-        return jsonify({"result": result}), 200
+        serialize_history(result)
+        return respond({"result": result}, 200)
 
     except ValueError as ve:
-        return jsonify({"error": str(ve)}), 400
+        return respond({"error": str(ve)}, 400)
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return respond({"error": str(e)}, 500)
 
 
 @app.route("/calculate/secante", methods=["POST"])
 def calculate_secante():
     try:
-        data = request.get_json(force=True)
+        data = load_payload(request)
         function_text = data.get("function_text")
         x0 = float(data.get("x0"))
         x1 = float(data.get("x1"))
@@ -186,28 +341,77 @@ def calculate_secante():
         max_count = int(data.get("max_count"))
 
         if any(v is None for v in (function_text, x0, x1, tol, max_count)):
-            return jsonify({"error": "All fields are required"}), 400
+            return respond({"error": "All fields are required"}, 400)
 
-        result = secant_method(function_text, x0, x1, tol, max_count)
+        # Transmisión: una fila por iteración (NDJSON o Server-Sent Events)
+        fmt = stream_format(data)
+        if fmt:
+            return stream_response(secant_iter(function_text, x0, x1, tol, max_count, data.get("history", STREAM_HISTORY)), CAP1_ERRORS, fmt)
+
+        result = secant_method(function_text, x0, x1, tol, max_count, history=data.get("history"))
 
         # Verificar si hubo errores en el método
-        if result.get('conclusion') and any(error_phrase in result['conclusion'].lower() for error_phrase in 
-               ['invalid', 'error', "isn't defined", 'division by zero', 'infinity', 'inadequate', 'exploded', 'does not change sign', 'not found', 'failed', 'cannot', 'unable']):
-            return jsonify({"error": result['conclusion']}), 400
+        if result.get('conclusion') and any(error_phrase in result['conclusion'].lower() for error_phrase in CAP1_ERRORS):
+            return respond({"error": result['conclusion']}, 400)
+
+        serialize_history(result)
+        return respond({"result": result}, 200)
+
+    except ValueError as ve:
+        return respond({"error": str(ve)}, 400)
+    except Exception as e:
+        return respond({"error": str(e)}, 500)
+
+
+# Modo por lotes: cada método recibe arreglos de puntos iniciales o intervalos
+BATCH_METHODS = {
+    "bisection": (bisection_batch, ("function_text", "a", "b")),
+    "newton": (newton_batch, ("function_text", "first_derivate_text", "x0")),
+    "puntoFijo": (fixed_point_batch, ("function_text", "g_function_text", "x0")),
+    "raicesMultiples": (multiple_roots_batch, ("function_text", "first_derivate_text", "second_derivate_text", "x0")),
+    "ReglaFalsa": (false_position_batch, ("function_text", "a", "b")),
+    "secante": (secant_batch, ("function_text", "x0", "x1")),
+}
+# Con auto_derivatives, cuántas derivadas se calculan en el servidor (siguen a function_text en los campos)
+AUTO_DERIVATIVES = {"newton": 1, "raicesMultiples": 2}
 
-        return jsonify({"result": result}), 200
+
+@app.route("/calculate/<method>/batch", methods=["POST"])
+def calculate_batch(method):
+    try:
+        if method not in BATCH_METHODS:
+            return respond({"error": f"Batch mode is not available for '{method}'"}, 404)
+        batch_function, fields = BATCH_METHODS[method]
+
+        data = load_payload(request)
+        if data.get("auto_derivatives") and method in AUTO_DERIVATIVES and data.get("function_text"):
+            texts = get_derivatives(data["function_text"], AUTO_DERIVATIVES[method])[1]
+            data.update(zip(fields[1:], texts))
+        args = [data.get(field) for field in fields]
+        tol = data.get("tol")
+        max_count = data.get("max_count")
+
+        if any(v is None for v in args) or tol is None or max_count is None:
+            return respond({"error": "All fields are required"}, 400)
+
+        with stage("iterate"):
+            result = batch_function(*args, float(tol), int(max_count))
+        return respond({"result": result}, 200)
 
     except ValueError as ve:
-        return jsonify({"error": str(ve)}), 400
+        return respond({"error": str(ve)}, 400)
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return respond({"error": str(e)}, 500)
 
 
 # CAPITULO 2
 @app.route("/calculate/gaussSeidel", methods=["POST"])
 def calculate_gaussSeidel():
     try:
-        data = request.get_json(force=True)
+        from methods.cap2.GaussSeidel import gaussSeidel_method, gaussSeidel_iter
+        from methods.cap2.matrices import parse_matrix
+
+        data = load_payload(request, "matrixA")
         matrixA = data.get("matrixA")
         vectorB = data.get("vectorB")
         vectorX0 = data.get("vectorX0")
@@ -215,54 +419,54 @@ def calculate_gaussSeidel():
         tol = float(data.get("tol"))
         max_count = int(data.get("max_count"))
 
-        if not matrixA or not vectorB or not vectorX0 or norm_type is None or tol is None or max_count is None:
-            return jsonify({"error": "All fields are required"}), 400
+        if missing(matrixA, vectorB, vectorX0) or norm_type is None or tol is None or max_count is None:
+            return respond({"error": "All fields are required"}, 400)
 
-        # Convertir a numpy arrays
+        # Convertir a numpy arrays (o scipy.sparse si A llega en formato disperso)
         import numpy as np
-        matrixA = np.array(matrixA, dtype=float)
-        vectorB = np.array(vectorB, dtype=float)
-        vectorX0 = np.array(vectorX0, dtype=float)
-
-        results = gaussSeidel_method(matrixA, vectorB, vectorX0, tol, max_count, norm_type)
-
-        # Convertir numpy arrays a listas para serialización JSON
-        if results.get('C') is not None:
-            results['C'] = results['C'].tolist()
-        if results.get('T') is not None:
-            results['T'] = results['T'].tolist()
-        if results.get('final_solution') is not None:
-            results['final_solution'] = results['final_solution'].tolist()
-        
-        # Convertir arrays en iterations
-        iterations_converted = []
-        for iteration in results.get('iterations', []):
-            if len(iteration) == 3:
-                count, error, x_vector = iteration
-                if hasattr(x_vector, 'tolist'):
-                    x_vector = x_vector.tolist()
-                iterations_converted.append([count, error, x_vector])
-            else:
-                iterations_converted.append(iteration)
-        results['iterations'] = iterations_converted
+        matrixA = parse_matrix(matrixA)
+        vectorB = np.asarray(vectorB, dtype=float)
+        vectorX0 = np.asarray(vectorX0, dtype=float)
+
+        solver = data.get("solver")
+        include_matrices = data.get("include_matrices")
+        precheck_mode = data.get("precheck", "auto")
+        precheck_budget = float(data.get("precheck_budget", 1.0))
+
+        # Transmisión: una fila por iteración (NDJSON o Server-Sent Events)
+        fmt = stream_format(data)
+        if fmt:
+            return stream_response(gaussSeidel_iter(matrixA, vectorB, vectorX0, tol, max_count, norm_type, solver,
+                                                    include_matrices, precheck_mode, precheck_budget,
+                                                    data.get("history", STREAM_HISTORY)), CAP2_ERRORS, fmt)
+
+        results = gaussSeidel_method(matrixA, vectorB, vectorX0, tol, max_count, norm_type,
+                                     solver=solver, include_matrices=include_matrices,
+                                     precheck_mode=precheck_mode, precheck_budget=precheck_budget,
+                                     history=data.get("history"))
+
+        # Tabla de iteraciones: columnas de NumPy a filas (los arreglos los serializa respond)
+        serialize_history(results)
 
         # Verificar si hubo errores en el método
-        if results.get('conclusion') and any(error_phrase in results['conclusion'].lower() for error_phrase in 
-               ['invalid', 'error', "isn't defined", 'division by zero', 'infinity', 'inadequate', 'exploded', 'diverge', 'not converge']):
-            return jsonify({"error": results['conclusion']}), 400
+        if results.get('conclusion') and any(error_phrase in results['conclusion'].lower() for error_phrase in CAP2_ERRORS):
+            return respond({"error": results['conclusion']}, 400)
 
-        return jsonify({"result": results}), 200
+        return respond({"result": results}, 200)
 
     except ValueError as ve:
-        return jsonify({"error": str(ve)}), 400
+        return respond({"error": str(ve)}, 400)
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return respond({"error": str(e)}, 500)
 
 
 @app.route("/calculate/jacobi", methods=["POST"])
 def calculate_jacobi():
     try:
-        data = request.get_json(force=True)
+        from methods.cap2.Jacobi import jacobi_method, jacobi_iter
+        from methods.cap2.matrices import parse_matrix
+
+        data = load_payload(request, "matrixA")
         matrixA = data.get("matrixA")
         vectorB = data.get("vectorB")
         vectorX0 = data.get("vectorX0")
@@ -270,249 +474,365 @@ def calculate_jacobi():
         tol = float(data.get("tol"))
         max_count = int(data.get("max_count"))
 
-        if not matrixA or not vectorB or not vectorX0 or norm_type is None or tol is None or max_count is None:
-            return jsonify({"error": "All fields are required"}), 400
+        if missing(matrixA, vectorB, vectorX0) or norm_type is None or tol is None or max_count is None:
+            return respond({"error": "All fields are required"}, 400)
 
-        # Convertir a numpy arrays
+        # Convertir a numpy arrays (o scipy.sparse si A llega en formato disperso)
         import numpy as np
-        matrixA = np.array(matrixA, dtype=float)
-        vectorB = np.array(vectorB, dtype=float)
-        vectorX0 = np.array(vectorX0, dtype=float)
-
-        results = jacobi_method(matrixA, vectorB, vectorX0, tol, max_count, norm_type)
-
-        # Convertir numpy arrays a listas para serialización JSON
-        if results.get('C') is not None:
-            results['C'] = results['C'].tolist()
-        if results.get('T') is not None:
-            results['T'] = results['T'].tolist()
-        if results.get('final_solution') is not None:
-            results['final_solution'] = results['final_solution'].tolist()
-        
-        # Convertir arrays en iterations
-        iterations_converted = []
-        for iteration in results.get('iterations', []):
-            if len(iteration) == 3:
-                count, error, x_vector = iteration
-                if hasattr(x_vector, 'tolist'):
-                    x_vector = x_vector.tolist()
-                iterations_converted.append([count, error, x_vector])
-            else:
-                iterations_converted.append(iteration)
-        results['iterations'] = iterations_converted
+        matrixA = parse_matrix(matrixA)
+        vectorB = np.asarray(vectorB, dtype=float)
+        vectorX0 = np.asarray(vectorX0, dtype=float)
+
+        include_matrices = data.get("include_matrices")
+        precheck_mode = data.get("precheck", "auto")
+        precheck_budget = float(data.get("precheck_budget", 1.0))
+
+        # Transmisión: una fila por iteración (NDJSON o Server-Sent Events)
+        fmt = stream_format(data)
+        if fmt:
+            return stream_response(jacobi_iter(matrixA, vectorB, vectorX0, tol, max_count, norm_type, precheck_mode,
+                                               include_matrices, precheck_budget,
+                                               data.get("history", STREAM_HISTORY)), CAP2_ERRORS, fmt)
+
+        results = jacobi_method(matrixA, vectorB, vectorX0, tol, max_count, norm_type,
+                                precheck_mode=precheck_mode, include_matrices=include_matrices,
+                                precheck_budget=precheck_budget, history=data.get("history"))
+
+        # Tabla de iteraciones: columnas de NumPy a filas (los arreglos los serializa respond)
+        serialize_history(results)
 
         # Verificar si hubo errores en el método
-        if results.get('conclusion') and any(error_phrase in results['conclusion'].lower() for error_phrase in 
-               ['invalid', 'error', "isn't defined", 'division by zero', 'infinity', 'inadequate', 'exploded', 'diverge', 'not converge']):
-            return jsonify({"error": results['conclusion']}), 400
+        if results.get('conclusion') and any(error_phrase in results['conclusion'].lower() for error_phrase in CAP2_ERRORS):
+            return respond({"error": results['conclusion']}, 400)
 
-        return jsonify({"result": results}), 200
+        return respond({"result": results}, 200)
 
     except ValueError as ve:
-        return jsonify({"error": str(ve)}), 400
+        return respond({"error": str(ve)}, 400)
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return respond({"error": str(e)}, 500)
 
 
 @app.route("/calculate/sor", methods=["POST"])
 def calculate_sor():
     try:
-        data = request.get_json(force=True)
+        from methods.cap2.Sor import sor_method, sor_iter
+        from methods.cap2.matrices import parse_matrix
+
+        data = load_payload(request, "matrixA")
         matrixA = data.get("matrixA")
         vectorB = data.get("vectorB")
         vectorX0 = data.get("vectorX0")
         norm_type = float(data.get("norm_type"))
-        w = float(data.get("w"))
+        # w = "auto": omega estimado a partir del radio espectral de Jacobi
+        w = data.get("w")
+        w = w if w == "auto" else float(w)
         tol = float(data.get("tol"))
         max_count = int(data.get("max_count"))
 
-        if not matrixA or not vectorB or not vectorX0 or norm_type is None or w is None or tol is None or max_count is None:
-            return jsonify({"error": "All fields are required"}), 400
+        if missing(matrixA, vectorB, vectorX0) or norm_type is None or w is None or tol is None or max_count is None:
+            return respond({"error": "All fields are required"}, 400)
 
-        # Convertir a numpy arrays
+        # Convertir a numpy arrays (o scipy.sparse si A llega en formato disperso)
         import numpy as np
-        matrixA = np.array(matrixA, dtype=float)
-        vectorB = np.array(vectorB, dtype=float)
-        vectorX0 = np.array(vectorX0, dtype=float)
-
-        results = sor_method(matrixA, vectorB, vectorX0, tol, max_count, norm_type, w)
-
-        # Convertir numpy arrays a listas para serialización JSON
-        if results.get('C') is not None:
-            results['C'] = results['C'].tolist()
-        if results.get('T') is not None:
-            results['T'] = results['T'].tolist()
-        if results.get('final_solution') is not None:
-            results['final_solution'] = results['final_solution'].tolist()
-        
-        # Convertir arrays en iterations
-        iterations_converted = []
-        for iteration in results.get('iterations', []):
-            if len(iteration) == 3:
-                count, error, x_vector = iteration
-                if hasattr(x_vector, 'tolist'):
-                    x_vector = x_vector.tolist()
-                iterations_converted.append([count, error, x_vector])
-            else:
-                iterations_converted.append(iteration)
-        results['iterations'] = iterations_converted
+        matrixA = parse_matrix(matrixA)
+        vectorB = np.asarray(vectorB, dtype=float)
+        vectorX0 = np.asarray(vectorX0, dtype=float)
+
+        include_matrices = data.get("include_matrices")
+        precheck_mode = data.get("precheck", "auto")
+        precheck_budget = float(data.get("precheck_budget", 1.0))
+
+        # Transmisión: una fila por iteración (NDJSON o Server-Sent Events)
+        fmt = stream_format(data)
+        if fmt:
+            return stream_response(sor_iter(matrixA, vectorB, vectorX0, tol, max_count, norm_type, w, precheck_mode,
+                                            include_matrices, precheck_budget,
+                                            data.get("history", STREAM_HISTORY)), CAP2_ERRORS, fmt)
+
+        results = sor_method(matrixA, vectorB, vectorX0, tol, max_count, norm_type, w,
+                             precheck_mode=precheck_mode, include_matrices=include_matrices,
+                             precheck_budget=precheck_budget, history=data.get("history"))
+
+        # Tabla de iteraciones: columnas de NumPy a filas (los arreglos los serializa respond)
+        serialize_history(results)
 
         # Verificar si hubo errores en el método
-        if results.get('conclusion') and any(error_phrase in results['conclusion'].lower() for error_phrase in 
-               ['invalid', 'error', "isn't defined", 'division by zero', 'infinity', 'inadequate', 'exploded', 'diverge', 'not converge']):
-            return jsonify({"error": results['conclusion']}), 400
+        if results.get('conclusion') and any(error_phrase in results['conclusion'].lower() for error_phrase in CAP2_ERRORS):
+            return respond({"error": results['conclusion']}, 400)
+
+        return respond({"result": results}, 200)
+
+    except ValueError as ve:
+        return respond({"error": str(ve)}, 400)
+    except Exception as e:
+        return respond({"error": str(e)}, 500)
+
 
-        return jsonify({"result": results}), 200
+# Barrido de omega por defecto: 0.1, 0.2, ..., 1.9
+SWEEP_OMEGAS = {"start": 0.1, "stop": 1.9, "num": 19}
+
+
+@app.route("/calculate/sor/sweep", methods=["POST"])
+def calculate_sor_sweep():
+    try:
+        from methods.cap2.Sor import sor_sweep
+        from methods.cap2.matrices import parse_matrix
+
+        data = load_payload(request, "matrixA")
+        matrixA = data.get("matrixA")
+        vectorB = data.get("vectorB")
+        vectorX0 = data.get("vectorX0")
+        norm_type = float(data.get("norm_type"))
+        tol = float(data.get("tol"))
+        max_count = int(data.get("max_count"))
+
+        if missing(matrixA, vectorB, vectorX0) or norm_type is None or tol is None or max_count is None:
+            return respond({"error": "All fields are required"}, 400)
+
+        # omegas: lista de valores (puede incluir "auto") o {"start", "stop", "num"}
+        import numpy as np
+        omegas = data.get("omegas", SWEEP_OMEGAS)
+        if isinstance(omegas, dict):
+            omegas = dict(SWEEP_OMEGAS, **omegas)
+            omegas = np.linspace(float(omegas["start"]), float(omegas["stop"]), int(omegas["num"])).tolist()
+
+        matrixA = parse_matrix(matrixA)
+        vectorB = np.asarray(vectorB, dtype=float)
+        vectorX0 = np.asarray(vectorX0, dtype=float)
+
+        workers = data.get("workers")
+        with stage("iterate"):
+            results = sor_sweep(matrixA, vectorB, vectorX0, tol, max_count, norm_type, omegas,
+                                precheck_mode=data.get("precheck", "auto"),
+                                precheck_budget=float(data.get("precheck_budget", 1.0)),
+                                workers=int(workers) if workers is not None else None)
+
+        return respond({"result": results}, 200)
 
     except ValueError as ve:
-        return jsonify({"error": str(ve)}), 400
+        return respond({"error": str(ve)}, 400)
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return respond({"error": str(e)}, 500)
 
 
 # CAPITULO 3
 @app.route("/calculate/lagrange", methods=["POST"])
 def calculate_lagrange():
     try:
-        data = request.get_json(force=True)
+        data = load_payload(request)
         x_values = data.get("x_values")
         y_values = data.get("y_values")
 
-        if not x_values or not y_values:
-            return jsonify({"error": "x_values and y_values are required"}), 400
+        if missing(x_values, y_values):
+            return respond({"error": "x_values and y_values are required"}, 400)
 
-        # Convertir a float
-        x_values = [float(x) for x in x_values]
-        y_values = [float(y) for y in y_values]
+        # Los métodos validan y convierten los puntos (methods.cap3.inputs.prepare_points),
+        # con mensajes que señalan el elemento inválido
 
-        result = lagrange_interpolation(x_values, y_values)
+        result = lagrange_interpolation(x_values, y_values, coefficients=data.get("coefficients"),
+                                        plot=data.get("plot", True), register=data.get("register", False))
 
         # Verificar si hubo errores en el método
-        if result.get('conclusion') and any(error_phrase in result['conclusion'].lower() for error_phrase in 
-               ['invalid', 'error', "isn't defined", 'division by zero', 'infinity', 'inadequate', 'exploded', 'singular', 'not invertible']):
-            return jsonify({"error": result['conclusion']}), 400
+        if result.get('conclusion') and any(error_phrase in result['conclusion'].lower() for error_phrase in CAP3_ERRORS):
+            return respond({"error": result['conclusion']}, 400)
 
-        return jsonify({"result": result}), 200
+        return respond({"result": result}, 200)
 
     except ValueError as ve:
-        return jsonify({"error": str(ve)}), 400
+        return respond({"error": str(ve)}, 400)
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return respond({"error": str(e)}, 500)
 
 
 @app.route("/calculate/newton_interpolation", methods=["POST"])
 def calculate_newton_interpolation():
     try:
-        data = request.get_json(force=True)
+        data = load_payload(request)
         x_values = data.get("x_values")
         y_values = data.get("y_values")
 
-        if not x_values or not y_values:
-            return jsonify({"error": "x_values and y_values are required"}), 400
+        if missing(x_values, y_values):
+            return respond({"error": "x_values and y_values are required"}, 400)
 
-        # Convertir a float
-        x_values = [float(x) for x in x_values]
-        y_values = [float(y) for y in y_values]
+        # Los métodos validan y convierten los puntos (methods.cap3.inputs.prepare_points),
+        # con mensajes que señalan el elemento inválido
 
-        result = newton_interpolation(x_values, y_values)
+        result = newton_interpolation(x_values, y_values, coefficients=data.get("coefficients"),
+                                      plot=data.get("plot", True), register=data.get("register", True))
 
         # Verificar si hubo errores en el método
-        if result.get('conclusion') and any(error_phrase in result['conclusion'].lower() for error_phrase in 
-               ['invalid', 'error', "isn't defined", 'division by zero', 'infinity', 'inadequate', 'exploded', 'singular', 'not invertible']):
-            return jsonify({"error": result['conclusion']}), 400
+        if result.get('conclusion') and any(error_phrase in result['conclusion'].lower() for error_phrase in CAP3_ERRORS):
+            return respond({"error": result['conclusion']}, 400)
+
+        return respond({"result": result}, 200)
+
+    except ValueError as ve:
+        return respond({"error": str(ve)}, 400)
+    except Exception as e:
+        return respond({"error": str(e)}, 500)
+
+
+@app.route("/calculate/newton_interpolation/<interpolant_id>/append", methods=["POST"])
+def append_newton_interpolation(interpolant_id):
+    try:
+        data = load_payload(request)
+        x_values = data.get("x_values", data.get("x"))
+        y_values = data.get("y_values", data.get("y"))
+
+        if x_values is None or y_values is None:
+            return respond({"error": "x_values and y_values are required"}, 400)
+
+        # Agrega los nodos en O(n) cada uno, sin recalcular la tabla
+        result = newton_append(interpolant_id, x_values, y_values, coefficients=data.get("coefficients"))
+
+        if not result['success']:
+            return respond({"error": result['error']}, 400)
 
-        return jsonify({"result": result}), 200
+        return respond({"result": result}, 200)
 
+    except KeyError as ke:
+        return respond({"error": ke.args[0]}, 404)
     except ValueError as ve:
-        return jsonify({"error": str(ve)}), 400
+        return respond({"error": str(ve)}, 400)
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return respond({"error": str(e)}, 500)
 
 
 @app.route("/calculate/spline_cubico", methods=["POST"])
 def calculate_spline_cubico():
     try:
-        data = request.get_json(force=True)
+        data = load_payload(request)
         x_values = data.get("x_values")
         y_values = data.get("y_values")
 
-        if not x_values or not y_values:
-            return jsonify({"error": "x_values and y_values are required"}), 400
+        if missing(x_values, y_values):
+            return respond({"error": "x_values and y_values are required"}, 400)
 
-        # Convertir a float
-        x_values = [float(x) for x in x_values]
-        y_values = [float(y) for y in y_values]
+        # Los métodos validan y convierten los puntos (methods.cap3.inputs.prepare_points),
+        # con mensajes que señalan el elemento inválido
 
-        result = spline_cubico_interpolation(x_values, y_values)
+        result = spline_cubico_interpolation(x_values, y_values, register=data.get("register", False),
+                                             formulas=data.get("formulas"), plot=data.get("plot"))
 
         # Verificar si hubo errores en el método
-        if result.get('conclusion') and any(error_phrase in result['conclusion'].lower() for error_phrase in 
-               ['invalid', 'error', "isn't defined", 'division by zero', 'infinity', 'inadequate', 'exploded', 'singular', 'not invertible']):
-            return jsonify({"error": result['conclusion']}), 400
+        if result.get('conclusion') and any(error_phrase in result['conclusion'].lower() for error_phrase in CAP3_ERRORS):
+            return respond({"error": result['conclusion']}, 400)
 
-        return jsonify({"result": result}), 200
+        return respond({"result": result}, 200)
 
     except ValueError as ve:
-        return jsonify({"error": str(ve)}), 400
+        return respond({"error": str(ve)}, 400)
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return respond({"error": str(e)}, 500)
 
 
 @app.route("/calculate/spline_lineal", methods=["POST"])
 def calculate_spline_lineal():
     try:
-        data = request.get_json(force=True)
+        data = load_payload(request)
         x_values = data.get("x_values")
         y_values = data.get("y_values")
 
-        if not x_values or not y_values:
-            return jsonify({"error": "x_values and y_values are required"}), 400
+        if missing(x_values, y_values):
+            return respond({"error": "x_values and y_values are required"}, 400)
 
-        # Convertir a float
-        x_values = [float(x) for x in x_values]
-        y_values = [float(y) for y in y_values]
+        # Los métodos validan y convierten los puntos (methods.cap3.inputs.prepare_points),
+        # con mensajes que señalan el elemento inválido
 
-        result = spline_lineal_interpolation(x_values, y_values)
+        result = spline_lineal_interpolation(x_values, y_values, register=data.get("register", False),
+                                             formulas=data.get("formulas"), plot=data.get("plot"))
 
         # Verificar si hubo errores en el método
-        if result.get('conclusion') and any(error_phrase in result['conclusion'].lower() for error_phrase in 
-               ['invalid', 'error', "isn't defined", 'division by zero', 'infinity', 'inadequate', 'exploded', 'singular', 'not invertible']):
-            return jsonify({"error": result['conclusion']}), 400
+        if result.get('conclusion') and any(error_phrase in result['conclusion'].lower() for error_phrase in CAP3_ERRORS):
+            return respond({"error": result['conclusion']}, 400)
 
-        return jsonify({"result": result}), 200
+        return respond({"result": result}, 200)
 
     except ValueError as ve:
-        return jsonify({"error": str(ve)}), 400
+        return respond({"error": str(ve)}, 400)
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return respond({"error": str(e)}, 500)
 
 
 @app.route("/calculate/vandermonde", methods=["POST"])
 def calculate_vandermonde():
     try:
-        data = request.get_json(force=True)
+        data = load_payload(request)
         x_values = data.get("x_values")
         y_values = data.get("y_values")
 
-        if not x_values or not y_values:
-            return jsonify({"error": "x_values and y_values are required"}), 400
+        if missing(x_values, y_values):
+            return respond({"error": "x_values and y_values are required"}, 400)
 
-        x_values = [float(x) for x in x_values]
-        y_values = [float(y) for y in y_values]
+        # y puede ser una lista de listas: varios vectores contra los mismos nodos x.
+        # El método valida y convierte los puntos (methods.cap3.inputs.prepare_points)
 
-        result = vandermonde_interpolation(x_values, y_values)
+        result = vandermonde_interpolation(x_values, y_values, solver=data.get("solver", "bjorck_pereyra"),
+                                           plot=data.get("plot", True), register=data.get("register", False))
 
         # Verificar si hubo errores en el método
-        if result.get('conclusion') and any(error_phrase in result['conclusion'].lower() for error_phrase in 
-               ['invalid', 'error', "isn't defined", 'division by zero', 'infinity', 'inadequate', 'exploded', 'singular', 'not invertible']):
-            return jsonify({"error": result['conclusion']}), 400
+        if result.get('conclusion') and any(error_phrase in result['conclusion'].lower() for error_phrase in CAP3_ERRORS):
+            return respond({"error": result['conclusion']}, 400)
+
+        return respond({"result": result}, 200)
+
+    except ValueError as ve:
+        return respond({"error": str(ve)}, 400)
+    except Exception as e:
+        return respond({"error": str(e)}, 500)
 
-        return jsonify({"result": result}), 200
 
+# EVALUACIÓN DE INTERPOLANTES REGISTRADOS
+@app.route("/evaluate/<interpolant_id>", methods=["POST"])
+def evaluate_interpolant(interpolant_id):
+    try:
+        import numpy as np
+        # Puntos como JSON {"x": [...]} o binarios (float64 little-endian) con las opciones en la URL
+        binary = request.mimetype == "application/octet-stream"
+        if binary:
+            x_values = np.frombuffer(request.get_data(), dtype="<f8")
+            options = request.args
+            derivatives = options.get("derivatives")
+            derivatives = derivatives.split(",") if derivatives else []
+        else:
+            options = request.get_json(force=True)
+            x_values = options.get("x")
+            if x_values is None:
+                return respond({"error": "x is required"}, 400)
+            derivatives = options.get("derivatives") or []
+            if not isinstance(derivatives, list):
+                derivatives = [derivatives]
+
+        result = evaluate(interpolant_id, x_values, derivatives)
+
+        # Respuesta binaria (por defecto si los puntos llegaron en binario): un bloque
+        # por columna, primero los valores y luego cada derivada. Cada bloque es
+        # puntos x series (varias series y, p. ej. Vandermonde con varios vectores y);
+        # con una sola serie queda de forma columnas x puntos, como antes
+        response_format = options.get("format", "binary" if binary else "json")
+        if response_format == "binary" or "application/octet-stream" in request.headers.get("Accept", ""):
+            columns = ["values"] + [f"derivative_{order}" for order in result["derivatives"]]
+            table = np.stack([result["values"]] + list(result["derivatives"].values()))
+            series = table.shape[2] if table.ndim == 3 else 1
+            return Response(table.astype("<f8").tobytes(), mimetype="application/octet-stream",
+                            headers={"X-Shape": ",".join(str(size) for size in table.shape),
+                                     "X-Columns": ",".join(columns),
+                                     "X-Series": str(series)})
+
+        return respond({"result": {
+            "id": interpolant_id,
+            "points": int(result["values"].shape[0]),
+            "values": result["values"],
+            "derivatives": {str(order): values for order, values in result["derivatives"].items()},
+        }}, 200)
+
+    except KeyError as ke:
+        return respond({"error": ke.args[0]}, 404)
     except ValueError as ve:
-        return jsonify({"error": str(ve)}), 400
+        return respond({"error": str(ve)}, 400)
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return respond({"error": str(e)}, 500)
 
 
 @app.route("/plot", methods=["POST"])
@@ -522,63 +842,61 @@ def plot_function():
         import matplotlib
         matplotlib.use('Agg')  # Backend sin GUI
         import matplotlib.pyplot as plt
-        import sympy as sp
         import base64
         import io
         
-        data = request.get_json(force=True)
+        with stage("parse"):
+            data = request.get_json(force=True)
         function_text = data.get("function_text")
         x_min = data.get("x_min", -10)
         x_max = data.get("x_max", 10)
         
         if not function_text:
-            return jsonify({"error": "Function text is required"}), 400
+            return respond({"error": "Function text is required"}, 400)
             
-        # Convertir la función de texto a función evaluable
-        x = sp.Symbol('x')
+        # Convertir la función de texto a función evaluable (compilada una sola vez)
         try:
-            # Reemplazar ** por ^ para sympy y evaluar
-            function_text_clean = function_text.replace('^', '**')
-            function_expr = sp.sympify(function_text_clean)
-            function_lambda = sp.lambdify(x, function_expr, 'numpy')
+            function_lambda = get_function(function_text, 'numpy')
         except Exception as e:
-            return jsonify({"error": f"Error parsing function: {str(e)}"}), 400
+            return respond({"error": f"Error parsing function: {str(e)}"}, 400)
         
         # Crear puntos para graficar
         x_vals = np.linspace(float(x_min), float(x_max), 1000)
         
         try:
-            y_vals = function_lambda(x_vals)
+            with stage("evaluate"):
+                y_vals = function_lambda(x_vals)
             
             # Crear la gráfica
-            plt.figure(figsize=(10, 6))
-            plt.plot(x_vals, y_vals, 'b-', linewidth=2, label=f'f(x) = {function_text}')
-            plt.axhline(y=0, color='k', linestyle='-', alpha=0.3)
-            plt.axvline(x=0, color='k', linestyle='-', alpha=0.3)
-            plt.grid(True, alpha=0.3)
-            plt.xlabel('x', fontsize=12)
-            plt.ylabel('f(x)', fontsize=12)
-            plt.title(f'Gráfica de f(x) = {function_text}', fontsize=14)
-            plt.legend()
+            with stage("plot"):
+                plt.figure(figsize=(10, 6))
+                plt.plot(x_vals, y_vals, 'b-', linewidth=2, label=f'f(x) = {function_text}')
+                plt.axhline(y=0, color='k', linestyle='-', alpha=0.3)
+                plt.axvline(x=0, color='k', linestyle='-', alpha=0.3)
+                plt.grid(True, alpha=0.3)
+                plt.xlabel('x', fontsize=12)
+                plt.ylabel('f(x)', fontsize=12)
+                plt.title(f'Gráfica de f(x) = {function_text}', fontsize=14)
+                plt.legend()
             
-            # Convertir a base64
-            buffer = io.BytesIO()
-            plt.savefig(buffer, format='png', dpi=150, bbox_inches='tight')
-            buffer.seek(0)
-            image_base64 = base64.b64encode(buffer.getvalue()).decode()
-            plt.close()
+                # Convertir a base64
+                buffer = io.BytesIO()
+                plt.savefig(buffer, format='png', dpi=150, bbox_inches='tight')
+                buffer.seek(0)
+                image_base64 = base64.b64encode(buffer.getvalue()).decode()
+                plt.close()
             
-            return jsonify({
+            return respond({
                 "success": True,
                 "image": f"data:image/png;base64,{image_base64}",
                 "function": function_text
-            }), 200
+            }, 200)
             
         except Exception as e:
-            return jsonify({"error": f"Error evaluating function: {str(e)}"}), 400
+            return respond({"error": f"Error evaluating function: {str(e)}"}, 400)
             
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return respond({"error": str(e)}, 500)
 
 
 # DERIVATIVE CALCULATOR ENDPOINT
@@ -593,55 +911,108 @@ def calculate_derivative():
         order = data.get('order', 1)
         
         if not function_text:
-            return jsonify({'error': 'Función requerida'}), 400
-        
-        # Definir la variable simbólica
-        x = sp.Symbol('x')
+            return respond({'error': 'Función requerida'}, 400)
         
         # Convertir la función de texto a expresión simbólica
         # Reemplazar ** con ^ si es necesario y manejar funciones comunes
         function_text_clean = function_text.replace('^', '**')
         
-        # Crear la expresión simbólica
-        try:
-            expr = sp.sympify(function_text_clean, locals={'x': x})
-        except:
-            # Intentar con transformaciones adicionales para funciones especiales
-            try:
-                # Mapear funciones Python a SymPy
-                function_sympy = function_text_clean
-                function_sympy = function_sympy.replace('sin(', 'sp.sin(')
-                function_sympy = function_sympy.replace('cos(', 'sp.cos(') 
-                function_sympy = function_sympy.replace('tan(', 'sp.tan(')
-                function_sympy = function_sympy.replace('exp(', 'sp.exp(')
-                function_sympy = function_sympy.replace('log(', 'sp.log(')
-                function_sympy = function_sympy.replace('sqrt(', 'sp.sqrt(')
-                expr = eval(function_sympy, {'x': x, 'sp': sp})
-            except:
-                expr = sp.sympify(function_text_clean, locals={'x': x})
-        
-        # Calcular la derivada del orden especificado
-        derivative = sp.diff(expr, x, order)
-        
-        # Convertir de vuelta a string y simplificar
-        derivative_simplified = sp.simplify(derivative)
-        derivative_str = str(derivative_simplified)
+        # Interpretar, derivar y simplificar en un proceso aislado con límite
+        # de tiempo y memoria (ver methods.symbolic)
+        derivative_str = symbolic_derivative(function_text_clean, order)
         
         # Convertir de vuelta a formato Python estándar
         derivative_str = derivative_str.replace('**', '**')
         
-        return jsonify({
+        return respond({
             'derivative': derivative_str,
             'original_function': function_text,
             'order': order,
             'success': True
         })
         
+    except SymbolicLimitError as le:
+        return respond({
+            'error': f'Error al calcular la derivada: {str(le)}',
+            'success': False
+        }, 400)
     except Exception as e:
-        return jsonify({
+        return respond({
             'error': f'Error al calcular la derivada: {str(e)}',
             'success': False
-        }), 500
+        }, 500)
+
+
+# TRABAJOS EN SEGUNDO PLANO
+# Cualquier ruta de cálculo se puede enviar como trabajo: POST /jobs/calculate/sor
+# con el mismo cuerpo que /calculate/sor. Se ejecuta en un proceso aparte y se
+# consulta con GET /jobs/<id> (?wait= segundos para esperar el resultado).
+jobs = JobQueue("main")
+JOB_PATHS = ("/calculate/", "/api/derivative", "/plot")
+
+
+@app.route("/jobs/<path:path>", methods=["POST"])
+def submit_job(path):
+    try:
+        path = "/" + path
+        try:
+            if not path.startswith(JOB_PATHS):
+                raise NotFound()
+            app.url_map.bind("localhost").match(path, method="POST")
+        except HTTPException:
+            return respond({"error": f"No calculation route at '{path}'"}, 404)
+
+        query = request.args.to_dict()
+        timeout = query.pop("timeout", None)
+        job = jobs.submit(path, request.get_data(), request.content_type or "", query, timeout)
+
+        response = respond({"job": job}, 202)
+        response.headers["Location"] = f"/jobs/{job['id']}"
+        return response
+
+    except OverflowError as oe:
+        return respond({"error": str(oe)}, 503)
+    except ValueError as ve:
+        return respond({"error": str(ve)}, 400)
+    except Exception as e:
+        return respond({"error": str(e)}, 500)
+
+
+@app.route("/jobs/<job_id>", methods=["GET"])
+def get_job(job_id):
+    try:
+        job = jobs.get(job_id, wait=request.args.get("wait", 0.0, type=float),
+                       since=request.args.get("since", type=int))
+        return respond({"job": job}, 200)
+    except KeyError as ke:
+        return respond({"error": ke.args[0]}, 404)
+    except Exception as e:
+        return respond({"error": str(e)}, 500)
+
+
+@app.route("/jobs/<job_id>", methods=["DELETE"])
+def cancel_job(job_id):
+    try:
+        return respond({"job": jobs.cancel(job_id)}, 200)
+    except KeyError as ke:
+        return respond({"error": ke.args[0]}, 404)
+    except Exception as e:
+        return respond({"error": str(e)}, 500)
+
+
+# Aciertos y tamaño de las cachés, leídos en cada consulta a /metrics
+metrics.cache_collector(lambda: dict(cache_stats(), interpolants=registry_stats(), operators=operator_stats()))
+
+# ?profile=cpu|memory en todas las rutas (requiere METHODLAB_ADMIN_TOKEN, ver methods.profiling)
+enable_profiling(app)
+
+
+# Arranque: tiempos para /stats/startup y precalentamiento (METHODLAB_WARMUP,
+# ver methods.warmup.install) en el proceso que atiende las peticiones. Con el
+# recargador de desarrollo es el hijo (WERKZEUG_RUN_MAIN), que recibe el socket
+# ya abierto; con un servidor WSGI, cada worker que importa la app
+install_warm_up(app, _import_started,
+                serving=__name__ != "__main__" or os.environ.get("WERKZEUG_RUN_MAIN") == "true")
 
 
 if __name__ == "__main__":
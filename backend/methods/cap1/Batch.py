@@ -0,0 +1,352 @@
+import numpy as np
+
+from methods.expression_cache import get_function
+from methods.symbolic import SymbolicLimitError
+
+
+def _compile(function_text, label):
+    try:
+        f = get_function(function_text, 'numpy')
+    except SymbolicLimitError:
+        raise
+    except Exception:
+        raise ValueError(f"Invalid {label} expression")
+
+    def vectorized(values):
+        # Las expresiones constantes devuelven un escalar: se expande a cada carril
+        with np.errstate(all='ignore'):
+            out = np.asarray(f(values))
+        if np.iscomplexobj(out):
+            out = np.where(out.imag == 0, out.real, np.nan)
+        return np.broadcast_to(out.astype(float, copy=False), values.shape)
+
+    return vectorized
+
+
+def _lanes(*values):
+    try:
+        arrays = np.broadcast_arrays(*[np.atleast_1d(np.asarray(v, dtype=float)) for v in values])
+    except ValueError:
+        raise ValueError("All lane arrays must have the same length")
+    if arrays[0].ndim != 1:
+        raise ValueError("Lane arrays must be one-dimensional")
+    return [a.copy() for a in arrays]
+
+
+def _validate(tol, max_count):
+    if max_count < 0:
+        raise ValueError(f"Max iterations is < 0: iterations = {max_count}")
+    if tol < 0:
+        raise ValueError(f"tol is an incorrect value: tol = {tol}")
+
+
+def _finish(status, roots, counts, errors, max_count, root_label='x'):
+    """
+    Construye el resultado por carril a partir de los códigos de estado.
+
+    Códigos: 'root' (f = 0), 'approx' (error <= tol), 'max' (sin converger),
+    o cualquier otro texto, que se usa tal cual como conclusión.
+    """
+    converged = np.isin(status, ['root', 'approx'])
+    # Se pasa a tipos de Python una sola vez: formatear escalares de NumPy es lento
+    root_list = np.where(converged, roots, np.nan).tolist()
+    count_list = counts.tolist()
+
+    conclusions = []
+    for state, root, count in zip(status.tolist(), root_list, count_list):
+        label = root_label if root_label != 'x' else f"x{count}"
+        if state == 'root':
+            conclusions.append(f"The root was found for {label} = {root:.15f}")
+        elif state == 'approx':
+            conclusions.append(f"An approximation of the root was found for {label} = {root:.15f}")
+        elif state == 'max':
+            conclusions.append(f"Failed to converge after {max_count} iterations")
+        else:
+            conclusions.append(state)
+
+    finite_errors = np.isfinite(errors)
+    return {
+        'lanes': len(status),
+        'roots': [r if c else None for r, c in zip(root_list, converged.tolist())],
+        'iterations': count_list,
+        'errors': np.where(finite_errors, errors, None).tolist(),
+        'converged': converged.tolist(),
+        'conclusions': conclusions,
+    }
+
+
+def _classify(status, fvals, errors, tol, counts, max_count):
+    """Asigna la conclusión a los carriles que siguen sin estado al terminar."""
+    pending = status == ''
+    status[pending & ~np.isfinite(fvals)] = "The method exploded"
+    pending = status == ''
+    status[pending & (fvals == 0)] = 'root'
+    status[pending & (fvals != 0) & (errors <= tol)] = 'approx'
+    pending = status == ''
+    status[pending & (counts >= max_count)] = 'max'
+    status[status == ''] = "The method exploded"
+
+
+def bisection_batch(function_text, a, b, tol, max_count):
+    """
+    Bisección sobre muchos intervalos a la vez.
+
+    Todos los carriles avanzan en paralelo como operaciones de arreglos y
+    cada uno se retira cuando cumple su propio criterio de parada.
+
+    Args:
+        function_text (str): Función f(x)
+        a, b (array-like): Extremos de cada intervalo (o escalares)
+        tol (float): Tolerancia
+        max_count (int): Máximo de iteraciones
+
+    Returns:
+        dict: Raíz, iteraciones, error y conclusión de cada carril
+    """
+    _validate(tol, max_count)
+    f = _compile(function_text, 'function')
+    a, b = _lanes(a, b)
+    n = a.size
+
+    status = np.full(n, '', dtype=object)
+    counts = np.zeros(n, dtype=int)
+    errors = np.full(n, np.inf)
+
+    fi = f(a).copy()
+    fs = f(b).copy()
+    status[~np.isfinite(fi) | ~np.isfinite(fs)] = "a or b isn't defined in the function domain"
+    ok = status == ''
+    roots = np.where(fi == 0, a, np.where(fs == 0, b, np.nan))
+    status[ok & ((fi == 0) | (fs == 0))] = 'root'
+    errors[ok & ((fi == 0) | (fs == 0))] = 0.0
+    status[(status == '') & (fi * fs > 0)] = "The interval is inadequate; function does not change sign"
+
+    xm = (a + b) / 2
+    fm = f(xm).copy()
+
+    active = np.flatnonzero((status == '') & (fm != 0) & (max_count > 0))
+    while active.size:
+        left = fi[active] * fm[active] < 0
+        go_left = active[left]
+        go_right = active[~left]
+        b[go_left] = xm[go_left]
+        fs[go_left] = fm[go_left]
+        a[go_right] = xm[go_right]
+        fi[go_right] = fm[go_right]
+
+        xa = xm[active]
+        xm[active] = (a[active] + b[active]) / 2
+        fm[active] = f(xm[active])
+        errors[active] = np.abs(xm[active] - xa)
+        counts[active] += 1
+
+        keep = ((errors[active] > tol) & (fm[active] != 0)
+                & (counts[active] < max_count) & np.isfinite(fm[active]))
+        active = active[keep]
+
+    pending = status == ''
+    roots[pending] = xm[pending]
+    _classify(status, fm, errors, tol, counts, max_count)
+    return _finish(status, roots, counts, errors, max_count)
+
+
+def false_position_batch(function_text, a, b, tol, max_count):
+    """Regla falsa sobre muchos intervalos a la vez (ver bisection_batch)."""
+    _validate(tol, max_count)
+    f = _compile(function_text, 'function')
+    a, b = _lanes(a, b)
+    n = a.size
+
+    status = np.full(n, '', dtype=object)
+    counts = np.zeros(n, dtype=int)
+    errors = np.full(n, np.inf)
+
+    status[a >= b] = "a has to be less than b"
+    fa = f(a).copy()
+    fb = f(b).copy()
+    status[(status == '') & (~np.isfinite(fa) | ~np.isfinite(fb))] = "a or b isn't defined in the function domain"
+    ok = status == ''
+    roots = np.where(fa == 0, a, np.where(fb == 0, b, np.nan))
+    status[ok & ((fa == 0) | (fb == 0))] = 'root'
+    errors[ok & ((fa == 0) | (fb == 0))] = 0.0
+    status[(status == '') & (fa * fb > 0)] = "The interval is inadequate; function does not change sign"
+
+    with np.errstate(all='ignore'):
+        xr = b - fb * (b - a) / (fb - fa)
+    fxr = f(xr).copy()
+
+    active = np.flatnonzero((status == '') & (max_count > 0))
+    while active.size:
+        to_b = fa[active] * fxr[active] < 0
+        to_a = ~to_b & (fb[active] * fxr[active] < 0)
+        # Si ninguno cambia de signo, f(xr) = 0: raíz exacta
+        moving = to_b | to_a
+        idx_b = active[to_b]
+        idx_a = active[to_a]
+        b[idx_b] = xr[idx_b]
+        fb[idx_b] = fxr[idx_b]
+        a[idx_a] = xr[idx_a]
+        fa[idx_a] = fxr[idx_a]
+
+        active = active[moving]
+        temp = xr[active]
+        with np.errstate(all='ignore'):
+            xr[active] = b[active] - fb[active] * (b[active] - a[active]) / (fb[active] - fa[active])
+        fxr[active] = f(xr[active])
+        errors[active] = np.abs(xr[active] - temp)
+        counts[active] += 1
+
+        keep = (errors[active] > tol) & (counts[active] < max_count) & np.isfinite(fxr[active])
+        active = active[keep]
+
+    pending = status == ''
+    roots[pending] = xr[pending]
+    _classify(status, fxr, errors, tol, counts, max_count)
+    return _finish(status, roots, counts, errors, max_count, root_label='m')
+
+
+def newton_batch(function_text, derivative_text, x0, tol, max_count):
+    """Newton-Raphson desde muchos puntos iniciales a la vez."""
+    _validate(tol, max_count)
+    f = _compile(function_text, 'function')
+    df = _compile(derivative_text, 'derivative')
+    (x,) = _lanes(x0)
+    n = x.size
+
+    status = np.full(n, '', dtype=object)
+    counts = np.zeros(n, dtype=int)
+    errors = np.full(n, np.inf)
+
+    fx = f(x).copy()
+    dfx = df(x).copy()
+    status[~np.isfinite(fx) | ~np.isfinite(dfx)] = "x0 isn't defined in the function or derivative domain"
+
+    active = np.flatnonzero((status == '') & (fx != 0) & (dfx != 0) & (max_count > 0))
+    while active.size:
+        x_old = x[active]
+        x[active] = x_old - fx[active] / dfx[active]
+        fx[active] = f(x[active])
+        dfx[active] = df(x[active])
+        errors[active] = np.abs(x[active] - x_old)
+        counts[active] += 1
+
+        keep = ((errors[active] > tol) & (fx[active] != 0) & (dfx[active] != 0)
+                & (counts[active] < max_count) & np.isfinite(x[active]))
+        active = active[keep]
+
+    _classify(status, fx, errors, tol, counts, max_count)
+    return _finish(status, x, counts, errors, max_count)
+
+
+def secant_batch(function_text, x0, x1, tol, max_count):
+    """Secante desde muchos pares de semillas a la vez."""
+    _validate(tol, max_count)
+    f = _compile(function_text, 'function')
+    x0, x1 = _lanes(x0, x1)
+    n = x0.size
+
+    status = np.full(n, '', dtype=object)
+    counts = np.zeros(n, dtype=int)
+    errors = np.full(n, np.inf)
+
+    fx0 = f(x0).copy()
+    fx1 = f(x1).copy()
+    status[~np.isfinite(fx0) | ~np.isfinite(fx1)] = "x0 or x1 isn't defined in the function domain"
+
+    active = np.flatnonzero((status == '') & (fx1 != 0) & (max_count > 0))
+    while active.size:
+        flat = np.abs(fx1[active] - fx0[active]) < 1e-20
+        status[active[flat]] = "Division by zero occurred - possible same function values at points"
+        active = active[~flat]
+
+        x2 = x1[active] - fx1[active] * (x1[active] - x0[active]) / (fx1[active] - fx0[active])
+        fx2 = f(x2)
+        errors[active] = np.abs(x2 - x1[active])
+        counts[active] += 1
+        x0[active], x1[active] = x1[active], x2
+        fx0[active], fx1[active] = fx1[active], fx2
+
+        keep = ((errors[active] > tol) & (fx1[active] != 0)
+                & (counts[active] < max_count) & np.isfinite(fx1[active]))
+        active = active[keep]
+
+    _classify(status, fx1, errors, tol, counts, max_count)
+    return _finish(status, x1, counts, errors, max_count)
+
+
+def fixed_point_batch(function_text, g_function_text, x0, tol, max_count):
+    """Punto fijo desde muchos puntos iniciales a la vez."""
+    _validate(tol, max_count)
+    f = _compile(function_text, 'function')
+    g = _compile(g_function_text, 'g(x)')
+    (x,) = _lanes(x0)
+    n = x.size
+
+    status = np.full(n, '', dtype=object)
+    counts = np.zeros(n, dtype=int)
+    errors = np.full(n, np.inf)
+
+    gx = g(x).copy()
+    fx = f(x).copy()
+    status[~np.isfinite(gx)] = "x0 isn't defined in the domain of g(x)"
+
+    active = np.flatnonzero((status == '') & (fx != 0) & (max_count > 0))
+    while active.size:
+        x_next = gx[active]
+        errors[active] = np.abs(x_next - x[active])
+        x[active] = x_next
+        fx[active] = f(x_next)
+        gx[active] = g(x_next)
+        counts[active] += 1
+
+        keep = ((errors[active] > tol) & (fx[active] != 0)
+                & (counts[active] < max_count) & np.isfinite(gx[active]))
+        active = active[keep]
+
+    _classify(status, fx, errors, tol, counts, max_count)
+    return _finish(status, x, counts, errors, max_count)
+
+
+def multiple_roots_batch(function_text, first_derivate_text, second_derivate_text, x0, tol, max_count):
+    """Raíces múltiples (Newton modificado) desde muchos puntos iniciales a la vez."""
+    _validate(tol, max_count)
+    f = _compile(function_text, 'function')
+    f1 = _compile(first_derivate_text, 'first derivative')
+    f2 = _compile(second_derivate_text, 'second derivative')
+    (x,) = _lanes(x0)
+    n = x.size
+
+    status = np.full(n, '', dtype=object)
+    counts = np.zeros(n, dtype=int)
+    errors = np.full(n, np.inf)
+
+    fx = f(x).copy()
+    fxp = f1(x).copy()
+    fxs = f2(x).copy()
+    status[~np.isfinite(fx) | ~np.isfinite(fxp) | ~np.isfinite(fxs)] = (
+        "x0 isn't defined in the domain of the function or its derivatives")
+    d = fxp ** 2 - fx * fxs
+
+    active = np.flatnonzero((status == '') & (d != 0) & (max_count > 0))
+    while active.size:
+        x_old = x[active]
+        x_ev = x_old - fx[active] * fxp[active] / d[active]
+        blown = np.isinf(x_ev)
+        status[active[blown]] = "Infinity value in the iteration"
+        active = active[~blown]
+        x_old = x_old[~blown]
+        x[active] = x_ev[~blown]
+
+        fx[active] = f(x[active])
+        fxp[active] = f1(x[active])
+        fxs[active] = f2(x[active])
+        d[active] = fxp[active] ** 2 - fx[active] * fxs[active]
+        errors[active] = np.abs(x[active] - x_old)
+        counts[active] += 1
+
+        keep = ((errors[active] > tol) & (d[active] != 0)
+                & (counts[active] < max_count) & np.isfinite(d[active]))
+        active = active[keep]
+
+    _classify(status, fx, errors, tol, counts, max_count)
+    return _finish(status, x, counts, errors, max_count)
@@ -1,8 +1,17 @@
-from sympy import sympify, lambdify, Symbol
+from methods.expression_cache import get_function
+from methods.symbolic import SymbolicLimitError
+from methods.streaming import exhaust
+from methods.history import IterationHistory, raw, fixed10, scientific2
 
-def bisection_method(function_text, a, b, tol, max_count):
+COLUMNS = [('a', fixed10), ('xm', fixed10), ('b', fixed10), ('f(xm)', scientific2), ('error', scientific2)]
+# Fila única cuando la raíz es un extremo: valores sin formato, como antes de
+# IterationHistory (f(xm) y error son 0 y no "0.00e+00")
+ENDPOINT_COLUMNS = [(name, raw) for name, _ in COLUMNS]
+
+def bisection_iter(function_text, a, b, tol, max_count, history=None):
+    """Versión generadora: produce la tabla de iteraciones tras cada fila y devuelve el resultado."""
     results = {
-        'iterations': [],
+        'iterations': IterationHistory(COLUMNS, history, capacity=max_count + 1),
         'conclusion': None
     }
 
@@ -15,10 +24,11 @@ def bisection_method(function_text, a, b, tol, max_count):
         return results
 
     # Preparar la función
-    x = Symbol('x')
     try:
-        expr = sympify(function_text)
-        f = lambdify(x, expr, 'math')
+        f = get_function(function_text)
+    except SymbolicLimitError as le:
+        results['conclusion'] = str(le)
+        return results
     except:
         results['conclusion'] = "Invalid function expression"
         return results
@@ -33,11 +43,15 @@ def bisection_method(function_text, a, b, tol, max_count):
 
     # Casos especiales (raíces en los extremos)
     if fi == 0:
-        results['iterations'].append([0, a, a, b, 0, 0])
+        results['iterations'] = IterationHistory(ENDPOINT_COLUMNS, history)
+        results['iterations'].append(0, a, a, b, 0, 0)
+        yield results['iterations']
         results['conclusion'] = f"The root was found for x = {a:.15f}"
         return results
     if fs == 0:
-        results['iterations'].append([0, a, b, b, 0, 0])
+        results['iterations'] = IterationHistory(ENDPOINT_COLUMNS, history)
+        results['iterations'].append(0, a, b, b, 0, 0)
+        yield results['iterations']
         results['conclusion'] = f"The root was found for x = {b:.15f}"
         return results
     if fi * fs > 0:
@@ -50,14 +64,8 @@ def bisection_method(function_text, a, b, tol, max_count):
     fm = f(xm)
 
     # Primera iteración
-    results['iterations'].append([
-        count,
-        round(a, 10),
-        round(xm, 10),
-        round(b, 10),
-        "{:.2e}".format(fm),
-        ""
-    ])
+    results['iterations'].append(count, a, xm, b, fm, None)
+    yield results['iterations']
 
     while error > tol and abs(fm) != 0 and count < max_count:
         if fi * fm < 0:
@@ -74,14 +82,8 @@ def bisection_method(function_text, a, b, tol, max_count):
         count += 1
 
         # Agregar datos de la iteración
-        results['iterations'].append([
-            count,
-            round(a,10),
-            round(xm,10),
-            round(b,10),
-            "{:.2e}".format(fm),
-            "{:.2e}".format(error)
-        ])
+        results['iterations'].append(count, a, xm, b, fm, error)
+        yield results['iterations']
 
     # Determinar conclusión
     if abs(fm) == 0:
@@ -93,4 +95,8 @@ def bisection_method(function_text, a, b, tol, max_count):
     else:
         results['conclusion'] = "The method exploded"
 
-    return results
\ No newline at end of file
+    return results
+
+
+def bisection_method(function_text, a, b, tol, max_count, history=None):
+    return exhaust(bisection_iter(function_text, a, b, tol, max_count, history))
@@ -1,8 +1,20 @@
-from sympy import sympify, lambdify, Symbol
+from methods.expression_cache import get_function, get_derivatives
+from methods.symbolic import SymbolicLimitError
+from methods.streaming import exhaust
+from methods.history import IterationHistory, decimal10, scientific2
 
-def newton_method(function_text, derivative_text, x0, tol, max_count):
+COLUMNS = [('x', decimal10), ('f(x)', scientific2), ("f'(x)", scientific2), ('error', scientific2)]
+
+def newton_iter(function_text, derivative_text, x0, tol, max_count, history=None):
+    """
+    Versión generadora: produce la tabla de iteraciones tras cada fila y devuelve el resultado.
+
+    Si derivative_text es None, f' se obtiene simbólicamente y f, f' se
+    evalúan juntas (ver get_derivatives); la derivada usada va en
+    results['derivatives'].
+    """
     results = {
-        'iterations': [],
+        'iterations': IterationHistory(COLUMNS, history, capacity=max_count + 1),
         'conclusion': None
     }
 
@@ -13,19 +25,23 @@ def newton_method(function_text, derivative_text, x0, tol, max_count):
         results['conclusion'] = f"tol is an incorrect value: tol = {tol}"
         return results
 
-    x = Symbol('x')
     try:
-        expr = sympify(function_text)
-        f = lambdify(x, expr, 'math')
-        df_expr = sympify(derivative_text)
-        df = lambdify(x, df_expr, 'math')
+        if derivative_text is None:
+            f_df, texts = get_derivatives(function_text, 1)
+            results['derivatives'] = {'first': texts[0]}
+        else:
+            f = get_function(function_text)
+            df = get_function(derivative_text)
+            f_df = lambda t: (f(t), df(t))
+    except SymbolicLimitError as le:
+        results['conclusion'] = str(le)
+        return results
     except:
         results['conclusion'] = "Invalid function or derivative expression"
         return results
 
     try:
-        fx = f(x0)
-        dfx = df(x0)
+        fx, dfx = f_df(x0)
     except:
         results['conclusion'] = "x0 isn't defined in the function or derivative domain"
         return results
@@ -33,13 +49,8 @@ def newton_method(function_text, derivative_text, x0, tol, max_count):
     count = 0
     error = tol + 1
 
-    results['iterations'].append([
-        count,
-        "{:.10f}".format(x0),
-        "{:.2e}".format(fx),
-        "{:.2e}".format(dfx),
-        ""
-    ])
+    results['iterations'].append(count, x0, fx, dfx, None)
+    yield results['iterations']
 
     while error > tol and abs(fx) != 0 and abs(dfx) != 0 and count < max_count:
         try:
@@ -48,18 +59,12 @@ def newton_method(function_text, derivative_text, x0, tol, max_count):
             results['conclusion'] = "Division by zero occurred in derivative"
             return results
 
-        fx1 = f(x1)
-        dfx1 = df(x1)
+        fx1, dfx1 = f_df(x1)
         error = abs(x1 - x0)
 
         count += 1
-        results['iterations'].append([
-            count,
-            "{:.10f}".format(x1),
-            "{:.2e}".format(fx1),
-            "{:.2e}".format(dfx1),
-            "{:.2e}".format(error)
-        ])
+        results['iterations'].append(count, x1, fx1, dfx1, error)
+        yield results['iterations']
 
         x0 = x1
         fx = fx1
@@ -74,4 +79,8 @@ def newton_method(function_text, derivative_text, x0, tol, max_count):
     else:
         results['conclusion'] = "The method exploded"
 
-    return results
\ No newline at end of file
+    return results
+
+
+def newton_method(function_text, derivative_text, x0, tol, max_count, history=None):
+    return exhaust(newton_iter(function_text, derivative_text, x0, tol, max_count, history))
@@ -1,10 +1,40 @@
-from sympy import sympify, lambdify, Symbol
+from methods.expression_cache import get_function
+from methods.symbolic import SymbolicLimitError
+from methods.streaming import exhaust
+from methods.history import IterationHistory, scientific10, scientific2
 import math
 
-def fixed_point_method(function_text, g_function_text, x0, tol, max_count):
+COLUMNS = [('x', scientific10), ('g(x)', scientific2), ('f(x)', scientific2), ('error', scientific2)]
+
+# Aceleración Δ² de la sucesión x_{k+1} = g(x_k):
+# 'aitken' extrapola la sucesión de punto fijo sin modificarla (un g por iteración)
+# 'steffensen' reinicia cada paso desde el valor extrapolado (dos g por
+# iteración, convergencia cuadrática)
+ACCELERATIONS = ('none', 'aitken', 'steffensen')
+
+
+def delta_squared(x0, x1, x2):
+    """Extrapolación de Aitken de tres iterados; None si el denominador es 0."""
+    denominator = x2 - 2 * x1 + x0
+    if denominator == 0 or not math.isfinite(denominator):
+        return None
+    return x0 - (x1 - x0) ** 2 / denominator
+
+
+def fixed_point_iter(function_text, g_function_text, x0, tol, max_count, history=None, acceleration='none'):
+    """
+    Versión generadora: produce la tabla de iteraciones tras cada fila y devuelve el resultado.
+
+    Con acceleration='aitken' la columna x es el valor extrapolado y g(x)
+    queda vacía (g solo se evalúa sobre la sucesión sin acelerar); con
+    'steffensen', g(x) es g en el nuevo punto. Cada valor de g se reutiliza
+    en la iteración siguiente; 'evaluations' cuenta las llamadas a g y f.
+    """
     results = {
-        'iterations': [],
-        'conclusion': None
+        'iterations': IterationHistory(COLUMNS, history, capacity=max_count + 1),
+        'conclusion': None,
+        'acceleration': acceleration,
+        'evaluations': None,  # llamadas a g y f, y a g por iteración
     }
 
     # Validaciones iniciales
@@ -14,61 +44,86 @@ def fixed_point_method(function_text, g_function_text, x0, tol, max_count):
     if tol < 0:
         results['conclusion'] = f"tol is an incorrect value: tol = {tol}"
         return results
+    if acceleration not in ACCELERATIONS:
+        results['conclusion'] = f"Invalid acceleration: '{acceleration}'. Use one of {', '.join(ACCELERATIONS)}"
+        return results
 
     # Preparar las funciones usando sympy
-    x = Symbol('x')
     try:
-        f_expr = sympify(function_text)  # f(x)
-        f = lambdify(x, f_expr, 'math')
-        g_expr = sympify(g_function_text)  # g(x)
-        g = lambdify(x, g_expr, 'math')
+        f = get_function(function_text)  # f(x)
+        g = get_function(g_function_text)  # g(x)
+    except SymbolicLimitError as le:
+        results['conclusion'] = str(le)
+        return results
     except Exception:
         results['conclusion'] = "Invalid function or transformation (g(x)) expression"
         return results
 
+    calls = {'g': 0, 'f': 0}
+
+    def counted(name, fn):
+        def call(x):
+            calls[name] += 1
+            return fn(x)
+        return call
+
+    f = counted('f', f)
+    g = counted('g', g)
+    count = 0
+
+    def finish():
+        results['evaluations'] = dict(calls, g_per_iteration=calls['g'] / count if count else None)
+        return results
+
     # Verificar si x0 está en el dominio de g(x)
     try:
-        x_next = g(x0)
+        gx = g(x0)
     except Exception:
         results['conclusion'] = f"x0 isn't defined in the domain of g(x): x0 = {x0}"
-        return results
+        return finish()
 
-    count = 0
     err = tol + 1
     fx = f(x0)
 
     # Primera iteración
-    gx0 = g(x0)
-    results['iterations'].append([
-        count,
-        f"{x0:.10e}",
-        f"{gx0:.2e}",
-        f"{fx:.2e}",
-        ""
-    ])
+    results['iterations'].append(count, x0, gx, fx, None)
+    yield results['iterations']
 
+    # Aitken: dos últimos términos de la sucesión sin acelerar
+    plain_previous, plain = x0, gx
+    x_next = gx
     while err > tol and abs(fx) != 0 and count < max_count:
         try:
-            x_next = g(x0)
+            if acceleration == 'none':
+                x_next = gx
+                gx = g(x_next)
+            elif acceleration == 'steffensen':
+                # Δ² sobre (x, g(x), g(g(x))); si no se puede, paso simple
+                ggx = g(gx)
+                x_next = delta_squared(x0, gx, ggx)
+                if x_next is None:
+                    x_next = ggx
+                gx = g(x_next)
+            else:
+                plain_next = g(plain)
+                x_next = delta_squared(plain_previous, plain, plain_next)
+                if x_next is None:
+                    x_next = plain_next
+                plain_previous, plain = plain, plain_next
+                gx = None
         except Exception:
             results['conclusion'] = f"x{count + 1} isn't defined in the domain of g(x): x{count + 1} = {x_next}"
-            return results
+            return finish()
 
         err = abs(x_next - x0)
         fx = f(x_next)
-        gx_next = g(x_next)
 
         count += 1
         x0 = x_next
 
         # Registrar datos de la iteración
-        results['iterations'].append([
-            count,
-            f"{x0:.10e}",
-            f"{gx_next:.2e}",
-            f"{fx:.2e}",
-            f"{err:.2e}"
-        ])
+        results['iterations'].append(count, x0, gx, fx, err)
+        yield results['iterations']
 
     # Determinar conclusión
     if abs(fx) == 0:
@@ -80,4 +135,8 @@ def fixed_point_method(function_text, g_function_text, x0, tol, max_count):
     else:
         results['conclusion'] = "The method exploded"
 
-    return results
\ No newline at end of file
+    return finish()
+
+
+def fixed_point_method(function_text, g_function_text, x0, tol, max_count, history=None, acceleration='none'):
+    return exhaust(fixed_point_iter(function_text, g_function_text, x0, tol, max_count, history, acceleration))
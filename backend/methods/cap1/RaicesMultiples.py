@@ -1,9 +1,21 @@
 import math
-from sympy import sympify, lambdify, Symbol
+from methods.expression_cache import get_function, get_derivatives
+from methods.symbolic import SymbolicLimitError
+from methods.streaming import exhaust
+from methods.history import IterationHistory, scientific10, scientific2
 
-def multiple_roots_method(function_text, first_derivate_text, second_derivate_text, x0, tol, max_count):
+COLUMNS = [('x', scientific10), ('f(x)', scientific2), ('error', scientific2)]
+
+def multiple_roots_iter(function_text, first_derivate_text, second_derivate_text, x0, tol, max_count,
+                          history=None):
+    """
+    Versión generadora: produce la tabla de iteraciones tras cada fila y devuelve el resultado.
+
+    Si las derivadas son None, f' y f'' se obtienen simbólicamente y se
+    evalúan junto con f (ver get_derivatives); van en results['derivatives'].
+    """
     results = {
-        'iterations': [],
+        'iterations': IterationHistory(COLUMNS, history, capacity=max_count + 1),
         'conclusion': None
     }
 
@@ -16,23 +28,25 @@ def multiple_roots_method(function_text, first_derivate_text, second_derivate_te
         return results
 
     # Preparar las funciones usando sympy
-    x = Symbol('x')
     try:
-        f_expr = sympify(function_text)
-        f = lambdify(x, f_expr, 'math')
-        f1_expr = sympify(first_derivate_text)
-        f1 = lambdify(x, f1_expr, 'math')
-        f2_expr = sympify(second_derivate_text)
-        f2 = lambdify(x, f2_expr, 'math')
+        if first_derivate_text is None or second_derivate_text is None:
+            f_derivatives, texts = get_derivatives(function_text, 2)
+            results['derivatives'] = {'first': texts[0], 'second': texts[1]}
+        else:
+            f = get_function(function_text)
+            f1 = get_function(first_derivate_text)
+            f2 = get_function(second_derivate_text)
+            f_derivatives = lambda t: (f(t), f1(t), f2(t))
+    except SymbolicLimitError as le:
+        results['conclusion'] = str(le)
+        return results
     except Exception:
         results['conclusion'] = "Invalid function or derivative expression"
         return results
 
     # Verificar si x0 está en el dominio de la función y derivadas
     try:
-        f_x = f(x0)
-        f_xp = f1(x0)
-        f_xs = f2(x0)
+        f_x, f_xp, f_xs = f_derivatives(x0)
     except Exception:
         results['conclusion'] = f"x0 isn't defined in the domain of the function or its derivatives: x0 = {x0}"
         return results
@@ -41,12 +55,8 @@ def multiple_roots_method(function_text, first_derivate_text, second_derivate_te
     d = f_xp**2 - f_x * f_xs
     cont = 0
 
-    results['iterations'] = [[
-        cont,
-        f"{x0:.10e}",
-        f"{f_x:.2e}",
-        ""
-    ]]
+    results['iterations'].append(cont, x0, f_x, None)
+    yield results['iterations']
 
     while err > tol and d != 0 and cont < max_count:
         try:
@@ -60,9 +70,7 @@ def multiple_roots_method(function_text, first_derivate_text, second_derivate_te
             return results
 
         try:
-            f_x = f(x_ev)
-            f_xp = f1(x_ev)
-            f_xs = f2(x_ev)
+            f_x, f_xp, f_xs = f_derivatives(x_ev)
         except Exception:
             results['conclusion'] = f"xi isn't defined in the domain of the function or its derivatives: xi = {x_ev}"
             return results
@@ -72,12 +80,8 @@ def multiple_roots_method(function_text, first_derivate_text, second_derivate_te
         x0 = x_ev
         d = f_xp**2 - f_x * f_xs
 
-        results['iterations'].append([
-            cont,
-            f"{x0:.10e}",
-            f"{f_x:.2e}",
-            f"{err:.2e}"
-        ])
+        results['iterations'].append(cont, x0, f_x, err)
+        yield results['iterations']
 
     if abs(f_x) == 0:
         results['conclusion'] = f"The root was found for x{cont} = {x0:.15f}"
@@ -88,4 +92,9 @@ def multiple_roots_method(function_text, first_derivate_text, second_derivate_te
     else:
         results['conclusion'] = "The method exploded"
 
-    return results
\ No newline at end of file
+    return results
+
+
+def multiple_roots_method(function_text, first_derivate_text, second_derivate_text, x0, tol, max_count,
+                          history=None):
+    return exhaust(multiple_roots_iter(function_text, first_derivate_text, second_derivate_text, x0, tol, max_count, history))
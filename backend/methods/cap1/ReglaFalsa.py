@@ -1,8 +1,17 @@
-from sympy import sympify, lambdify, Symbol
-
-def false_position_method(function_text, a, b, tol, max_count):
+from methods.expression_cache import get_function
+from methods.symbolic import SymbolicLimitError
+from methods.streaming import exhaust
+from methods.history import IterationHistory, raw, fixed10, scientific2
+
+COLUMNS = [('a', fixed10), ('xr', fixed10), ('b', fixed10), ('f(xr)', scientific2), ('error', scientific2)]
+# Fila única cuando la raíz es un extremo: valores sin formato, como antes de
+# IterationHistory (f(xr) y error son 0 y no "0.00e+00")
+ENDPOINT_COLUMNS = [(name, raw) for name, _ in COLUMNS]
+
+def false_position_iter(function_text, a, b, tol, max_count, history=None):
+    """Versión generadora: produce la tabla de iteraciones tras cada fila y devuelve el resultado."""
     results = {
-        'iterations': [],
+        'iterations': IterationHistory(COLUMNS, history, capacity=max_count + 1),
         'conclusion': None
     }
 
@@ -18,10 +27,11 @@ def false_position_method(function_text, a, b, tol, max_count):
         return results
 
     # Preparar la función
-    x = Symbol('x')
     try:
-        expr = sympify(function_text)
-        f = lambdify(x, expr, 'math')
+        f = get_function(function_text)
+    except SymbolicLimitError as le:
+        results['conclusion'] = str(le)
+        return results
     except:
         results['conclusion'] = "Invalid function expression"
         return results
@@ -35,11 +45,15 @@ def false_position_method(function_text, a, b, tol, max_count):
 
     # Casos especiales (raíces en los extremos)
     if fa == 0:
-        results['iterations'].append([0, a, a, b, fa, 0])
+        results['iterations'] = IterationHistory(ENDPOINT_COLUMNS, history)
+        results['iterations'].append(0, a, a, b, fa, 0)
+        yield results['iterations']
         results['conclusion'] = f"The root was found for x = {a:.15f}"
         return results
     if fb == 0:
-        results['iterations'].append([0, a, b, b, fb, 0])
+        results['iterations'] = IterationHistory(ENDPOINT_COLUMNS, history)
+        results['iterations'].append(0, a, b, b, fb, 0)
+        yield results['iterations']
         results['conclusion'] = f"The root was found for x = {b:.15f}"
         return results
     if fa * fb > 0:
@@ -58,14 +72,8 @@ def false_position_method(function_text, a, b, tol, max_count):
     temp = 0
 
     # Primera iteración
-    results['iterations'].append([
-        count,
-        round(a, 10),
-        round(x_r, 10),
-        round(b, 10),
-        "{:.2e}".format(fx_r),
-        ""
-    ])
+    results['iterations'].append(count, a, x_r, b, fx_r, None)
+    yield results['iterations']
 
     while error > tol and count < max_count:
         if f(a) * fx_r < 0:
@@ -96,14 +104,8 @@ def false_position_method(function_text, a, b, tol, max_count):
             results['conclusion'] = "Interval endpoint isn't defined in the function domain during iteration"
             return results
 
-        results['iterations'].append([
-            count,
-            round(a, 10),
-            round(x_r, 10),
-            round(b, 10),
-            "{:.2e}".format(fx_r),
-            "{:.2e}".format(error)
-        ])
+        results['iterations'].append(count, a, x_r, b, fx_r, error)
+        yield results['iterations']
 
     print(fx_r)
     # Determinar conclusión
@@ -116,4 +118,8 @@ def false_position_method(function_text, a, b, tol, max_count):
     else:
         results['conclusion'] = "The method exploded"
 
-    return results
\ No newline at end of file
+    return results
+
+
+def false_position_method(function_text, a, b, tol, max_count, history=None):
+    return exhaust(false_position_iter(function_text, a, b, tol, max_count, history))
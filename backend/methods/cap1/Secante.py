@@ -1,8 +1,15 @@
-from sympy import sympify, lambdify, Symbol
+from methods.expression_cache import get_function
+from methods.symbolic import SymbolicLimitError
+from methods.streaming import exhaust
+from methods.history import IterationHistory, decimal10, scientific2
 
-def secant_method(function_text, x0, x1, tol, max_count):
+COLUMNS = [('x0', decimal10), ('x1', decimal10), ('f(x0)', scientific2), ('f(x1)', scientific2),
+           ('error', scientific2)]
+
+def secant_iter(function_text, x0, x1, tol, max_count, history=None):
+    """Versión generadora: produce la tabla de iteraciones tras cada fila y devuelve el resultado."""
     results = {
-        'iterations': [],
+        'iterations': IterationHistory(COLUMNS, history, capacity=max_count + 1),
         'conclusion': None
     }
 
@@ -13,10 +20,10 @@ def secant_method(function_text, x0, x1, tol, max_count):
         raise ValueError(f"tol is an incorrect value: tol = {tol}")
 
     # Preparar la función
-    x = Symbol('x')
     try:
-        expr = sympify(function_text)
-        f = lambdify(x, expr, 'math')
+        f = get_function(function_text)
+    except SymbolicLimitError:
+        raise
     except:
         raise ValueError("Invalid function expression")
 
@@ -33,14 +40,8 @@ def secant_method(function_text, x0, x1, tol, max_count):
     # Primera iteración (semillas iniciales)
     fx0 = f(x0)
     fx1 = f(x1)
-    results['iterations'].append([
-        count,
-        "{:.10f}".format(x0),
-        "{:.10f}".format(x1),
-        "{:.2e}".format(fx0),
-        "{:.2e}".format(fx1),
-        ""
-    ])
+    results['iterations'].append(count, x0, x1, fx0, fx1, None)
+    yield results['iterations']
 
     while error > tol and fx1 != 0 and count < max_count:
         if abs(fx1 - fx0) < 1e-20:  # Evitar división por cero
@@ -52,14 +53,8 @@ def secant_method(function_text, x0, x1, tol, max_count):
         error = abs(x2 - x1)
 
         count += 1
-        results['iterations'].append([
-            count,
-            "{:.10f}".format(x1),
-            "{:.10f}".format(x2),
-            "{:.2e}".format(fx1),
-            "{:.2e}".format(fx2),
-            "{:.2e}".format(error)
-        ])
+        results['iterations'].append(count, x1, x2, fx1, fx2, error)
+        yield results['iterations']
 
         # Actualizar valores para la siguiente iteración
         x0, x1 = x1, x2
@@ -77,4 +72,8 @@ def secant_method(function_text, x0, x1, tol, max_count):
     else:
         results['conclusion'] = "The method exploded"
 
-    return results
\ No newline at end of file
+    return results
+
+
+def secant_method(function_text, x0, x1, tol, max_count, history=None):
+    return exhaust(secant_iter(function_text, x0, x1, tol, max_count, history))
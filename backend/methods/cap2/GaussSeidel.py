@@ -1,17 +1,63 @@
 import numpy as np
+from scipy import sparse
+from scipy.linalg import solve_triangular
 
-def gaussSeidel_method(A, b, x0, tol, max_count, norm_type):
+from methods.metrics import stage
+from methods.streaming import exhaust
+from methods.cap2.operators import get_operators
+from methods.cap2.matrices import diagonal, lower_solver
+from methods.cap2.convergence import small_dense, needs_matrix, precheck, iterate, new_history, check_rhs
+
+def gaussSeidel_iter(A, b, x0, tol, max_count, norm_type, solver=None, include_matrices=None,
+                     precheck_mode='auto', precheck_budget=1.0, history=None):
+    """
+    Método de Gauss-Seidel
+
+    Args:
+        solver (str): 'matrix' itera x = T x + C con T = (D - L)^-1 U (vista didáctica);
+            'sweep' hace el barrido hacia adelante resolviendo (D - L) x = b + U x
+            por sustitución, sin invertir ni formar T. Por defecto 'matrix' para
+            matrices densas pequeñas y 'sweep' en otro caso (único modo con A dispersa)
+        include_matrices (bool): Devolver T y C. Por defecto solo en modo 'matrix'
+        precheck_mode (str): Pre-chequeo de convergencia ('auto', 'exact', 'power',
+            'arnoldi' o 'none'), ver methods.cap2.convergence.precheck
+        precheck_budget (float): Segundos para estimar el radio espectral
+        b, x0: Vectores de n, o matrices n x k para resolver k sistemas con la
+            misma A a la vez (ver methods.cap2.convergence.iterate_columns)
+        history: Qué iteraciones guardar ('full', 'last_n', 'every_k' o 'summary'),
+            ver methods.history.IterationHistory
+
+    Es un generador: produce la tabla de iteraciones tras cada fila y
+    devuelve el resultado; gaussSeidel_method lo ejecuta completo.
+
+    Returns:
+        dict: Matrices de iteración, iteraciones y conclusión
+    """
+    is_sparse = sparse.issparse(A)
+    if solver is None:
+        solver = 'matrix' if small_dense(A) else 'sweep'
+    if solver not in ('matrix', 'sweep'):
+        raise ValueError(f"Solver inválido: '{solver}'. Use 'matrix' o 'sweep'.")
+    if include_matrices is None:
+        include_matrices = solver == 'matrix'
+    if is_sparse and (solver == 'matrix' or include_matrices or precheck_mode == 'exact'):
+        raise ValueError("Con una matriz dispersa solo está disponible el modo 'sweep', sin matrices T y C.")
+
+    b, x0 = check_rhs(A, b, x0)
     results = {
         'C': None,
         'T': None,
         'spectral_radius': None,
-        'iterations': [],  # cada item: (iteracion, error, x)
+        'precheck': None,
+        'iterations': new_history(history, x0, max_count),  # cada item: (iteracion, error, x)
         'conclusion': None,
         'final_solution': None,
+        'columns': None,  # con b de n x k: iteraciones, error y convergencia de cada columna
+        'operator_cache': None,  # operadores de A reutilizados de una petición anterior
     }
 
     # Validaciones básicas
-    if np.any(np.diag(A) == 0):
+    if np.any(diagonal(A) == 0):
         results['conclusion'] = "La matriz A tiene un elemento diagonal cero. No se puede ejecutar el método."
         return results
     if max_count < 0:
@@ -20,50 +66,64 @@ def gaussSeidel_method(A, b, x0, tol, max_count, norm_type):
     if tol < 0:
         results['conclusion'] = f"Tolerancia inválida: tol = {tol}"
         return results
-    if np.linalg.det(A) == 0:
-        results['conclusion'] = "det(A) es 0. No se puede ejecutar el método."
-        return results
 
-    # Descomposición
-    D = np.diag(np.diag(A))
-    L = -np.tril(A, -1)
-    U = -np.triu(A, 1)
+    # Preparación (descomposición, factor triangular y matriz de iteración),
+    # reutilizada entre peticiones con la misma A (ver methods.cap2.operators)
+    with_T = bool(solver == 'matrix' or include_matrices or needs_matrix(precheck_mode, A))
 
-    # Matrices iterativas
-    D_inv = np.linalg.inv(D)
-    T = np.linalg.inv(D - L) @ U
-    C = np.linalg.inv(D - L) @ b
+    def build():
+        # Descomposición: D - L es la parte triangular inferior de A
+        if is_sparse:
+            DL = sparse.tril(A, format='csr')
+            U = -sparse.triu(A, 1, format='csr')
+        else:
+            DL = np.tril(A)
+            U = -np.triu(A, 1)
+        operators = {'DL': DL, 'U': U, 'solve': lower_solver(DL)}
+        if with_T:
+            # Matriz iterativa (por sustitución, sin invertir D - L)
+            operators['T'] = solve_triangular(DL, U, lower=True)
+        return operators
 
-    # Guardar matrices
-    results['C'] = C
-    results['T'] = T
+    with stage('setup'):
+        operators, fingerprint, hit = get_operators(A, 'gauss_seidel', build, with_T=with_T)
+    results['operator_cache'] = {'hit': hit, 'matrix': fingerprint}
+    DL, U, solve, T = operators['DL'], operators['U'], operators['solve'], operators.get('T')
 
-    # Radio espectral
-    spectral_radius = max(abs(np.linalg.eigvals(T)))
-    results['spectral_radius'] = spectral_radius
+    def apply_T(v):
+        return solve(U @ v)
+
+    if T is not None:
+        C = solve_triangular(DL, b, lower=True)
 
-    if spectral_radius >= 1:
-        results['conclusion'] = "El método no converge (radio espectral >= 1)."
+        if include_matrices:
+            # Guardar matrices
+            results['C'] = C
+            results['T'] = T
+
+    # Radio espectral
+    conclusion = precheck(results, precheck_mode, A, T, apply_T, precheck_budget, operators['spectral'])
+    if conclusion:
+        results['conclusion'] = conclusion
         return results
 
-    # Iteraciones
-    x_old = x0.copy()
-    error = tol + 1
-    count = 0
-    results['iterations'].append((count, 0.0, x_old.copy()))
-
-    while error > tol and count < max_count:
-        x_new = C + T @ x_old
-        error = np.linalg.norm(x_new - x_old, ord=norm_type)
-        count += 1
-        results['iterations'].append((count, error, x_new.copy()))
-        x_old = x_new
-
-    results['final_solution'] = x_new
-
-    if error <= tol:
-        results['conclusion'] = f"Convergió en {count} iteraciones con tolerancia {tol}."
+    if solver == 'matrix':
+        rhs = C
+
+        def step(x, c):
+            return c + T @ x
     else:
-        results['conclusion'] = f"No convergió en {max_count} iteraciones."
+        rhs = b
+
+        def step(x, c):
+            # Barrido hacia adelante: usa los valores nuevos apenas se calculan
+            return solve(c + U @ x)
+
+    # Iteraciones
+    return (yield from iterate(results, step, x0, tol, max_count, norm_type, rhs))
+
 
-    return results
\ No newline at end of file
+def gaussSeidel_method(A, b, x0, tol, max_count, norm_type, solver=None, include_matrices=None,
+                       precheck_mode='auto', precheck_budget=1.0, history=None):
+    return exhaust(gaussSeidel_iter(A, b, x0, tol, max_count, norm_type, solver, include_matrices,
+                                    precheck_mode, precheck_budget, history))
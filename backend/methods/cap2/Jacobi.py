@@ -1,17 +1,49 @@
 import numpy as np
+from scipy import sparse
 
-def jacobi_method(A, b, x0, tol, max_count, norm_type):
+from methods.metrics import stage
+from methods.streaming import exhaust
+from methods.cap2.operators import get_operators
+from methods.cap2.matrices import diagonal
+from methods.cap2.convergence import small_dense, needs_matrix, precheck, iterate, new_history, check_rhs
+
+def jacobi_iter(A, b, x0, tol, max_count, norm_type, precheck_mode='auto', include_matrices=None,
+                precheck_budget=1.0, history=None):
+    """
+    Método de Jacobi
+
+    Args:
+        precheck_mode (str): Pre-chequeo de convergencia ('auto', 'exact', 'power',
+            'arnoldi' o 'none'), ver methods.cap2.convergence.precheck
+        include_matrices (bool): Devolver T y C. Por defecto solo para matrices
+            densas pequeñas; A dispersa nunca forma T
+        precheck_budget (float): Segundos para estimar el radio espectral
+        b, x0: Vectores de n, o matrices n x k para resolver k sistemas con la
+            misma A a la vez (ver methods.cap2.convergence.iterate_columns)
+        history: Qué iteraciones guardar ('full', 'last_n', 'every_k' o 'summary'),
+            ver methods.history.IterationHistory
+
+    Es un generador: produce la tabla de iteraciones tras cada fila y
+    devuelve el resultado; jacobi_method lo ejecuta completo.
+
+    Returns:
+        dict: Matrices de iteración, iteraciones y conclusión
+    """
+    b, x0 = check_rhs(A, b, x0)
     results = {
         'C': None,
         'T': None,
         'spectral_radius': None,
-        'iterations': [],  # cada item: (iteracion, error, x)
+        'precheck': None,
+        'iterations': new_history(history, x0, max_count),  # cada item: (iteracion, error, x)
         'conclusion': None,
         'final_solution': None,
+        'columns': None,  # con b de n x k: iteraciones, error y convergencia de cada columna
+        'operator_cache': None,  # operadores de A reutilizados de una petición anterior
     }
 
     # Validaciones básicas
-    if np.any(np.diag(A) == 0):
+    if np.any(diagonal(A) == 0):
         results['conclusion'] = "La matriz A tiene un elemento diagonal cero. No se puede ejecutar el método."
         return results
     if max_count < 0:
@@ -20,50 +52,71 @@ def jacobi_method(A, b, x0, tol, max_count, norm_type):
     if tol < 0:
         results['conclusion'] = f"Tolerancia inválida: tol = {tol}"
         return results
-    if np.linalg.det(A) == 0:
-        results['conclusion'] = "det(A) es 0. No se puede ejecutar el método."
-        return results
 
-    # Descomposición
-    D = np.diag(np.diag(A))
-    L = -np.tril(A, -1)
-    U = -np.triu(A, 1)
+    is_sparse = sparse.issparse(A)
+    if include_matrices is None:
+        include_matrices = small_dense(A)
+    if is_sparse and (include_matrices or precheck_mode == 'exact'):
+        raise ValueError("Con una matriz dispersa no se forman T y C; use el pre-chequeo 'power', 'arnoldi' o 'none'.")
 
-    # Matrices iterativas
-    D_inv = np.linalg.inv(D)
-    T = D_inv @ (L + U)
-    C = D_inv @ b
+    # Preparación (descomposición y matriz de iteración), reutilizada entre
+    # peticiones con la misma A (ver methods.cap2.operators)
+    with_T = bool(include_matrices or needs_matrix(precheck_mode, A))
 
-    # Guardar matrices
-    results['C'] = C
-    results['T'] = T
+    def build():
+        # Descomposición: A = D + R, con R = -(L + U)
+        d = np.array(diagonal(A), dtype=float)
+        if is_sparse:
+            R = (A - sparse.diags(d)).tocsr()
+        else:
+            R = A - np.diag(d)
+        operators = {'d': d, 'R': R}
+        if with_T:
+            # Matriz iterativa: T = D^-1 (L + U)
+            operators['T'] = (1.0 / d)[:, None] * (-R)
+        return operators
 
-    # Radio espectral
-    spectral_radius = max(abs(np.linalg.eigvals(T)))
-    results['spectral_radius'] = spectral_radius
+    with stage('setup'):
+        operators, fingerprint, hit = get_operators(A, 'jacobi', build, with_T=with_T)
+    results['operator_cache'] = {'hit': hit, 'matrix': fingerprint}
+    d, R, T = operators['d'], operators['R'], operators.get('T')
+    # d alineado con las filas de b (vector o matriz n x k)
+    d_b = d if b.ndim == 1 else d[:, None]
+
+    def apply_T(v):
+        return -(R @ v) / d
+
+    if T is not None:
+        # C = D^-1 b
+        C = (1.0 / d_b) * b
 
-    if spectral_radius >= 1:
-        results['conclusion'] = "El método no converge (radio espectral >= 1)."
+        if include_matrices:
+            # Guardar matrices
+            results['C'] = C
+            results['T'] = T
+
+    # Radio espectral
+    conclusion = precheck(results, precheck_mode, A, T, apply_T, precheck_budget, operators['spectral'])
+    if conclusion:
+        results['conclusion'] = conclusion
         return results
 
-    # Iteraciones
-    x_old = x0.copy()
-    error = tol + 1
-    count = 0
-    results['iterations'].append((count, 0.0, x_old.copy()))
-
-    while error > tol and count < max_count:
-        x_new = T @ x_old + C
-        error = np.linalg.norm(x_new - x_old, ord=norm_type)
-        count += 1
-        results['iterations'].append((count, error, x_new.copy()))
-        x_old = x_new
-
-    results['final_solution'] = x_new
-
-    if error <= tol:
-        results['conclusion'] = f"Convergió en {count} iteraciones con tolerancia {tol}."
+    if T is not None:
+        rhs = C
+
+        def step(x, c):
+            return T @ x + c
     else:
-        results['conclusion'] = f"No convergió en {max_count} iteraciones."
+        rhs = b
+
+        def step(x, c):
+            return (c - R @ x) / d_b
+
+    # Iteraciones
+    return (yield from iterate(results, step, x0, tol, max_count, norm_type, rhs))
+
 
-    return results
\ No newline at end of file
+def jacobi_method(A, b, x0, tol, max_count, norm_type, precheck_mode='auto', include_matrices=None,
+                  precheck_budget=1.0, history=None):
+    return exhaust(jacobi_iter(A, b, x0, tol, max_count, norm_type, precheck_mode, include_matrices,
+                               precheck_budget, history))
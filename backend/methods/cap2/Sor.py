@@ -1,17 +1,64 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
 import numpy as np
+from scipy import sparse
+from scipy.linalg import solve_triangular
+
+from methods.metrics import stage
+from methods.streaming import exhaust
+from methods.processes import worker_context
+from methods.cap2.operators import get_operators
+from methods.cap2.matrices import diagonal, lower_solver
+from methods.cap2.relaxation import sor_splitting, choose_omega
+from methods.cap2.convergence import small_dense, needs_matrix, precheck, iterate, new_history, check_rhs
+
+# Barrido de omega: número máximo de valores y de procesos
+MAX_SWEEP_OMEGAS = 64
+SWEEP_WORKERS = os.cpu_count() or 1
+
+def sor_iter(A, b, x0, tol, max_count, norm_type, omega, precheck_mode='auto', include_matrices=None,
+             precheck_budget=1.0, history=None):
+    """
+    Método SOR (Successive Over-Relaxation)
+
+    Args:
+        omega (float): Factor de relajación, o 'auto' para estimarlo (ver
+            methods.cap2.relaxation.choose_omega)
+        precheck_mode (str): Pre-chequeo de convergencia ('auto', 'exact', 'power',
+            'arnoldi' o 'none'), ver methods.cap2.convergence.precheck
+        include_matrices (bool): Devolver T y C. Por defecto solo para matrices
+            densas pequeñas; A dispersa nunca forma T
+        precheck_budget (float): Segundos para estimar el radio espectral
+        b, x0: Vectores de n, o matrices n x k para resolver k sistemas con la
+            misma A a la vez (ver methods.cap2.convergence.iterate_columns)
+        history: Qué iteraciones guardar ('full', 'last_n', 'every_k' o 'summary'),
+            ver methods.history.IterationHistory
 
-def sor_method(A, b, x0, tol, max_count, norm_type, omega):
+    Es un generador: produce la tabla de iteraciones tras cada fila y
+    devuelve el resultado; sor_method lo ejecuta completo.
+
+    Returns:
+        dict: Matrices de iteración, iteraciones y conclusión
+    """
+    b, x0 = check_rhs(A, b, x0)
     results = {
         'C': None,
         'T': None,
         'spectral_radius': None,
-        'iterations': [],  # cada item: (iteración, error, x)
+        'precheck': None,
+        'iterations': new_history(history, x0, max_count),  # cada item: (iteración, error, x)
         'conclusion': None,
         'final_solution': None,
+        'columns': None,  # con b de n x k: iteraciones, error y convergencia de cada columna
+        'operator_cache': None,  # operadores de A reutilizados de una petición anterior
+        'omega': None,  # omega usado y, con omega='auto', cómo se estimó
     }
 
     # Validaciones básicas
-    if np.any(np.diag(A) == 0):
+    if np.any(diagonal(A) == 0):
         results['conclusion'] = "La matriz A tiene un elemento diagonal cero. No se puede ejecutar el método."
         return results
     if max_count < 0:
@@ -20,50 +67,167 @@ def sor_method(A, b, x0, tol, max_count, norm_type, omega):
     if tol < 0:
         results['conclusion'] = f"Tolerancia inválida: tol = {tol}"
         return results
-    if np.linalg.det(A) == 0:
-        results['conclusion'] = "det(A) es 0. No se puede ejecutar el método."
-        return results
 
-    # Descomposición
-    D = np.diag(np.diag(A))
-    L = -np.tril(A, -1)
-    U = -np.triu(A, 1)
+    is_sparse = sparse.issparse(A)
+    if include_matrices is None:
+        include_matrices = small_dense(A)
+    if is_sparse and (include_matrices or precheck_mode == 'exact'):
+        raise ValueError("Con una matriz dispersa no se forman T y C; use el pre-chequeo 'power', 'arnoldi' o 'none'.")
 
-    # Matrices iterativas
-    D_wL_inv = np.linalg.inv(D - omega * L)
-    T = D_wL_inv @ ((1 - omega) * D + omega * U)
-    C = omega * D_wL_inv @ b
+    if omega == 'auto':
+        # Elección de omega, reutilizada entre peticiones con la misma A
+        with stage('setup'):
+            choice, _, hit = get_operators(A, 'sor_omega', lambda: choose_omega(A, precheck_budget))
+        omega = choice['value']
+        results['omega'] = {key: value for key, value in choice.items() if key != 'spectral'}
+        results['omega']['cached'] = hit
+    else:
+        omega = float(omega)
+        results['omega'] = {'value': omega, 'method': 'given'}
 
-    # Guardar matrices
-    results['C'] = C
-    results['T'] = T
+    # Preparación (descomposición, factor triangular y matriz de iteración),
+    # reutilizada entre peticiones con la misma A y omega (ver methods.cap2.operators)
+    with_T = bool(include_matrices or needs_matrix(precheck_mode, A))
 
-    # Radio espectral
-    spectral_radius = max(abs(np.linalg.eigvals(T)))
-    results['spectral_radius'] = spectral_radius
+    def build():
+        # Descomposición: (D - wL) x = w b + ((1 - w) D + w U) x
+        M, N = sor_splitting(A, omega)
+        operators = {'M': M, 'N': N, 'solve': lower_solver(M)}
+        if with_T:
+            # Matriz iterativa (por sustitución, sin invertir D - wL)
+            operators['T'] = solve_triangular(M, N, lower=True)
+        return operators
+
+    with stage('setup'):
+        operators, fingerprint, hit = get_operators(A, 'sor', build, omega=omega, with_T=with_T)
+    results['operator_cache'] = {'hit': hit, 'matrix': fingerprint}
+    M, N, solve, T = operators['M'], operators['N'], operators['solve'], operators.get('T')
+    wb = omega * b
 
-    if spectral_radius >= 1:
-        results['conclusion'] = "El método no converge (radio espectral >= 1)."
+    def apply_T(v):
+        return solve(N @ v)
+
+    if T is not None:
+        C = solve_triangular(M, wb, lower=True)
+
+        if include_matrices:
+            # Guardar matrices
+            results['C'] = C
+            results['T'] = T
+
+    # Radio espectral
+    conclusion = precheck(results, precheck_mode, A, T, apply_T, precheck_budget, operators['spectral'])
+    if conclusion:
+        results['conclusion'] = conclusion
         return results
 
+    if T is not None:
+        rhs = C
+
+        def step(x, c):
+            return T @ x + c
+    else:
+        rhs = wb
+
+        def step(x, c):
+            return solve(c + N @ x)
+
     # Iteraciones
-    x_old = x0.copy()
-    error = tol + 1
-    count = 0
-    results['iterations'].append((count, 0.0, x_old.copy()))
-
-    while error > tol and count < max_count:
-        x_new = T @ x_old + C
-        error = np.linalg.norm(x_new - x_old, ord=norm_type)
-        count += 1
-        results['iterations'].append((count, error, x_new.copy()))
-        x_old = x_new
-
-    results['final_solution'] = x_new
-
-    if error <= tol:
-        results['conclusion'] = f"Convergió en {count} iteraciones con tolerancia {tol}."
+    return (yield from iterate(results, step, x0, tol, max_count, norm_type, rhs))
+
+
+def sor_method(A, b, x0, tol, max_count, norm_type, omega, precheck_mode='auto', include_matrices=None,
+               precheck_budget=1.0, history=None):
+    return exhaust(sor_iter(A, b, x0, tol, max_count, norm_type, omega, precheck_mode, include_matrices,
+                            precheck_budget, history))
+
+
+# Sistema del barrido en cada proceso de trabajo (se envía una vez por proceso)
+_sweep_system = None
+
+
+def _sweep_init(system):
+    global _sweep_system
+    _sweep_system = system
+
+
+def _sweep_run(system, omega):
+    A, b, x0, tol, max_count, norm_type, precheck_mode, precheck_budget = system
+    started = time.perf_counter()
+    results = sor_method(A, b, x0, tol, max_count, norm_type, omega, precheck_mode,
+                         include_matrices=False, precheck_budget=precheck_budget, history='summary')
+    errors = results['iterations'].columns()['error']
+    iterations = max(results['iterations'].total - 1, 0)
+    return {
+        'omega': omega,
+        'iterations': iterations,
+        'converged': bool(iterations and errors[-1] <= tol),
+        'final_error': float(errors[-1]) if iterations else None,
+        'spectral_radius': results['spectral_radius'],
+        'conclusion': results['conclusion'],
+        'elapsed': time.perf_counter() - started,
+    }
+
+
+def _sweep_one(omega):
+    return _sweep_run(_sweep_system, omega)
+
+
+def sor_sweep(A, b, x0, tol, max_count, norm_type, omegas, precheck_mode='auto', precheck_budget=1.0,
+              workers=None):
+    """
+    Ejecuta SOR con varios omega en paralelo (un proceso por omega, hasta
+    `workers` a la vez) y compara iteraciones y radio espectral.
+
+    Args:
+        omegas (list): Factores de relajación en (0, 2); 'auto' agrega el
+            estimado por methods.cap2.relaxation.choose_omega
+        workers (int): Procesos a usar; por defecto uno por CPU
+
+    Dentro de un proceso daemon (un trabajo de /jobs) no se pueden crear
+    procesos hijos y el barrido se hace en serie.
+
+    Returns:
+        dict: Fila por omega, el mejor (menos iteraciones entre los que
+            convergieron), omega estimado si se pidió y procesos usados
+    """
+    b, x0 = check_rhs(A, b, x0)
+    if not len(omegas):
+        raise ValueError("Indique al menos un valor de omega.")
+    if len(omegas) > MAX_SWEEP_OMEGAS:
+        raise ValueError(f"Se permiten como máximo {MAX_SWEEP_OMEGAS} valores de omega, no {len(omegas)}.")
+
+    estimate = None
+    values = []
+    for omega in omegas:
+        if omega == 'auto':
+            if estimate is None:
+                with stage('setup'):
+                    choice, _, _ = get_operators(A, 'sor_omega', lambda: choose_omega(A, precheck_budget))
+                estimate = {key: value for key, value in choice.items() if key != 'spectral'}
+            omega = estimate['value']
+        omega = float(omega)
+        if not 0 < omega < 2:
+            raise ValueError(f"omega debe estar en (0, 2), no {omega}.")
+        values.append(omega)
+
+    system = (A, b, x0, tol, max_count, norm_type, precheck_mode, precheck_budget)
+    workers = max(1, min(workers or SWEEP_WORKERS, len(values)))
+    started = time.perf_counter()
+    if workers == 1 or multiprocessing.current_process().daemon:
+        workers = 1
+        rows = [_sweep_run(system, omega) for omega in values]
     else:
-        results['conclusion'] = f"No convergió en {max_count} iteraciones."
+        with ProcessPoolExecutor(workers, mp_context=worker_context('methods.cap2.Sor'),
+                                 initializer=_sweep_init, initargs=(system,)) as pool:
+            rows = list(pool.map(_sweep_one, values))
 
-    return results
\ No newline at end of file
+    converged = [row for row in rows if row['converged']]
+    best = min(converged, key=lambda row: (row['iterations'], row['omega'])) if converged else None
+    return {
+        'sweep': rows,
+        'best': best,
+        'estimate': estimate,
+        'workers': workers,
+        'elapsed': time.perf_counter() - started,
+    }
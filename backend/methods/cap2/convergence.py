@@ -0,0 +1,321 @@
+import math
+import time
+
+import numpy as np
+from scipy import sparse
+from scipy.sparse.linalg import LinearOperator, eigs, ArpackNoConvergence
+
+from methods.history import IterationHistory, raw
+from methods.metrics import stage
+
+PRECHECK_MODES = ('auto', 'exact', 'power', 'arnoldi', 'none')
+
+# En modo 'auto' se usan valores propios exactos hasta este tamaño
+EXACT_MAX_N = 500
+
+# Un radio estimado solo descarta el método si supera 1 con este margen;
+# los casos dudosos se dejan al vigilante de divergencia en tiempo de ejecución
+ESTIMATE_MARGIN = 1e-2
+
+# Vigilante: iteraciones seguidas con error creciente y crecimiento mínimo
+WATCHDOG_WINDOW = 25
+WATCHDOG_GROWTH = 1e3
+
+_POWER_WINDOW = 8
+
+# Columnas de la tabla de iteraciones: (iteración, error, x)
+ITERATION_COLUMNS = [('error', raw)]
+
+
+def new_history(history, x0, max_count):
+    return IterationHistory(ITERATION_COLUMNS, history, vector_size=x0.shape, capacity=max_count + 1)
+
+
+def small_dense(A):
+    """Matriz densa lo bastante pequeña para formar T y calcular sus valores propios."""
+    return not sparse.issparse(A) and A.shape[0] <= EXACT_MAX_N
+
+
+def needs_matrix(mode, A):
+    """Indica si el pre-chequeo pedido requiere la matriz T densa."""
+    return mode == 'exact' or (mode == 'auto' and small_dense(A))
+
+
+def power_iteration(apply_T, n, time_budget=1.0, max_iter=1000, rtol=1e-4):
+    """
+    Estima el radio espectral de T por el método de las potencias.
+
+    Usa la media geométrica del crecimiento de la norma en una ventana de
+    iteraciones, lo que tolera pares de valores propios complejos dominantes.
+    Se detiene al estabilizarse la estimación o al agotar el tiempo.
+    """
+    rng = np.random.default_rng(0)
+    v = rng.standard_normal(n)
+    v /= np.linalg.norm(v)
+    deadline = time.perf_counter() + time_budget
+
+    logs = []
+    estimates = []
+    for _ in range(max_iter):
+        w = apply_T(v)
+        norm_w = np.linalg.norm(w)
+        if norm_w == 0:
+            return 0.0
+        if not np.isfinite(norm_w):
+            return math.inf
+        logs.append(math.log(norm_w))
+        v = w / norm_w
+
+        if len(logs) >= _POWER_WINDOW:
+            estimates.append(math.exp(sum(logs[-_POWER_WINDOW:]) / _POWER_WINDOW))
+            if len(estimates) > _POWER_WINDOW:
+                previous = estimates[-1 - _POWER_WINDOW]
+                if abs(estimates[-1] - previous) <= rtol * estimates[-1]:
+                    break
+        if time.perf_counter() > deadline:
+            break
+
+    if estimates:
+        return estimates[-1]
+    return math.exp(sum(logs) / len(logs))
+
+
+def arnoldi_radius(apply_T, n, time_budget=1.0):
+    """
+    Estima el radio espectral con Arnoldi (ARPACK vía scipy.sparse.linalg.eigs).
+
+    ARPACK no admite un límite de tiempo, así que se acota el número de
+    reinicios; si no converge se usa el método de las potencias.
+    """
+    if n < 3:
+        return power_iteration(apply_T, n, time_budget)
+    operator = LinearOperator((n, n), matvec=apply_T, dtype=float)
+    try:
+        values = eigs(operator, k=1, which='LM', tol=1e-4, maxiter=max(50, n // 10),
+                      return_eigenvectors=False)
+        return float(np.max(np.abs(values)))
+    except ArpackNoConvergence as e:
+        if len(e.eigenvalues):
+            return float(np.max(np.abs(e.eigenvalues)))
+        return power_iteration(apply_T, n, time_budget)
+
+
+# Marca del radio espectral guardado cuando det(A) = 0
+SINGULAR = 'singular'
+
+
+def _spectral_radius(used, A, T, apply_T, time_budget):
+    if used == 'exact':
+        # slogdet no se desborda a 0 o inf como det en matrices grandes
+        if np.linalg.slogdet(A)[0] == 0:
+            return SINGULAR
+        return float(max(abs(np.linalg.eigvals(T))))
+    if used == 'power':
+        return power_iteration(apply_T, A.shape[0], time_budget)
+    if used == 'arnoldi':
+        return arnoldi_radius(apply_T, A.shape[0], time_budget)
+    return None
+
+
+@stage('precheck')
+def precheck(results, mode, A, T, apply_T, time_budget=1.0, cache=None):
+    """
+    Pre-chequeo de convergencia por radio espectral.
+
+    Args:
+        results (dict): Resultado del método; se llenan 'spectral_radius' y 'precheck'
+        mode (str): 'exact' (valores propios de T), 'power', 'arnoldi', 'none'
+            (sin chequeo, solo el vigilante) o 'auto' (exacto para n pequeño)
+        A: Matriz del sistema (densa o dispersa)
+        T (ndarray): Matriz de iteración densa, necesaria solo en modo exacto
+        apply_T (callable): Producto v -> T v sin formar T
+        time_budget (float): Segundos disponibles para las estimaciones
+        cache (dict): Radios ya calculados para esta matriz por modo (ver
+            methods.cap2.operators); se reutilizan y se completan
+
+    Returns:
+        str: Conclusión si el método no puede ejecutarse, o None
+    """
+    if mode not in PRECHECK_MODES:
+        raise ValueError(f"Pre-chequeo inválido: '{mode}'. Use uno de {', '.join(PRECHECK_MODES)}.")
+
+    n = A.shape[0]
+    used = mode
+    if mode == 'auto':
+        used = 'exact' if T is not None and n <= EXACT_MAX_N else 'power'
+    if used == 'exact' and T is None:
+        raise ValueError("El pre-chequeo 'exact' requiere una matriz densa; use 'power', 'arnoldi' o 'none'.")
+
+    start = time.perf_counter()
+    cached = cache is not None and used in cache
+    if cached:
+        radius = cache[used]
+    else:
+        radius = _spectral_radius(used, A, T, apply_T, time_budget)
+        if cache is not None:
+            cache[used] = radius
+    if radius == SINGULAR:
+        return "det(A) es 0. No se puede ejecutar el método."
+
+    results['spectral_radius'] = radius
+    results['precheck'] = {
+        'mode': used,
+        'requested': mode,
+        'estimated': used in ('power', 'arnoldi'),
+        'cached': cached,
+        'elapsed': time.perf_counter() - start,
+    }
+
+    if radius is None:
+        return None
+    if used == 'exact' and radius >= 1:
+        return "El método no converge (radio espectral >= 1)."
+    if used != 'exact' and radius >= 1 + ESTIMATE_MARGIN:
+        return f"El método no converge (radio espectral estimado = {radius:.4f} >= 1)."
+    return None
+
+
+class _Watchdog:
+    """Vigilante de divergencia compartido por iterate e iterate_columns."""
+
+    def __init__(self):
+        self.best = math.inf
+        self.previous = math.inf
+        self.rising = 0
+
+    def check(self, error, count):
+        """Conclusión si el método diverge en esta iteración, o None."""
+        if not np.isfinite(error):
+            return f"El método diverge: los valores crecieron sin límite en la iteración {count}."
+        self.rising = self.rising + 1 if error > self.previous else 0
+        self.previous = error
+        self.best = min(self.best, error)
+        if self.rising >= WATCHDOG_WINDOW and error > WATCHDOG_GROWTH * self.best:
+            return f"El método diverge: el error creció {self.rising} iteraciones seguidas (iteración {count})."
+        return None
+
+
+def check_rhs(A, b, x0):
+    """
+    Valida b y x0 contra A. b puede ser una matriz n x k (k lados derechos);
+    entonces x0 es n x k o un vector n que se usa para todas las columnas.
+
+    Returns:
+        tuple: (b, x0) con la misma forma
+    """
+    n = A.shape[0]
+    if b.ndim not in (1, 2) or b.shape[0] != n:
+        raise ValueError(f"vectorB debe tener {n} filas (un vector o una matriz n x k), no la forma {b.shape}.")
+    if b.ndim == 2 and x0.ndim == 1 and x0.shape[0] == n:
+        x0 = np.repeat(x0[:, None], b.shape[1], axis=1)
+    if x0.shape != b.shape:
+        raise ValueError(f"vectorX0 debe tener la forma de vectorB {b.shape}, no {x0.shape}.")
+    return b, x0
+
+
+def iterate(results, step, x0, tol, max_count, norm_type, rhs):
+    """
+    Ejecuta x_{k+1} = step(x_k, rhs) hasta la tolerancia y llena la conclusión.
+
+    `rhs` es el término del lado derecho que usa el paso (b, C, w b...); si
+    es una matriz n x k se itera por columnas con iterate_columns.
+
+    Es un generador: produce la tabla de iteraciones tras cada fila y
+    devuelve el resultado (se usa con `yield from`).
+
+    Incluye un vigilante de divergencia: se detiene si el error deja de ser
+    finito o si crece WATCHDOG_WINDOW iteraciones seguidas superando en
+    WATCHDOG_GROWTH veces el menor error observado.
+    """
+    if x0.ndim == 2:
+        return (yield from iterate_columns(results, step, x0, tol, max_count, norm_type, rhs))
+
+    x_old = x0.copy()
+    error = tol + 1
+    count = 0
+    results['iterations'].append(count, 0.0, vector=x_old)
+    yield results['iterations']
+
+    x_new = x_old
+    diverged = None
+    watchdog = _Watchdog()
+    while error > tol and count < max_count:
+        x_new = step(x_old, rhs)
+        error = np.linalg.norm(x_new - x_old, ord=norm_type)
+        count += 1
+        results['iterations'].append(count, error, vector=x_new)
+        yield results['iterations']
+        x_old = x_new
+
+        diverged = watchdog.check(error, count)
+        if diverged:
+            break
+
+    results['final_solution'] = x_new
+
+    if diverged:
+        results['conclusion'] = diverged
+    elif error <= tol:
+        results['conclusion'] = f"Convergió en {count} iteraciones con tolerancia {tol}."
+    else:
+        results['conclusion'] = f"No convergió en {max_count} iteraciones."
+    return results
+
+
+def iterate_columns(results, step, x0, tol, max_count, norm_type, rhs):
+    """
+    Itera k sistemas con la misma A a la vez: X y rhs son matrices n x k y
+    cada paso es un producto matriz-matriz sobre las columnas activas.
+
+    Cada columna tiene su propio error; al bajar de la tolerancia se retira
+    y deja de iterarse. El error de la tabla es el mayor entre las columnas
+    activas y el vigilante de divergencia usa ese mismo valor.
+    """
+    k = x0.shape[1]
+    x_old = x0.copy()
+    count = 0
+    errors = np.full(k, np.inf)
+    column_iterations = np.zeros(k, dtype=np.int64)
+    converged = np.zeros(k, dtype=bool)
+    active = np.arange(k)
+    results['iterations'].append(count, 0.0, vector=x_old)
+    yield results['iterations']
+
+    diverged = None
+    watchdog = _Watchdog()
+    while active.size and count < max_count:
+        # Copia nueva en cada iteración: la tabla guarda la referencia
+        x_new = x_old.copy()
+        x_new[:, active] = step(x_old[:, active], rhs[:, active])
+        active_errors = np.linalg.norm(x_new[:, active] - x_old[:, active], ord=norm_type, axis=0)
+        count += 1
+        errors[active] = active_errors
+        column_iterations[active] = count
+        error = float(active_errors.max())
+        results['iterations'].append(count, error, vector=x_new)
+        yield results['iterations']
+        x_old = x_new
+
+        diverged = watchdog.check(error, count)
+        if diverged:
+            break
+        done = active_errors <= tol
+        converged[active[done]] = True
+        active = active[~done]
+
+    results['final_solution'] = x_old
+    results['columns'] = {
+        'count': k,
+        'iterations': column_iterations,
+        'errors': errors,
+        'converged': converged,
+    }
+
+    pending = k - int(converged.sum())
+    if diverged:
+        results['conclusion'] = diverged
+    elif pending == 0:
+        results['conclusion'] = f"Convergieron las {k} columnas en {count} iteraciones con tolerancia {tol}."
+    else:
+        results['conclusion'] = f"No convergieron {pending} de {k} columnas en {max_count} iteraciones."
+    return results
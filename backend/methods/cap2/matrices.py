@@ -0,0 +1,60 @@
+import numpy as np
+from scipy import sparse
+from scipy.linalg import solve_triangular
+from scipy.sparse.linalg import splu
+
+
+def parse_matrix(matrix):
+    """
+    Convierte la matriz recibida en la petición a NumPy o a scipy.sparse.
+
+    Acepta una lista de filas o un arreglo (matriz densa) o un diccionario disperso:
+        {"format": "coo", "shape": [n, n], "row": [...], "col": [...], "data": [...]}
+        {"format": "csr", "shape": [n, n], "indptr": [...], "indices": [...], "data": [...]}
+
+    Las matrices dispersas se devuelven en formato CSR.
+    """
+    if not isinstance(matrix, dict):
+        # Sin copia si ya llega como arreglo float (npy, msgpack)
+        return np.asarray(matrix, dtype=float)
+
+    fmt = str(matrix.get("format", "coo")).lower()
+    shape = matrix.get("shape")
+    if shape is None or len(shape) != 2:
+        raise ValueError("La matriz dispersa requiere 'shape' = [filas, columnas].")
+    shape = (int(shape[0]), int(shape[1]))
+    data = np.asarray(matrix.get("data", []), dtype=float)
+
+    if fmt == "coo":
+        row = np.asarray(matrix.get("row", []), dtype=np.int64)
+        col = np.asarray(matrix.get("col", []), dtype=np.int64)
+        if not (len(row) == len(col) == len(data)):
+            raise ValueError("'row', 'col' y 'data' deben tener la misma longitud.")
+        return sparse.coo_matrix((data, (row, col)), shape=shape).tocsr()
+    if fmt == "csr":
+        indptr = np.asarray(matrix.get("indptr", []), dtype=np.int64)
+        indices = np.asarray(matrix.get("indices", []), dtype=np.int64)
+        if len(indptr) != shape[0] + 1 or len(indices) != len(data):
+            raise ValueError("'indptr', 'indices' y 'data' no son consistentes con 'shape'.")
+        A = sparse.csr_matrix((data, indices, indptr), shape=shape)
+        A.sum_duplicates()
+        return A
+    raise ValueError(f"Formato de matriz dispersa no soportado: '{fmt}'. Use 'coo' o 'csr'.")
+
+
+def diagonal(A):
+    return A.diagonal() if sparse.issparse(A) else np.diag(A)
+
+
+def lower_solver(M):
+    """
+    Devuelve una función que resuelve M x = r para M triangular inferior.
+
+    Para matrices dispersas se factoriza una vez con SuperLU en orden natural
+    y sin pivoteo, lo que conserva la estructura triangular (sin relleno).
+    """
+    if sparse.issparse(M):
+        lu = splu(sparse.csc_matrix(M), permc_spec='NATURAL', diag_pivot_thresh=0.0,
+                  options={'SymmetricMode': True})
+        return lu.solve
+    return lambda r: solve_triangular(M, r, lower=True, check_finite=False)
@@ -0,0 +1,91 @@
+import hashlib
+
+import numpy as np
+
+from methods.lru import LRUCache
+
+# Límites de la caché de operadores (compartida por el proceso). Con una
+# matriz densa de 3000 x 3000 cada arreglo guardado ocupa 72 MB
+MAX_OPERATORS = 32
+MAX_BYTES = 512 * 1024 * 1024
+
+_operators = LRUCache(MAX_OPERATORS, MAX_BYTES)
+
+
+def matrix_key(A):
+    """
+    Huella del contenido de A (forma, tipo y valores), densa o dispersa.
+
+    Dos peticiones con la misma matriz comparten la huella aunque lleguen en
+    formatos distintos (JSON, .npy, msgpack); una dispersa se compara en CSR
+    canónico (índices ordenados, sin duplicados).
+    """
+    from scipy import sparse
+
+    digest = hashlib.sha256()
+    if sparse.issparse(A):
+        A = A.tocsr()
+        if not A.has_canonical_format:
+            A = A.copy()
+            A.sum_duplicates()
+        digest.update(f"csr{A.shape}".encode())
+        for array in (A.indptr.astype(np.int64), A.indices.astype(np.int64), A.data):
+            digest.update(memoryview(np.ascontiguousarray(array)).cast('B'))
+    else:
+        A = np.ascontiguousarray(A, dtype=float)
+        digest.update(f"dense{A.shape}".encode())
+        digest.update(memoryview(A).cast('B'))
+    return digest.hexdigest()
+
+
+def _nbytes(value):
+    """Bytes aproximados de un operador guardado (arreglo, matriz dispersa o factorización)."""
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if hasattr(value, 'indptr'):
+        return value.data.nbytes + value.indices.nbytes + value.indptr.nbytes
+    factor = getattr(value, '__self__', None)  # lu.solve de SuperLU
+    if factor is not None and hasattr(factor, 'L'):
+        return (factor.L.nnz + factor.U.nnz) * 12
+    if isinstance(value, dict):
+        return sum(_nbytes(v) for v in value.values())
+    return 0
+
+
+def get_operators(A, method, build, **params):
+    """
+    Operadores de iteración de A para un método, reutilizados entre peticiones.
+
+    Args:
+        A: Matriz del sistema (densa o dispersa)
+        method (str): Nombre del método ('jacobi', 'gauss_seidel', 'sor')
+        build (callable): Construye el diccionario de operadores si no está en caché
+        **params: Lo demás que determina los operadores (omega, si se forma T...)
+
+    Returns:
+        tuple: (operadores, huella de A, True si se reutilizaron)
+
+    Los arreglos guardados quedan de solo lectura. El diccionario incluye
+    'spectral': radios espectrales ya calculados por modo de pre-chequeo.
+    """
+    fingerprint = matrix_key(A)
+    key = (fingerprint, method) + tuple(sorted(params.items()))
+    operators = _operators.get(key)
+    if operators is not None:
+        return operators, fingerprint, True
+
+    operators = build()
+    for value in operators.values():
+        if isinstance(value, np.ndarray):
+            value.flags.writeable = False
+    operators['spectral'] = {}
+    _operators.put(key, operators, _nbytes(operators))
+    return operators, fingerprint, False
+
+
+def operator_stats():
+    return _operators.stats()
+
+
+def clear_operators():
+    _operators.clear()
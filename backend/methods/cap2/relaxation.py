@@ -0,0 +1,90 @@
+import math
+
+import numpy as np
+from scipy import sparse
+
+from methods.cap2.matrices import diagonal, lower_solver
+from methods.cap2.convergence import small_dense, power_iteration
+
+# Búsqueda de omega cuando no aplica la fórmula de Young: intervalo y número
+# de evaluaciones del radio espectral de SOR (sección dorada)
+SEARCH_INTERVAL = (0.05, 1.95)
+SEARCH_STEPS = 12
+# Con omega de Young, SOR debe converger al menos como Gauss-Seidel (rho_J^2)
+YOUNG_TOLERANCE = 1e-2
+
+_GOLDEN = (math.sqrt(5) - 1) / 2
+
+
+def sor_splitting(A, omega):
+    """M = D + omega L y N = (1 - omega) D - omega U, con (D - wL) x = w b + N x."""
+    d = diagonal(A)
+    if sparse.issparse(A):
+        M = (sparse.diags(d) + omega * sparse.tril(A, -1)).tocsr()
+        N = ((1 - omega) * sparse.diags(d) - omega * sparse.triu(A, 1)).tocsr()
+    else:
+        M = np.diag(d) + omega * np.tril(A, -1)
+        N = (1 - omega) * np.diag(d) - omega * np.triu(A, 1)
+    return M, N
+
+
+def jacobi_radius(A, time_budget=1.0):
+    """Radio espectral de la matriz de Jacobi: exacto para matrices densas pequeñas, si no estimado."""
+    d = diagonal(A)
+    if small_dense(A):
+        T = -(A - np.diag(d)) / d[:, None]
+        return float(max(abs(np.linalg.eigvals(T)))), False
+    R = (A - sparse.diags(d)).tocsr() if sparse.issparse(A) else A - np.diag(d)
+    return power_iteration(lambda v: -(R @ v) / d, A.shape[0], time_budget), True
+
+
+def sor_radius(A, omega, time_budget=1.0):
+    """Radio espectral estimado de la matriz de iteración de SOR para un omega."""
+    M, N = sor_splitting(A, omega)
+    solve = lower_solver(M)
+    return power_iteration(lambda v: solve(N @ v), A.shape[0], time_budget)
+
+
+def choose_omega(A, time_budget=1.0):
+    """
+    Elige el factor de relajación de SOR.
+
+    Para matrices consistentemente ordenadas (p. ej. tridiagonales o de
+    diferencias finitas) con valores propios de Jacobi reales, el óptimo es
+    omega = 2 / (1 + sqrt(1 - rho_J^2)) (Young). La fórmula se comprueba
+    estimando el radio de SOR con ese omega; si no mejora a Gauss-Seidel (o
+    rho_J >= 1), se busca el omega que minimiza el radio por sección dorada.
+
+    Returns:
+        dict: 'value', 'method' ('young' o 'search'), 'jacobi_spectral_radius'
+            y 'spectral_radius' (estimado para el omega elegido)
+    """
+    rho_jacobi, estimated = jacobi_radius(A, time_budget / 3)
+    choice = {'value': None, 'method': None, 'jacobi_spectral_radius': rho_jacobi,
+              'jacobi_estimated': estimated, 'spectral_radius': None}
+
+    if rho_jacobi < 1:
+        omega = 2 / (1 + math.sqrt(1 - rho_jacobi ** 2))
+        radius = sor_radius(A, omega, time_budget / 3)
+        if radius <= rho_jacobi ** 2 + YOUNG_TOLERANCE:
+            choice.update(value=omega, method='young', spectral_radius=radius)
+            return choice
+
+    # Sección dorada sobre el radio espectral estimado (supone un único mínimo)
+    budget = time_budget / SEARCH_STEPS
+    low, high = SEARCH_INTERVAL
+    a = high - _GOLDEN * (high - low)
+    b = low + _GOLDEN * (high - low)
+    radius_a, radius_b = sor_radius(A, a, budget), sor_radius(A, b, budget)
+    for _ in range(SEARCH_STEPS - 2):
+        if radius_a <= radius_b:
+            high, b, radius_b = b, a, radius_a
+            a = high - _GOLDEN * (high - low)
+            radius_a = sor_radius(A, a, budget)
+        else:
+            low, a, radius_a = a, b, radius_b
+            b = low + _GOLDEN * (high - low)
+            radius_b = sor_radius(A, b, budget)
+    omega, radius = (a, radius_a) if radius_a <= radius_b else (b, radius_b)
+    choice.update(value=omega, method='search', spectral_radius=radius)
+    return choice
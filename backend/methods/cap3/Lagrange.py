@@ -1,17 +1,28 @@
 import numpy as np
-import matplotlib
-matplotlib.use('Agg')  # Usar backend no interactivo
-import matplotlib.pyplot as plt
 import io
 import base64
 
-def lagrange_interpolation(x_values, y_values):
+from methods.cap3.inputs import prepare_points
+from methods.cap3.barycentric import BarycentricInterpolant
+from methods.cap3.registry import register as register_interpolant
+from methods.metrics import stage
+
+# Nodos hasta los que se devuelven los coeficientes monomiales por defecto
+MONOMIAL_MAX_N = 20
+
+@stage('interpolate')
+def lagrange_interpolation(x_values, y_values, coefficients=None, plot=True, register=False):
     """
-    Método de interpolación de Lagrange
+    Método de interpolación de Lagrange (forma baricéntrica)
     
     Args:
         x_values (list): Lista de valores x
         y_values (list): Lista de valores y
+        coefficients (bool): Calcular el polinomio en base monomial. Por defecto
+            solo con hasta MONOMIAL_MAX_N nodos
+        plot (bool): Generar la imagen del polinomio
+        register (bool): Guardar el interpolante y devolver su id para
+            evaluarlo con /evaluate/<id>
         
     Returns:
         dict: Resultado con el polinomio y datos de la interpolación
@@ -19,6 +30,8 @@ def lagrange_interpolation(x_values, y_values):
     results = {
         'polynomial': None,
         'polynomial_str': None,
+        'weights': None,
+        'id': None,
         'image_base64': None,
         'success': False,
         'error': None,
@@ -26,78 +39,30 @@ def lagrange_interpolation(x_values, y_values):
     }
     
     try:
-        # Validaciones
-        if not x_values or not y_values:
-            raise ValueError("Las listas de x o y están vacías.")
-        
-        if len(x_values) < 2 or len(y_values) < 2:
-            raise ValueError("Se requieren al menos dos puntos para interpolar.")
-        
-        if len(x_values) != len(y_values):
-            raise ValueError("Las listas de x e y deben tener la misma longitud.")
-        
-        if len(set(x_values)) != len(x_values):
-            raise ValueError("Hay valores de x repetidos, lo cual no es válido para la interpolación.")
-        
-        # Validar que son números finitos
-        for i, val in enumerate(x_values):
-            if not isinstance(val, (int, float)) or not np.isfinite(val):
-                raise ValueError(f"El valor en x[{i}] = '{val}' no es un número válido.")
-        
-        for i, val in enumerate(y_values):
-            if not isinstance(val, (int, float)) or not np.isfinite(val):
-                raise ValueError(f"El valor en y[{i}] = '{val}' no es un número válido.")
+        # Validaciones (vectorizadas, ver methods.cap3.inputs)
+        x_values, y_values = prepare_points(x_values, y_values)
         
         # Advertencia para muchos puntos
         if len(x_values) > 12:
             results['warning'] = "Advertencia: interpolar con muchos puntos puede causar oscilaciones indeseadas."
         
-        # Función para calcular el polinomio de Lagrange
-        def lagrange_polynomial(x_vals, y_vals):
-            def basis(j):
-                p = np.poly1d([1.0])
-                for m in range(len(x_vals)):
-                    if m != j:
-                        denom = x_vals[j] - x_vals[m]
-                        if abs(denom) < 1e-12:
-                            raise ZeroDivisionError("Dos valores de x son demasiado cercanos, lo que puede causar errores numéricos.")
-                        p *= np.poly1d([1.0, -x_vals[m]]) / denom
-                return p
-            
-            polynomial = sum(y_vals[j] * basis(j) for j in range(len(x_vals)))
-            return polynomial
-        
-        # Función para dar formato al polinomio
-        def format_polynomial_python_style(poly):
-            coeffs = poly.coefficients
-            degree = len(coeffs) - 1
-            terms = []
-            
-            for i, coef in enumerate(coeffs):
-                power = degree - i
-                if abs(coef) < 1e-12:
-                    continue
-                sign = "+" if coef >= 0 else "-"
-                coef_str = f"{abs(coef)}"
-                if power == 0:
-                    term = f"{sign}{coef_str}"
-                elif power == 1:
-                    term = f"{sign}{coef_str}*x**1"
-                else:
-                    term = f"{sign}{coef_str}*x**{power}"
-                terms.append(term)
-            return " ".join(terms) if terms else "0"
-        
-        # Calcular el polinomio
-        P = lagrange_polynomial(x_values, y_values)
-        polynomial_str = format_polynomial_python_style(P)
-        
+        # Pesos baricéntricos: O(n^2) una sola vez, luego O(n) por punto evaluado
+        P = BarycentricInterpolant(x_values, y_values)
+        results['weights'] = P.weights.tolist()
+        if register:
+            results['id'] = register_interpolant(P)
+
+        # Coeficientes monomiales solo si se piden (por defecto con pocos nodos)
+        if coefficients is None:
+            coefficients = len(x_values) <= MONOMIAL_MAX_N
+        if coefficients:
+            coeffs = P.coefficients()
+            results['polynomial'] = coeffs.tolist()  # Convertir a lista para JSON
+            results['polynomial_str'] = format_polynomial_python_style(coeffs)
+
         # Generar gráfico
-        image_base64 = plot_polynomial_expression(polynomial_str.replace("**", "^"), x_values, y_values)
-        
-        results['polynomial'] = P.coefficients.tolist()  # Convertir a lista para JSON
-        results['polynomial_str'] = polynomial_str
-        results['image_base64'] = image_base64
+        if plot:
+            results['image_base64'] = plot_interpolant(P, x_values, y_values)
         results['success'] = True
         
     except Exception as e:
@@ -105,18 +70,42 @@ def lagrange_interpolation(x_values, y_values):
     
     return results
 
-def plot_polynomial_expression(expr, x_vals, y_vals):
+def format_polynomial_python_style(coeffs):
+    """
+    Da formato de Python a los coeficientes (mayor grado primero)
+    """
+    degree = len(coeffs) - 1
+    terms = []
+    
+    for i, coef in enumerate(coeffs):
+        power = degree - i
+        if abs(coef) < 1e-12:
+            continue
+        sign = "+" if coef >= 0 else "-"
+        coef_str = f"{abs(coef)}"
+        if power == 0:
+            term = f"{sign}{coef_str}"
+        elif power == 1:
+            term = f"{sign}{coef_str}*x**1"
+        else:
+            term = f"{sign}{coef_str}*x**{power}"
+        terms.append(term)
+    return " ".join(terms) if terms else "0"
+
+@stage('plot')
+def plot_interpolant(P, x_vals, y_vals):
     """
     Genera un gráfico del polinomio y los puntos de interpolación
     """
+    import matplotlib
+    matplotlib.use('Agg')  # Usar backend no interactivo
+    import matplotlib.pyplot as plt
+    
     try:
-        # Crear función a partir de la expresión
-        f = lambda x: eval(expr.replace("^", "**"))
-        
-        # Rango de graficación
+        # Rango de graficación, evaluado de forma vectorizada
         x_min, x_max = min(x_vals), max(x_vals)
         x_plot = np.linspace(x_min - 1, x_max + 1, 400)
-        y_plot = [f(x) for x in x_plot]
+        y_plot = P(x_plot)
         
         # Graficar
         plt.figure(figsize=(10, 6))
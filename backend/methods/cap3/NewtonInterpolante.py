@@ -1,17 +1,28 @@
 import numpy as np
-import matplotlib
-matplotlib.use('Agg')  # Usar backend no interactivo
-import matplotlib.pyplot as plt
 import io
 import base64
 
-def newton_interpolation(x_values, y_values):
+from methods.cap3.inputs import prepare_points
+from methods.cap3.divided_differences import NewtonInterpolant
+from methods.cap3.registry import register as register_interpolant, get_interpolant, update
+from methods.metrics import stage
+
+# Nodos hasta los que se devuelven los coeficientes monomiales por defecto
+MONOMIAL_MAX_N = 20
+
+@stage('interpolate')
+def newton_interpolation(x_values, y_values, coefficients=None, plot=True, register=True):
     """
     Método de interpolación de Newton
     
     Args:
         x_values (list): Lista de valores x
         y_values (list): Lista de valores y
+        coefficients (bool): Calcular el polinomio en base monomial. Por defecto
+            solo con hasta MONOMIAL_MAX_N nodos
+        plot (bool): Generar la imagen del polinomio
+        register (bool): Guardar el interpolante y devolver su id para agregarle
+            nodos con newton_append o evaluarlo con /evaluate/<id>
         
     Returns:
         dict: Resultado con el polinomio y datos de la interpolación
@@ -19,6 +30,8 @@ def newton_interpolation(x_values, y_values):
     results = {
         'polynomial': None,
         'polynomial_str': None,
+        'newton_coefficients': None,
+        'id': None,
         'image_base64': None,
         'success': False,
         'error': None,
@@ -26,80 +39,30 @@ def newton_interpolation(x_values, y_values):
     }
     
     try:
-        # Validaciones
-        if not x_values or not y_values:
-            raise ValueError("Las listas de x o y están vacías.")
-        
-        if len(x_values) < 2 or len(y_values) < 2:
-            raise ValueError("Se requieren al menos dos puntos para interpolar.")
-        
-        if len(x_values) != len(y_values):
-            raise ValueError("Las listas de x e y deben tener la misma longitud.")
-        
-        if len(set(x_values)) != len(x_values):
-            raise ValueError("Hay valores de x repetidos, lo cual no es válido para la interpolación.")
-        
-        # Validar que son números finitos
-        for i, val in enumerate(x_values):
-            if not isinstance(val, (int, float)) or not np.isfinite(val):
-                raise ValueError(f"El valor en x[{i}] = '{val}' no es un número válido.")
-        
-        for i, val in enumerate(y_values):
-            if not isinstance(val, (int, float)) or not np.isfinite(val):
-                raise ValueError(f"El valor en y[{i}] = '{val}' no es un número válido.")
+        # Validaciones (vectorizadas, ver methods.cap3.inputs)
+        x_values, y_values = prepare_points(x_values, y_values)
         
         # Advertencia para muchos puntos
         if len(x_values) > 12:
             results['warning'] = "Advertencia: interpolar con muchos puntos puede causar oscilaciones indeseadas."
         
-        # Calcular diferencias divididas
-        n = len(x_values)
-        coef = np.copy(y_values)
-        
-        for j in range(1, n):
-            for i in range(n - 1, j - 1, -1):
-                denominador = x_values[i] - x_values[i - j]
-                if abs(denominador) < 1e-12:
-                    raise ZeroDivisionError("Se detectó una división por cero en los coeficientes.")
-                coef[i] = (coef[i] - coef[i - 1]) / denominador
-        
-        # Construir el polinomio
-        poly = np.poly1d([0.0])
-        for i in range(n):
-            term = np.poly1d([1.0])
-            for j in range(i):
-                term *= np.poly1d([1.0, -x_values[j]])
-            term *= coef[i]
-            poly += term
-        
-        # Función para dar formato al polinomio
-        def format_polynomial_python_style(poly):
-            coeffs = poly.coefficients
-            degree = len(coeffs) - 1
-            terms = []
-            for i, coef in enumerate(coeffs):
-                power = degree - i
-                if abs(coef) < 1e-12:
-                    continue
-                sign = "+" if coef >= 0 else "-"
-                coef_str = f"{abs(coef)}"
-                if power == 0:
-                    term = f"{sign}{coef_str}"
-                elif power == 1:
-                    term = f"{sign}{coef_str}*x**1"
-                else:
-                    term = f"{sign}{coef_str}*x**{power}"
-                terms.append(term)
-            return " ".join(terms) if terms else "0"
-        
-        polynomial_str = format_polynomial_python_style(poly)
-        
+        # Diferencias divididas (forma de Newton, admite agregar nodos)
+        P = NewtonInterpolant(x_values, y_values)
+        results['newton_coefficients'] = P.coef.tolist()
+        if register:
+            results['id'] = register_interpolant(P)
+
+        # Coeficientes monomiales solo si se piden (por defecto con pocos nodos)
+        if coefficients is None:
+            coefficients = len(x_values) <= MONOMIAL_MAX_N
+        if coefficients:
+            coeffs = P.coefficients()
+            results['polynomial'] = coeffs.tolist()  # Convertir a lista para JSON
+            results['polynomial_str'] = format_polynomial_python_style(coeffs)
+
         # Generar gráfico
-        image_base64 = plot_polynomial_expression(polynomial_str.replace("**", "^"), x_values, y_values)
-        
-        results['polynomial'] = poly.coefficients.tolist()  # Convertir a lista para JSON
-        results['polynomial_str'] = polynomial_str
-        results['image_base64'] = image_base64
+        if plot:
+            results['image_base64'] = plot_interpolant(P, x_values, y_values)
         results['success'] = True
         
     except ValueError as ve:
@@ -111,18 +74,103 @@ def newton_interpolation(x_values, y_values):
     
     return results
 
-def plot_polynomial_expression(expr, x_vals, y_vals):
+@stage('interpolate')
+def newton_append(interpolant_id, x_values, y_values, coefficients=None):
     """
-    Genera un gráfico del polinomio y los puntos de interpolación
+    Agrega nodos a un interpolante de Newton registrado, en O(n) por nodo
+    
+    Args:
+        interpolant_id (str): Id devuelto por newton_interpolation
+        x_values (list): Nuevos valores x
+        y_values (list): Nuevos valores y
+        coefficients (bool): Calcular el polinomio en base monomial
+        
+    Returns:
+        dict: Coeficientes agregados y datos del interpolante actualizado
+
+    Raises:
+        KeyError: Si el id no existe o expiró
     """
+    results = {
+        'id': interpolant_id,
+        'points': None,
+        'added_coefficients': None,
+        'polynomial': None,
+        'polynomial_str': None,
+        'success': False,
+        'error': None
+    }
+    
     try:
-        # Crear función a partir de la expresión
-        f = lambda x: eval(expr.replace("^", "**"))
+        x_values = np.atleast_1d(np.asarray(x_values, dtype=float))
+        y_values = np.atleast_1d(np.asarray(y_values, dtype=float))
+        if x_values.size == 0 or x_values.shape != y_values.shape:
+            raise ValueError("Las listas de x e y deben tener la misma longitud.")
+        if not np.all(np.isfinite(x_values)) or not np.all(np.isfinite(y_values)):
+            raise ValueError("Los valores de x e y deben ser números finitos.")
+        
+        P = get_interpolant(interpolant_id)
+        if not isinstance(P, NewtonInterpolant):
+            raise ValueError(f"El interpolante '{interpolant_id}' no está en forma de Newton.")
+        
+        # Todo el lote o nada (ver NewtonInterpolant.extend)
+        results['added_coefficients'] = P.extend(x_values, y_values)
+        update(interpolant_id, P)
+        results['points'] = len(P)
+        
+        if coefficients is None:
+            coefficients = len(P) <= MONOMIAL_MAX_N
+        if coefficients:
+            coeffs = P.coefficients()
+            results['polynomial'] = coeffs.tolist()
+            results['polynomial_str'] = format_polynomial_python_style(coeffs)
+        results['success'] = True
         
-        # Rango de graficación
+    except KeyError:
+        # Id desconocido: la ruta responde 404, como /evaluate/<id>
+        raise
+    except ValueError as ve:
+        results['error'] = f"Error de entrada: {str(ve)}"
+    except Exception as e:
+        results['error'] = f"Error inesperado: {str(e)}"
+    
+    return results
+
+def format_polynomial_python_style(coeffs):
+    """
+    Da formato de Python a los coeficientes (mayor grado primero)
+    """
+    degree = len(coeffs) - 1
+    terms = []
+    for i, coef in enumerate(coeffs):
+        power = degree - i
+        if abs(coef) < 1e-12:
+            continue
+        sign = "+" if coef >= 0 else "-"
+        coef_str = f"{abs(coef)}"
+        if power == 0:
+            term = f"{sign}{coef_str}"
+        elif power == 1:
+            term = f"{sign}{coef_str}*x**1"
+        else:
+            term = f"{sign}{coef_str}*x**{power}"
+        terms.append(term)
+    return " ".join(terms) if terms else "0"
+
+@stage('plot')
+def plot_interpolant(P, x_vals, y_vals):
+    """
+    Genera un gráfico del polinomio y los puntos de interpolación
+    """
+    import matplotlib
+    matplotlib.use('Agg')  # Usar backend no interactivo
+    import matplotlib.pyplot as plt
+    
+    try:
+        # Rango de graficación, evaluado con la forma anidada de Newton
         x_min, x_max = min(x_vals), max(x_vals)
         x_plot = np.linspace(x_min - 1, x_max + 1, 400)
-        y_plot = [f(x) for x in x_plot]
+        y_plot = P(x_plot)
         
         # Graficar
         plt.figure(figsize=(10, 6))
@@ -1,63 +1,57 @@
 import numpy as np
-from scipy.interpolate import CubicSpline
-import matplotlib
-matplotlib.use('Agg')  # Usar backend no interactivo
-import matplotlib.pyplot as plt
 import io
 import base64
 
-def spline_cubico_interpolation(x_values, y_values):
+from methods.cap3.inputs import prepare_points, DETAIL_MAX_POINTS
+from methods.cap3.piecewise import PiecewisePolynomial
+from methods.cap3.registry import register as register_interpolant
+from methods.metrics import stage
+
+@stage('interpolate')
+def spline_cubico_interpolation(x_values, y_values, register=False, formulas=None, plot=None):
     """
     Método de interpolación por splines cúbicos
     
     Args:
         x_values (list): Lista de valores x
         y_values (list): Lista de valores y
+        register (bool): Guardar el interpolante y devolver su id para
+            evaluarlo con /evaluate/<id>
+        formulas (bool): Devolver la expresión de cada tramo. Por defecto solo
+            con hasta DETAIL_MAX_POINTS puntos
+        plot (bool): Generar la imagen. Mismo valor por defecto que formulas
         
     Returns:
         dict: Resultado con los tramos del spline cúbico
     """
     results = {
         'splines': [],
+        'id': None,
         'image_base64': None,
         'success': False,
         'error': None
     }
     
     try:
-        # Validaciones
-        if not x_values or not y_values:
-            raise ValueError("Las listas de x o y están vacías.")
-        
-        if len(x_values) < 3:
-            raise ValueError("Se requieren al menos tres puntos para calcular un spline cúbico.")
-        
-        if len(x_values) != len(y_values):
-            raise ValueError("Las listas de x e y deben tener la misma longitud.")
-        
-        if len(set(x_values)) != len(x_values):
-            raise ValueError("Hay valores de x repetidos, lo cual no es válido para la interpolación.")
-        
-        # Validar que son números finitos
-        for i, val in enumerate(x_values):
-            if not isinstance(val, (int, float)) or not np.isfinite(val):
-                raise ValueError(f"El valor en x[{i}] = '{val}' no es un número válido.")
-        
-        for i, val in enumerate(y_values):
-            if not isinstance(val, (int, float)) or not np.isfinite(val):
-                raise ValueError(f"El valor en y[{i}] = '{val}' no es un número válido.")
-        
-        # Ordenar los puntos por x
-        sorted_pairs = sorted(zip(x_values, y_values))
-        x_values_sorted, y_values_sorted = zip(*sorted_pairs)
-        
-        # Crear spline cúbico natural
+        # Validaciones (vectorizadas, ver methods.cap3.inputs), puntos ordenados por x
+        x_values_sorted, y_values_sorted = prepare_points(
+            x_values, y_values, min_points=3, sort=True,
+            min_points_message="Se requieren al menos tres puntos para calcular un spline cúbico.")
+        n = len(x_values_sorted)
+        
+        # Crear spline cúbico natural (SciPy se importa en la primera llamada)
+        from scipy.interpolate import CubicSpline
         cs = CubicSpline(x_values_sorted, y_values_sorted, bc_type='natural')
+        if register:
+            results['id'] = register_interpolant(PiecewisePolynomial(cs.x, cs.c))
         
+        # Fórmulas por tramo (por defecto solo con pocos puntos)
+        if formulas is None:
+            formulas = n <= DETAIL_MAX_POINTS
         tramos = []
-        for i in range(len(x_values_sorted) - 1):
-            x0 = x_values_sorted[i]
-            coefs = cs.c[:, i]  # Coeficientes para este segmento
+        segment_coefs = cs.c.T.tolist() if formulas else []
+        for x0, coefs in zip(x_values_sorted.tolist(), segment_coefs):
+            # coefs: coeficientes para este segmento
             
             terms = []
             powers = [3, 2, 1, 0]
@@ -76,10 +70,12 @@ def spline_cubico_interpolation(x_values, y_values):
             tramos.append(expression)
         
         # Generar gráfico
-        image_base64 = plot_piecewise_functions(tramos, x_values_sorted, y_values_sorted)
+        if plot is None:
+            plot = n <= DETAIL_MAX_POINTS
+        if plot:
+            results['image_base64'] = plot_piecewise_functions(cs, x_values_sorted, y_values_sorted)
         
         results['splines'] = tramos
-        results['image_base64'] = image_base64
         results['success'] = True
         
     except ValueError as ve:
@@ -89,19 +85,21 @@ def spline_cubico_interpolation(x_values, y_values):
     
     return results
 
-def plot_piecewise_functions(splines, x_vals, y_vals):
+@stage('plot')
+def plot_piecewise_functions(cs, x_vals, y_vals):
     """
     Genera un gráfico de las funciones por tramos del spline cúbico
     """
+    import matplotlib
+    matplotlib.use('Agg')  # Usar backend no interactivo
+    import matplotlib.pyplot as plt
+    
     try:
         plt.figure(figsize=(10, 6))
         
         # Crear un rango continuo para mostrar el spline completo
-        x_min, x_max = min(x_vals), max(x_vals)
+        x_min, x_max = x_vals[0], x_vals[-1]
         x_plot = np.linspace(x_min, x_max, 400)
-        
-        # Recrear el spline para graficación continua
-        cs = CubicSpline(x_vals, y_vals, bc_type='natural')
         y_plot = cs(x_plot)
         
         plt.plot(x_plot, y_plot, label="Spline Cúbico", color="blue", linewidth=2)
@@ -1,84 +1,68 @@
 import numpy as np
-import matplotlib
-matplotlib.use('Agg')  # Usar backend no interactivo
-import matplotlib.pyplot as plt
 import io
 import base64
 
-def spline_lineal_interpolation(x_values, y_values):
+from methods.cap3.inputs import prepare_points, DETAIL_MAX_POINTS
+from methods.cap3.piecewise import PiecewisePolynomial
+from methods.cap3.registry import register as register_interpolant
+from methods.metrics import stage
+
+# Tramos hasta los que el gráfico muestra cada uno en la leyenda
+MAX_LEGEND_SEGMENTS = 20
+
+@stage('interpolate')
+def spline_lineal_interpolation(x_values, y_values, register=False, formulas=None, plot=None):
     """
     Método de interpolación por splines lineales
     
     Args:
         x_values (list): Lista de valores x
         y_values (list): Lista de valores y
+        register (bool): Guardar el interpolante y devolver su id para
+            evaluarlo con /evaluate/<id>
+        formulas (bool): Devolver la expresión de cada tramo. Por defecto solo
+            con hasta DETAIL_MAX_POINTS puntos
+        plot (bool): Generar la imagen. Mismo valor por defecto que formulas
         
     Returns:
         dict: Resultado con los tramos del spline lineal
     """
     results = {
         'splines': [],
+        'id': None,
         'image_base64': None,
         'success': False,
         'error': None
     }
     
     try:
-        # Validaciones
-        if not x_values or not y_values:
-            raise ValueError("Las listas de x o y están vacías.")
-        
-        if len(x_values) < 2 or len(y_values) < 2:
-            raise ValueError("Se requieren al menos dos puntos para interpolar.")
-        
-        if len(x_values) != len(y_values):
-            raise ValueError("Las listas de x e y deben tener la misma longitud.")
-        
-        if len(set(x_values)) != len(x_values):
-            raise ValueError("Hay valores de x repetidos, lo cual no es válido para la interpolación.")
-        
-        # Validar que son números finitos
-        for i, val in enumerate(x_values):
-            if not isinstance(val, (int, float)) or not np.isfinite(val):
-                raise ValueError(f"El valor en x[{i}] = '{val}' no es un número válido.")
-        
-        for i, val in enumerate(y_values):
-            if not isinstance(val, (int, float)) or not np.isfinite(val):
-                raise ValueError(f"El valor en y[{i}] = '{val}' no es un número válido.")
-        
-        # Ordenar los puntos por x
-        sorted_pairs = sorted(zip(x_values, y_values))
-        x_values_sorted, y_values_sorted = zip(*sorted_pairs)
-        n = len(x_values_sorted)
-        
-        tramos = []
-        
-        # Calcular cada tramo lineal
-        for i in range(n - 1):
-            x0, x1 = x_values_sorted[i], x_values_sorted[i + 1]
-            y0, y1 = y_values_sorted[i], y_values_sorted[i + 1]
-            
-            if x1 == x0:
-                raise ValueError(f"Los valores x[{i}] y x[{i+1}] son iguales, lo que genera una división por cero.")
-            
-            # Calcular pendiente e intercepto
-            m = (y1 - y0) / (x1 - x0)
-            b = y0 - m * x0
-            
-            # Formatear expresión
-            sign_b = "+" if b >= 0 else "-"
-            b_str = f"{abs(b)}"
-            sign_m = "+" if m >= 0 else "-"
-            m_str = f"{abs(m)}"
-            
-            expr = f"{sign_m}{m_str}*x {sign_b}{b_str}"
-            tramos.append(expr)
+        # Validaciones (vectorizadas, ver methods.cap3.inputs), puntos ordenados por x
+        x_sorted, y_sorted = prepare_points(x_values, y_values, sort=True)
+        n = len(x_sorted)
+        
+        # Pendientes e interceptos de todos los tramos a la vez
+        m = np.diff(y_sorted) / np.diff(x_sorted)
+        b = y_sorted[:-1] - m * x_sorted[:-1]
+        
+        if register:
+            # Tramo i: y_i + m_i (x - x_i)
+            P = PiecewisePolynomial(x_sorted, [m, y_sorted[:-1]])
+            results['id'] = register_interpolant(P)
+        
+        # Fórmulas por tramo (por defecto solo con pocos puntos)
+        if formulas is None:
+            formulas = n <= DETAIL_MAX_POINTS
+        if formulas:
+            results['splines'] = [
+                f"{'+' if m_i >= 0 else '-'}{abs(m_i)}*x {'+' if b_i >= 0 else '-'}{abs(b_i)}"
+                for m_i, b_i in zip(m.tolist(), b.tolist())
+            ]
         
         # Generar gráfico
-        image_base64 = plot_piecewise_functions(tramos, x_values_sorted, y_values_sorted)
-        
-        results['splines'] = tramos
-        results['image_base64'] = image_base64
+        if plot is None:
+            plot = n <= DETAIL_MAX_POINTS
+        if plot:
+            results['image_base64'] = plot_piecewise_functions(x_sorted, y_sorted)
         results['success'] = True
         
     except ValueError as ve:
@@ -88,23 +72,25 @@ def spline_lineal_interpolation(x_values, y_values):
     
     return results
 
-def plot_piecewise_functions(splines, x_vals, y_vals):
+@stage('plot')
+def plot_piecewise_functions(x_vals, y_vals):
     """
     Genera un gráfico de las funciones por tramos
     """
+    import matplotlib
+    matplotlib.use('Agg')  # Usar backend no interactivo
+    import matplotlib.pyplot as plt
+    
     try:
         plt.figure(figsize=(10, 6))
         
-        for i in range(len(splines)):
-            x0 = x_vals[i]
-            x1 = x_vals[i + 1]
-            expr = splines[i].replace("^", "**")
-            
-            f = lambda x: eval(expr.replace("x", f"({x})"))  # para asegurar precedencia
-            
-            x_plot = np.linspace(x0, x1, 100)
-            y_plot = [f(x) for x in x_plot]
-            plt.plot(x_plot, y_plot, label=f"Tramo {i+1}")
+        # Cada tramo es el segmento entre dos puntos consecutivos; con muchos
+        # tramos se dibujan como una sola línea para no saturar la leyenda
+        if len(x_vals) - 1 <= MAX_LEGEND_SEGMENTS:
+            for i in range(len(x_vals) - 1):
+                plt.plot(x_vals[i:i + 2], y_vals[i:i + 2], label=f"Tramo {i+1}")
+        else:
+            plt.plot(x_vals, y_vals, label="Spline lineal")
         
         plt.scatter(x_vals, y_vals, color='red', label='Puntos', zorder=5)
         plt.legend()
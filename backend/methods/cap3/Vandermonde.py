@@ -1,24 +1,41 @@
+import time
+
 import numpy as np
-import matplotlib
-matplotlib.use('Agg')  # Usar backend no interactivo
-import matplotlib.pyplot as plt
 import io
 import base64
 
-def vandermonde_interpolation(x_values, y_values):
+from methods.cap3.inputs import prepare_points
+from methods.cap3.piecewise import PiecewisePolynomial
+from methods.cap3.registry import register as register_interpolant
+from methods.metrics import stage
+
+SOLVERS = ('bjorck_pereyra', 'dense')
+
+@stage('interpolate')
+def vandermonde_interpolation(x_values, y_values, solver='bjorck_pereyra', plot=True, register=False):
     """
     Método de interpolación de Vandermonde
     
     Args:
         x_values (list): Lista de valores x
-        y_values (list): Lista de valores y
-        
+        y_values (list): Lista de valores y, o lista de varias listas de y
+            que se resuelven a la vez contra los mismos nodos x
+        solver (str): 'bjorck_pereyra' resuelve el sistema en O(n^2) tiempo y
+            O(n) memoria sin formar la matriz; 'dense' forma np.vander y usa
+            np.linalg.solve (O(n^3), para comparar)
+        plot (bool): Generar la imagen del polinomio
+        register (bool): Guardar el interpolante y devolver su id para
+            evaluarlo con /evaluate/<id>
+    
     Returns:
         dict: Resultado con el polinomio y datos de la interpolación
     """
     results = {
         'polynomial': None,
         'polynomial_str': None,
+        'solver': None,
+        'solve_time': None,
+        'id': None,
         'image_base64': None,
         'success': False,
         'error': None,
@@ -26,41 +43,32 @@ def vandermonde_interpolation(x_values, y_values):
     }
     
     try:
-        # Validaciones
-        if not x_values or not y_values:
-            raise ValueError("Las listas de x o y están vacías.")
-        
-        if len(x_values) < 2 or len(y_values) < 2:
-            raise ValueError("Se requieren al menos dos puntos para interpolar.")
-        
-        if len(x_values) != len(y_values):
-            raise ValueError("Las listas de x e y deben tener la misma longitud.")
+        if solver not in SOLVERS:
+            raise ValueError(f"Solver inválido: '{solver}'. Use 'bjorck_pereyra' o 'dense'.")
         
-        if len(set(x_values)) != len(x_values):
-            raise np.linalg.LinAlgError("La matriz de Vandermonde no es invertible porque hay valores de X repetidos.")
-        
-        # Validar que son números finitos
-        for i, val in enumerate(x_values):
-            if not isinstance(val, (int, float)) or not np.isfinite(val):
-                raise ValueError(f"El valor en x[{i}] = '{val}' no es un número válido.")
-        
-        for i, val in enumerate(y_values):
-            if not isinstance(val, (int, float)) or not np.isfinite(val):
-                raise ValueError(f"El valor en y[{i}] = '{val}' no es un número válido.")
+        # Validaciones (vectorizadas, ver methods.cap3.inputs)
+        x, y = prepare_points(x_values, y_values, multiple=True,
+                              duplicate_message="La matriz de Vandermonde no es invertible porque hay valores de X repetidos.")
+        multiple = y.ndim == 2
         
         # Advertencia para muchos puntos
-        if len(x_values) > 12:
+        if len(x) > 12:
             results['warning'] = "Advertencia: interpolar con muchos puntos puede causar oscilaciones indeseadas."
         
-        # Crear matriz de Vandermonde y resolver el sistema
-        V = np.vander(x_values, increasing=False)
-        y = np.array(y_values)
-        coef = np.linalg.solve(V, y)
-        poly = np.poly1d(coef)
+        # Resolver V a = y (una columna por cada vector y)
+        start = time.perf_counter()
+        if solver == 'dense':
+            V = np.vander(x, increasing=False)
+            coef = np.linalg.solve(V, y.T).T
+        else:
+            coef = bjorck_pereyra(x, y.T).T[..., ::-1]
+        results['solve_time'] = time.perf_counter() - start
+        results['solver'] = solver
+        if register:
+            results['id'] = register_interpolant(PiecewisePolynomial.from_polynomial(coef))
         
         # Función para dar formato al polinomio
-        def format_polynomial_python_style(poly):
-            coeffs = poly.coefficients
+        def format_polynomial_python_style(coeffs):
             degree = len(coeffs) - 1
             terms = []
             for i, coef in enumerate(coeffs):
@@ -78,16 +86,18 @@ def vandermonde_interpolation(x_values, y_values):
                 terms.append(term)
             return " ".join(terms) if terms else "0"
         
-        polynomial_str = format_polynomial_python_style(poly)
+        if multiple:
+            results['polynomial'] = coef.tolist()  # Convertir a lista para JSON
+            results['polynomial_str'] = [format_polynomial_python_style(c) for c in coef]
+        else:
+            results['polynomial'] = coef.tolist()
+            results['polynomial_str'] = format_polynomial_python_style(coef)
         
         # Generar gráfico
-        image_base64 = plot_polynomial_expression(polynomial_str.replace("**", "^"), x_values, y_values)
-        
-        results['polynomial'] = poly.coefficients.tolist()  # Convertir a lista para JSON
-        results['polynomial_str'] = polynomial_str
-        results['image_base64'] = image_base64
+        if plot:
+            results['image_base64'] = plot_polynomials(np.atleast_2d(coef), x, np.atleast_2d(y))
         results['success'] = True
-        
+    
     except ValueError as ve:
         results['error'] = f"Error de entrada: {str(ve)}"
     except np.linalg.LinAlgError as lae:
@@ -97,23 +107,57 @@ def vandermonde_interpolation(x_values, y_values):
     
     return results
 
-def plot_polynomial_expression(expr, x_vals, y_vals):
+def bjorck_pereyra(x, y):
     """
-    Genera un gráfico del polinomio y los puntos de interpolación
+    Algoritmo de Björck-Pereyra para el sistema de Vandermonde V a = y.
+    
+    Primero calcula las diferencias divididas (forma de Newton) y luego las
+    convierte a la base monomial, ambos pasos en O(n^2) sin formar V.
+    
+    Args:
+        x (ndarray): Nodos, de tamaño n
+        y (ndarray): Lado derecho de tamaño n, o matriz n x k con k vectores
+    
+    Returns:
+        ndarray: Coeficientes a_0, ..., a_{n-1} (menor grado primero), con la
+            misma forma que y
     """
+    n = len(x)
+    c = np.array(y, dtype=float)
+    
+    # Etapa 1: diferencias divididas
+    for k in range(n - 1):
+        denominador = x[k + 1:] - x[:n - k - 1]
+        if c.ndim == 2:
+            denominador = denominador[:, None]
+        c[k + 1:] = (c[k + 1:] - c[k:n - 1]) / denominador
+    
+    # Etapa 2: de la forma de Newton a la base monomial
+    for k in range(n - 2, -1, -1):
+        c[k:n - 1] -= x[k] * c[k + 1:n]
+    
+    return c
+
+@stage('plot')
+def plot_polynomials(coefs, x_vals, y_vals):
+    """
+    Genera un gráfico de los polinomios y los puntos de interpolación
+    """
+    import matplotlib
+    matplotlib.use('Agg')  # Usar backend no interactivo
+    import matplotlib.pyplot as plt
+    
     try:
-        # Crear función a partir de la expresión
-        f = lambda x: eval(expr.replace("^", "**"))
-        
-        # Rango de graficación
+        # Rango de graficación, evaluado con np.polyval
         x_min, x_max = min(x_vals), max(x_vals)
         x_plot = np.linspace(x_min - 1, x_max + 1, 400)
-        y_plot = [f(x) for x in x_plot]
         
         # Graficar
         plt.figure(figsize=(10, 6))
-        plt.plot(x_plot, y_plot, label="Polinomio de Vandermonde", color="blue")
-        plt.scatter(x_vals, y_vals, color="red", label="Puntos", zorder=5)
+        for i, (coef, y) in enumerate(zip(coefs, y_vals)):
+            plt.plot(x_plot, np.polyval(coef, x_plot), label="Polinomio de Vandermonde" if i == 0 else None,
+                     color="blue")
+            plt.scatter(x_vals, y, color="red", label="Puntos" if i == 0 else None, zorder=5)
         plt.legend()
         plt.title("Interpolación de Vandermonde")
         plt.xlabel("x")
@@ -127,6 +171,6 @@ def plot_polynomial_expression(expr, x_vals, y_vals):
         buf.seek(0)
         image_base64 = base64.b64encode(buf.getvalue()).decode('utf-8')
         return image_base64
-        
+    
     except Exception as e:
         return None
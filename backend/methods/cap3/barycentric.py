@@ -0,0 +1,121 @@
+import numpy as np
+
+# Elementos por bloque al evaluar (puntos x nodos), para acotar la memoria
+CHUNK_ELEMENTS = 1 << 15
+
+
+class BarycentricInterpolant:
+    """
+    Polinomio interpolante de Lagrange en forma baricéntrica.
+
+    p(t) = sum(w_j y_j / (t - x_j)) / sum(w_j / (t - x_j))
+
+    Los pesos w_j = 1 / prod_{k != j} (x_j - x_k) se calculan una vez en
+    O(n^2) y en escala logarítmica, de modo que no se desbordan con cientos
+    de nodos. Cada evaluación cuesta O(n) por punto y se hace por bloques
+    vectorizados; los coeficientes en base monomial solo se calculan si se
+    piden con coefficients().
+    """
+
+    def __init__(self, x_values, y_values):
+        self.x = np.asarray(x_values, dtype=float)
+        self.y = np.asarray(y_values, dtype=float)
+        n = self.x.size
+
+        log_w = np.empty(n)
+        sign = np.empty(n)
+        for j in range(n):
+            diff = self.x[j] - self.x
+            diff[j] = 1.0
+            if np.min(np.abs(diff)) < 1e-12:
+                raise ZeroDivisionError("Dos valores de x son demasiado cercanos, lo que puede causar errores numéricos.")
+            log_w[j] = -np.sum(np.log(np.abs(diff)))
+            sign[j] = np.prod(np.sign(diff))
+
+        # Pesos reescalados: el factor común se cancela en la forma baricéntrica
+        self.log_scale = np.max(log_w)
+        self.weights = sign * np.exp(log_w - self.log_scale)
+        self._node_values = {0: self.y}
+        self._D = None
+
+    @property
+    def nbytes(self):
+        return self.x.nbytes + self.weights.nbytes + sum(v.nbytes for v in self._node_values.values())
+
+    def __len__(self):
+        return self.x.size
+
+    def __call__(self, t):
+        """Evalúa el polinomio en un escalar o arreglo de puntos."""
+        return self._evaluate(t, self.y)
+
+    def derivative(self, t, order=1):
+        """
+        Evalúa la derivada de orden `order`.
+
+        p^(k) tiene grado menor que n, así que es el interpolante con los
+        mismos nodos y pesos de sus valores en los nodos, que se obtienen
+        aplicando k veces la matriz de diferenciación baricéntrica.
+        """
+        return self._evaluate(t, self._derivative_values(order))
+
+    def _derivative_values(self, order):
+        if order not in self._node_values:
+            self._node_values[order] = self._differentiation_matrix() @ self._derivative_values(order - 1)
+        return self._node_values[order]
+
+    def _differentiation_matrix(self):
+        # D_ij = (w_j / w_i) / (x_i - x_j), D_ii = -sum_{j != i} D_ij
+        if self._D is None:
+            diff = self.x[:, None] - self.x[None, :]
+            np.fill_diagonal(diff, 1.0)
+            D = (self.weights[None, :] / self.weights[:, None]) / diff
+            np.fill_diagonal(D, 0.0)
+            np.fill_diagonal(D, -D.sum(axis=1))
+            self._D = D
+        return self._D
+
+    def _evaluate(self, t, y):
+        t = np.asarray(t, dtype=float)
+        flat = t.ravel()
+        out = np.empty(flat.size)
+        n = self.x.size
+        chunk = max(1, CHUNK_ELEMENTS // n)
+        buffer = np.empty((min(chunk, flat.size), n))
+        # Numerador y denominador en un solo producto matriz-matriz
+        W = np.column_stack([self.weights * y, self.weights])
+
+        for start in range(0, flat.size, chunk):
+            block = flat[start:start + chunk]
+            k = buffer[:block.size]
+            np.subtract(block[:, None], self.x[None, :], out=k)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                np.reciprocal(k, out=k)
+                sums = k @ W
+                values = sums[:, 0] / sums[:, 1]
+
+            # En los nodos la fórmula es inf/inf: el valor es y_j
+            bad = np.flatnonzero(~np.isfinite(values))
+            if bad.size:
+                nearest = np.argmin(np.abs(block[bad, None] - self.x[None, :]), axis=1)
+                hit = block[bad] == self.x[nearest]
+                values[bad[hit]] = y[nearest[hit]]
+            out[start:start + chunk] = values
+
+        return out.reshape(t.shape) if t.ndim else out[0]
+
+    def coefficients(self):
+        """
+        Coeficientes en base monomial (mayor grado primero), en O(n^2).
+
+        Cada base es l(x) / (x - x_j), con l(x) = prod(x - x_k); la división
+        sintética se hace para todos los nodos a la vez.
+        """
+        n = self.x.size
+        ell = np.poly(self.x)
+        q = np.empty((n, n))
+        q[:, 0] = ell[0]
+        for k in range(1, n):
+            q[:, k] = ell[k] + self.x * q[:, k - 1]
+        with np.errstate(over='ignore'):
+            return (self.weights * self.y) @ q * np.exp(self.log_scale)
@@ -0,0 +1,139 @@
+import threading
+
+import numpy as np
+
+
+class NewtonInterpolant:
+    """
+    Polinomio interpolante en forma de Newton con nodos incrementales.
+
+    Guarda los coeficientes c_k = f[x_0, ..., x_k] y la última fila de la
+    tabla de diferencias divididas, f[x_{n-1-k}, ..., x_{n-1}]. Agregar un
+    nodo solo extiende esa fila, en O(n), sin recalcular la tabla. La
+    evaluación usa la forma anidada (Horner) sobre arreglos de puntos.
+    """
+
+    def __init__(self, x_values, y_values):
+        x = np.asarray(x_values, dtype=float)
+        y = np.asarray(y_values, dtype=float)
+        n = x.size
+
+        # Tabla por columnas: en el paso j, c[i] = f[x_{i-j}, ..., x_i]
+        c = y.copy()
+        last_row = np.empty(n)
+        last_row[0] = c[-1]
+        for j in range(1, n):
+            denominador = x[j:] - x[:-j]
+            if np.min(np.abs(denominador)) < 1e-12:
+                raise ZeroDivisionError("Se detectó una división por cero en los coeficientes.")
+            c[j:] = (c[j:] - c[j - 1:-1]) / denominador
+            last_row[j] = c[-1]
+
+        self._x = x
+        self._coef = c
+        self._last_row = last_row
+        self._n = n
+        self._lock = threading.Lock()
+
+    @property
+    def x(self):
+        return self._x[:self._n]
+
+    @property
+    def coef(self):
+        return self._coef[:self._n]
+
+    @property
+    def nbytes(self):
+        return self._x.nbytes + self._coef.nbytes + self._last_row.nbytes
+
+    def __len__(self):
+        return self._n
+
+    def _grow(self, size):
+        # Crecimiento geométrico para que agregar nodos sea O(n) amortizado
+        capacity = max(size, 2 * self._x.size)
+        for name in ('_x', '_coef', '_last_row'):
+            old = getattr(self, name)
+            new = np.empty(capacity)
+            new[:self._n] = old[:self._n]
+            setattr(self, name, new)
+
+    def append(self, x_new, y_new):
+        """
+        Agrega un nodo (x_new, y_new) en O(n) y devuelve su coeficiente f[x_0, ..., x_n].
+        """
+        return self.extend([x_new], [y_new])[0]
+
+    def extend(self, x_values, y_values):
+        """
+        Agrega varios nodos y devuelve sus coeficientes. Todo el lote se valida
+        antes de modificar el interpolante: si un x se repite (en el lote o
+        con un nodo existente) no se agrega ninguno.
+        """
+        x_values = np.atleast_1d(np.asarray(x_values, dtype=float))
+        y_values = np.atleast_1d(np.asarray(y_values, dtype=float))
+        with self._lock:
+            nodes = np.concatenate([self.x, x_values])
+            for i, x_new in enumerate(x_values):
+                if np.min(np.abs(x_new - nodes[:self._n + i]), initial=np.inf) < 1e-12:
+                    raise ValueError(f"El valor x = {x_new} ya es un nodo, lo cual no es válido para la interpolación.")
+            return [self._append(x_new, y_new) for x_new, y_new in zip(x_values, y_values)]
+
+    def _append(self, x_new, y_new):
+        # Llamar con el candado tomado y el nodo ya validado
+        n = self._n
+        if n + 1 > self._x.size:
+            self._grow(n + 1)
+        x = self._x[:n]
+
+        # Nueva fila: r_k = (r_{k-1} - fila anterior_{k-1}) / (x_new - x_{n-k})
+        old_row = self._last_row[:n].copy()
+        row = self._last_row
+        row[0] = y_new
+        for k in range(1, n + 1):
+            row[k] = (row[k - 1] - old_row[k - 1]) / (x_new - x[n - k])
+
+        self._x[n] = x_new
+        self._coef[n] = row[n]
+        self._n = n + 1
+        return float(row[n])
+
+    def __call__(self, t):
+        """Evalúa el polinomio (forma anidada de Newton) en un escalar o arreglo."""
+        t = np.asarray(t, dtype=float)
+        x, c = self.x, self.coef
+        p = np.full(t.shape, c[-1])
+        for k in range(self._n - 2, -1, -1):
+            p *= t - x[k]
+            p += c[k]
+        return p if t.ndim else p[()]
+
+    def derivative(self, t, order=1):
+        """
+        Evalúa la derivada de orden `order` con Horner extendido: en cada paso
+        se actualizan también las derivadas acumuladas hasta ese orden.
+        """
+        t = np.asarray(t, dtype=float)
+        x, c = self.x, self.coef
+        # d[m] acumula p^(m) / m!
+        d = [np.full(t.shape, c[-1])] + [np.zeros(t.shape) for _ in range(order)]
+        for k in range(self._n - 2, -1, -1):
+            dt = t - x[k]
+            for m in range(order, 0, -1):
+                d[m] *= dt
+                d[m] += d[m - 1]
+            d[0] *= dt
+            d[0] += c[k]
+        p = d[order] * float(np.prod(np.arange(1, order + 1)))
+        return p if t.ndim else p[()]
+
+    def coefficients(self):
+        """Coeficientes en base monomial (mayor grado primero), en O(n^2)."""
+        x, c = self.x, self.coef
+        poly = np.array([c[-1]])
+        for k in range(self._n - 2, -1, -1):
+            # poly * (x - x_k) + c_k
+            poly = np.append(poly, 0.0) - x[k] * np.append(0.0, poly)
+            poly[-1] += c[k]
+        return poly
@@ -0,0 +1,79 @@
+import numpy as np
+
+# Con más puntos, por defecto no se generan las fórmulas por tramo ni la imagen
+DETAIL_MAX_POINTS = 1000
+
+
+def _as_array(values, name):
+    """Convierte a arreglo float; si falla, ubica el primer elemento inválido."""
+    try:
+        return np.asarray(values, dtype=float)
+    except (TypeError, ValueError):
+        for index, value in np.ndenumerate(np.asarray(values, dtype=object)):
+            try:
+                float(value)
+            except (TypeError, ValueError):
+                position = ", ".join(str(i) for i in index)
+                raise ValueError(f"El valor en {name}[{position}] = '{value}' no es un número válido.")
+        raise ValueError(f"Los valores de {name} no tienen una forma válida.")
+
+
+def _check_finite(values, name):
+    bad = np.flatnonzero(~np.isfinite(values.ravel()))
+    if bad.size:
+        index = np.unravel_index(bad[0], values.shape)
+        position = ", ".join(str(i) for i in index)
+        raise ValueError(f"El valor en {name}[{position}] = '{values[index]}' no es un número válido.")
+
+
+def prepare_points(x_values, y_values, min_points=2, min_points_message=None, sort=False,
+                   multiple=False, duplicate_message=None):
+    """
+    Valida y convierte los puntos de interpolación con operaciones sobre
+    arreglos completos (sin recorrer elemento por elemento).
+
+    Args:
+        x_values (array): Valores x
+        y_values (array): Valores y (o una lista de vectores y si multiple=True)
+        min_points (int): Mínimo de puntos requeridos
+        min_points_message (str): Mensaje si hay menos de min_points puntos
+        sort (bool): Devolver los puntos ordenados por x
+        multiple (bool): Aceptar y de forma (k, n), k vectores sobre los mismos x
+        duplicate_message (str): Mensaje si hay valores de x repetidos
+
+    Returns:
+        tuple: (x, y) como arreglos de NumPy
+
+    Raises:
+        ValueError: Con el mismo mensaje que mostraban las validaciones de cada método
+    """
+    if x_values is None or y_values is None or len(x_values) == 0 or len(y_values) == 0:
+        raise ValueError("Las listas de x o y están vacías.")
+
+    x = _as_array(x_values, 'x')
+    y = _as_array(y_values, 'y')
+    if x.ndim != 1 or y.ndim > (2 if multiple else 1):
+        raise ValueError("Las listas de x e y deben ser listas de números.")
+
+    if x.size < min_points:
+        raise ValueError(min_points_message or "Se requieren al menos dos puntos para interpolar.")
+
+    if y.shape[-1] != x.size:
+        raise ValueError("Las listas de x e y deben tener la misma longitud.")
+
+    # Si x ya viene creciente no hace falta ordenar; si no, argsort una sola vez
+    step = np.diff(x)
+    if np.all(step > 0):
+        order = None
+    else:
+        order = np.argsort(x)
+        if np.any(np.diff(x[order]) == 0):
+            raise ValueError(duplicate_message or "Hay valores de x repetidos, lo cual no es válido para la interpolación.")
+
+    # Validar que son números finitos
+    _check_finite(x, 'x')
+    _check_finite(y, 'y')
+
+    if sort and order is not None:
+        return x[order], y[..., order]
+    return x, y
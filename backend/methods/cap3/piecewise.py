@@ -0,0 +1,72 @@
+import numpy as np
+
+
+class PiecewisePolynomial:
+    """
+    Polinomio por tramos en base local, como los splines.
+
+    En el tramo i, p(t) = sum_j c[j, i] (t - breaks[i])^(k - j), con los
+    coeficientes de mayor grado primero; breaks puede incluir el extremo
+    derecho del último tramo. Un polinomio global es el caso de un solo
+    tramo con breaks = [0]. Si c tiene una tercera dimensión, cada columna
+    es un polinomio distinto sobre los mismos tramos.
+
+    La evaluación ubica el tramo de todos los puntos a la vez con
+    np.searchsorted y aplica Horner de forma vectorizada; fuera del rango
+    se extrapola con el primer o el último tramo.
+    """
+
+    def __init__(self, breaks, coefs):
+        self.breaks = np.asarray(breaks, dtype=float)
+        self.coefs = np.asarray(coefs, dtype=float)
+        self._derivatives = {0: self.coefs}
+
+    @classmethod
+    def from_polynomial(cls, coefs):
+        """Polinomio global a partir de coeficientes monomiales (mayor grado primero)."""
+        coefs = np.asarray(coefs, dtype=float)
+        if coefs.ndim == 2:
+            # Una fila por polinomio -> (grado + 1, 1, polinomios)
+            return cls([0.0], coefs.T[:, None, :])
+        return cls([0.0], coefs[:, None])
+
+    @property
+    def nbytes(self):
+        return self.breaks.nbytes + sum(c.nbytes for c in self._derivatives.values())
+
+    def __len__(self):
+        return self.coefs.shape[1]
+
+    def _coefs(self, order):
+        if order not in self._derivatives:
+            c = self._coefs(order - 1)
+            degree = c.shape[0] - 1
+            if degree == 0:
+                c = np.zeros_like(c)
+            else:
+                factors = np.arange(degree, 0, -1, dtype=float)
+                c = c[:-1] * factors.reshape((-1,) + (1,) * (c.ndim - 1))
+            self._derivatives[order] = c
+        return self._derivatives[order]
+
+    def __call__(self, t):
+        return self.derivative(t, 0)
+
+    def derivative(self, t, order=1):
+        """Evalúa la derivada de orden `order` en un escalar o arreglo de puntos."""
+        t = np.asarray(t, dtype=float)
+        flat = t.ravel()
+        c = self._coefs(order)
+
+        segment = np.searchsorted(self.breaks, flat, side='right') - 1
+        np.clip(segment, 0, c.shape[1] - 1, out=segment)
+        dx = flat - self.breaks[segment]
+        if c.ndim == 3:
+            dx = dx[:, None]
+
+        p = c[0, segment]
+        for j in range(1, c.shape[0]):
+            p = p * dx + c[j, segment]
+
+        shape = t.shape + c.shape[2:]
+        return p.reshape(shape) if t.ndim else p[0]
@@ -0,0 +1,62 @@
+import uuid
+
+import numpy as np
+
+from methods.lru import LRUCache
+
+# Límites del registro de interpolantes ajustados (compartido por el proceso)
+MAX_INTERPOLANTS = 256
+MAX_BYTES = 256 * 1024 * 1024
+
+_interpolants = LRUCache(MAX_INTERPOLANTS, MAX_BYTES)
+
+
+def _size(interpolant):
+    return getattr(interpolant, 'nbytes', 0)
+
+
+def register(interpolant):
+    """Guarda un interpolante ajustado y devuelve el id con el que se consulta."""
+    interpolant_id = uuid.uuid4().hex
+    _interpolants.put(interpolant_id, interpolant, _size(interpolant))
+    return interpolant_id
+
+
+def get_interpolant(interpolant_id):
+    """Devuelve el interpolante registrado o lanza KeyError si no existe o expiró."""
+    interpolant = _interpolants.get(interpolant_id)
+    if interpolant is None:
+        raise KeyError(f"No existe un interpolante con id '{interpolant_id}' (puede haber expirado).")
+    return interpolant
+
+
+def update(interpolant_id, interpolant):
+    """Vuelve a guardar un interpolante modificado para actualizar su tamaño."""
+    _interpolants.put(interpolant_id, interpolant, _size(interpolant))
+
+
+def registry_stats():
+    return _interpolants.stats()
+
+
+def evaluate(interpolant_id, x, derivatives=()):
+    """
+    Evalúa un interpolante registrado en un arreglo de puntos.
+
+    Args:
+        interpolant_id (str): Id devuelto por la ruta de interpolación
+        x (array): Puntos de evaluación
+        derivatives (list): Órdenes de derivada a calcular además de los valores
+
+    Returns:
+        dict: 'values' y, por cada orden pedido, su arreglo en 'derivatives'
+    """
+    interpolant = get_interpolant(interpolant_id)
+    x = np.asarray(x, dtype=float).ravel()
+    orders = sorted({int(order) for order in derivatives})
+    if any(order < 1 for order in orders):
+        raise ValueError("Los órdenes de derivada deben ser enteros positivos.")
+    return {
+        'values': interpolant(x),
+        'derivatives': {order: interpolant.derivative(x, order) for order in orders},
+    }
@@ -0,0 +1,204 @@
+import ast
+import importlib
+import re
+import sys
+
+from methods.lru import LRUCache
+from methods.metrics import stage
+from methods.symbolic import parse, derivatives, compile_source, pool_booting
+
+# Límites por defecto de las cachés compartidas por todo el proceso
+MAX_EXPRESSIONS = 512
+MAX_FUNCTIONS = 1024
+MAX_DERIVATIVES = 256
+MAX_BYTES = 32 * 1024 * 1024
+
+# Estimaciones aproximadas del tamaño en memoria (bytes)
+_BYTES_PER_NODE = 200
+_BYTES_PER_FUNCTION = 4096
+
+# Expresiones que se compilan sin SymPy mientras arranca el grupo simbólico:
+# x, números, + - * / **, y estas funciones de un argumento
+SIMPLE_FUNCTIONS = ('sin', 'cos', 'tan', 'exp', 'log', 'sqrt')
+MAX_SIMPLE_LENGTH = 256
+_SIMPLE_OPERATORS = (ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Pow)
+
+_OPERATOR_SPACES = re.compile(r'\s*([-+*/^(),])\s*')
+_SPACES = re.compile(r'\s+')
+
+_expressions = LRUCache(MAX_EXPRESSIONS, MAX_BYTES)
+_functions = LRUCache(MAX_FUNCTIONS, MAX_BYTES)
+_derivatives = LRUCache(MAX_DERIVATIVES, MAX_BYTES)
+
+
+def normalize_expression(function_text):
+    """
+    Normaliza el texto de una función para usarlo como llave de caché.
+
+    Quita los espacios alrededor de operadores y paréntesis y convierte
+    '^' en '**' (sympify ya los trata igual), de modo que "x^2 - 1" y
+    "x**2-1" comparten la misma entrada.
+    """
+    text = str(function_text).strip().replace('^', '**')
+    text = _OPERATOR_SPACES.sub(r'\1', text)
+    return _SPACES.sub(' ', text)
+
+
+def _expression_size(key, expr):
+    from sympy import preorder_traversal
+    nodes = sum(1 for _ in preorder_traversal(expr))
+    return sys.getsizeof(key) + nodes * _BYTES_PER_NODE
+
+
+def get_expression(function_text):
+    """
+    Devuelve la expresión de SymPy para el texto dado, usando la caché.
+
+    El texto se interpreta en un proceso aislado (methods.symbolic), de modo
+    que una expresión patológica no bloquea al servidor. Los errores de
+    sympify se propagan y no se guardan en la caché.
+    """
+    key = normalize_expression(function_text)
+    expr = _expressions.get(key)
+    if expr is None:
+        expr = parse(key)
+        _expressions.put(key, expr, _expression_size(key, expr))
+    return expr
+
+
+def _load(source, backend):
+    """
+    Reconstruye la función de lambdify a partir del código generado en el
+    proceso simbólico; así este proceso no necesita importar SymPy.
+    """
+    namespace = dict(vars(importlib.import_module(backend)))
+    exec(source, namespace)
+    return namespace['_lambdifygenerated']
+
+
+def _lambdify(expr, backend, cse=False):
+    # Respaldo para expresiones con funciones de SymPy sin equivalente en el backend.
+    # Las derivadas vienen en x real (ver methods.symbolic._derivatives)
+    from sympy import lambdify, Symbol
+    exprs = expr if isinstance(expr, list) else [expr]
+    x = next((s for e in exprs for s in e.free_symbols if s.name == 'x'), Symbol('x'))
+    return lambdify(x, expr, backend, cse=cse)
+
+
+def _is_constant(node):
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.UAdd, ast.USub)):
+        node = node.operand
+    return isinstance(node, ast.Constant) and type(node.value) in (int, float)
+
+
+def _is_simple(node):
+    if isinstance(node, ast.BinOp):
+        if isinstance(node.op, ast.Pow) and not _is_constant(node.right):
+            # x**(1/2) es sqrt(x) en SymPy (error de dominio con x < 0, no un complejo)
+            return False
+        return isinstance(node.op, _SIMPLE_OPERATORS) and _is_simple(node.left) and _is_simple(node.right)
+    if isinstance(node, ast.UnaryOp):
+        return isinstance(node.op, (ast.UAdd, ast.USub)) and _is_simple(node.operand)
+    if isinstance(node, ast.Call):
+        return (isinstance(node.func, ast.Name) and node.func.id in SIMPLE_FUNCTIONS
+                and len(node.args) == 1 and not node.keywords and _is_simple(node.args[0]))
+    if isinstance(node, ast.Name):
+        return node.id == 'x'
+    return _is_constant(node)
+
+
+def _compile_simple(text, backend):
+    """
+    Compila en este proceso, sin SymPy, una expresión con solo x, números,
+    + - * / ** (exponente numérico) y SIMPLE_FUNCTIONS; None si no aplica.
+
+    Evalúa la misma función que lambdify, aunque en otro orden de operaciones
+    (SymPy reordena y agrupa los términos), así que puede diferir en el último
+    dígito. Los enteros se vuelven flotantes para no operar con enteros sin límite.
+    """
+    if len(text) > MAX_SIMPLE_LENGTH:
+        return None
+    try:
+        body = ast.parse(text, mode='eval').body
+    except (SyntaxError, ValueError, RecursionError, MemoryError):
+        return None
+    if not _is_simple(body):
+        return None
+    for node in ast.walk(body):
+        if isinstance(node, ast.Constant):
+            node.value = float(node.value)
+    return _load(f"def _lambdifygenerated(x):\n    return {ast.unparse(body)}\n", backend)
+
+
+def get_function(function_text, backend='math'):
+    """
+    Devuelve la función compilada f(x) para el texto dado.
+
+    Args:
+        function_text (str): Expresión en la variable x
+        backend (str): Módulo de lambdify, 'math' (escalares) o 'numpy' (arreglos)
+
+    Returns:
+        callable: Función compilada, compartida entre peticiones
+    """
+    key = (normalize_expression(function_text), backend)
+    f = _functions.get(key)
+    if f is None:
+        with stage('compile'):
+            if pool_booting():
+                # No esperar a que arranque el grupo simbólico: las expresiones
+                # simples se compilan aquí y no se guardan (la próxima petición
+                # usa lambdify, como siempre)
+                f = _compile_simple(key[0], backend)
+                if f is not None:
+                    return f
+            source, _ = compile_source(key[0], backend)
+            f = _load(source, backend) if source else _lambdify(get_expression(function_text), backend)
+        _functions.put(key, f, sys.getsizeof(key[0]) + _BYTES_PER_FUNCTION)
+    return f
+
+
+def get_derivatives(function_text, order=1, backend='math'):
+    """
+    Compila f y sus derivadas hasta `order` en una sola función.
+
+    Las derivadas se obtienen simbólicamente una vez (sin simplify) y se
+    compilan juntas con lambdify(cse=True), así las subexpresiones comunes
+    a f, f' y f'' se calculan una sola vez por punto.
+
+    Args:
+        function_text (str): Expresión en la variable x
+        order (int): Orden de la mayor derivada
+        backend (str): Módulo de lambdify, 'math' (escalares) o 'numpy' (arreglos)
+
+    Returns:
+        tuple: (función que devuelve [f(x), f'(x), ...], textos de las derivadas)
+    """
+    key = (normalize_expression(function_text), backend, order)
+    bundle = _derivatives.get(key)
+    if bundle is None:
+        with stage('compile'):
+            source, texts = compile_source(key[0], backend, order)
+            if source:
+                f = _load(source, backend)
+            else:
+                f = _lambdify(derivatives(key[0], order), backend, cse=True)
+        bundle = (f, texts)
+        size = sys.getsizeof(source or '') + sum(sys.getsizeof(text) for text in texts)
+        _derivatives.put(key, bundle, size + _BYTES_PER_FUNCTION)
+    return bundle
+
+
+def cache_stats():
+    """Contadores de aciertos, fallos y desalojos de las cachés."""
+    return {
+        'expressions': _expressions.stats(),
+        'functions': _functions.stats(),
+        'derivatives': _derivatives.stats(),
+    }
+
+
+def clear_cache():
+    _expressions.clear()
+    _functions.clear()
+    _derivatives.clear()
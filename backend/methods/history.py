@@ -0,0 +1,242 @@
+import math
+
+import numpy as np
+
+HISTORY_MODES = ('full', 'last_n', 'every_k', 'summary')
+
+_INITIAL_CAPACITY = 64
+# Memoria que se reserva de entrada para los vectores; si se necesita más, crece
+_PREALLOCATED_VECTOR_BYTES = 16 * 1024 * 1024
+
+
+# Formatos de columna, aplicados solo al serializar
+def fixed10(value):
+    return round(value, 10)
+
+
+def decimal10(value):
+    return "{:.10f}".format(value)
+
+
+def scientific10(value):
+    return f"{value:.10e}"
+
+
+def scientific2(value):
+    # NaN marca una celda vacía (p. ej. el error de la iteración 0)
+    return "" if math.isnan(value) else "{:.2e}".format(value)
+
+
+def raw(value):
+    return value
+
+
+def parse_history_option(option):
+    """
+    Interpreta la opción 'history' de la petición.
+
+    Acepta un modo ('full', 'summary', 'last_n', 'every_k') o un diccionario
+    {"mode": "last_n", "n": 20} / {"mode": "every_k", "k": 10}.
+
+    Returns:
+        tuple: (modo, parámetro)
+    """
+    if option is None:
+        return 'full', None
+    if isinstance(option, str):
+        mode, param = option, None
+    elif isinstance(option, dict):
+        mode = option.get('mode', 'full')
+        param = option.get('n', option.get('k'))
+    else:
+        raise ValueError(f"Opción de historial inválida: {option!r}")
+
+    if mode not in HISTORY_MODES:
+        raise ValueError(f"Modo de historial inválido: '{mode}'. Use uno de {', '.join(HISTORY_MODES)}.")
+    if mode in ('last_n', 'every_k'):
+        param = 10 if param is None else int(param)
+    if param is not None and param < 1:
+        raise ValueError(f"El parámetro del historial debe ser >= 1: {param}")
+    return mode, param
+
+
+class IterationHistory:
+    """
+    Tabla de iteraciones guardada por columnas en arreglos de NumPy.
+
+    Los valores se guardan como float64 y solo se formatean al serializar.
+    Según el modo se guardan todas las filas ('full'), las últimas n
+    ('last_n', en un búfer circular), una de cada k más la última
+    ('every_k') o solo la columna de error sin vectores ('summary').
+
+    Se comporta como una lista de filas ya formateadas, igual que las
+    tablas que devolvían antes los métodos.
+
+    Args:
+        columns (list): Pares (nombre, formato) de las columnas escalares,
+            sin contar la columna de iteración
+        option: Modo de historial, ver parse_history_option
+        vector_size (int or tuple): Longitud del vector x de cada iteración
+            (capítulo 2), o su forma (n, k) con varios lados derechos
+        error_column (str): Columna que se conserva en modo 'summary'
+        capacity (int): Número esperado de filas, para reservar memoria
+    """
+
+    def __init__(self, columns, option=None, vector_size=None, error_column='error', capacity=None):
+        self.mode, self.param = parse_history_option(option)
+        names = [name for name, _ in columns]
+        formatters = [fmt for _, fmt in columns]
+        if self.mode == 'summary':
+            keep = [names.index(error_column)]
+            vector_size = None
+        else:
+            keep = list(range(len(columns)))
+        self.names = [names[i] for i in keep]
+        self._formatters = [formatters[i] for i in keep]
+        self._keep = keep
+
+        if self.mode == 'last_n':
+            size = self.param
+        else:
+            size = min(capacity or _INITIAL_CAPACITY, _INITIAL_CAPACITY * 16)
+            if vector_size:
+                # Con vectores grandes (p. ej. n x k) se reservan menos filas
+                row_bytes = 8 * int(np.prod(vector_size))
+                size = min(size, max(_PREALLOCATED_VECTOR_BYTES // row_bytes, _INITIAL_CAPACITY))
+        size = max(size, 1)
+        self._counts = np.empty(size, dtype=np.int64)
+        self._values = np.empty((size, len(keep)), dtype=float)
+        self._vectors = np.empty((size,) + tuple(np.atleast_1d(vector_size)), dtype=float) if vector_size else None
+        self._size = 0
+        self._start = 0
+        self._pending = None  # última fila saltada en modo 'every_k'
+        self._latest = None
+        self.total = 0
+
+    def append(self, count, *values, vector=None):
+        """
+        Registra una iteración. El vector no se copia hasta guardarse, así
+        que el llamador no debe modificarlo después.
+        """
+        self.total += 1
+        self._latest = (count, values, vector)
+        if self.mode == 'every_k' and count % self.param != 0:
+            self._pending = (count, values, vector)
+            return
+        self._pending = None
+        self._store(count, values, vector)
+
+    def _store(self, count, values, vector):
+        capacity = len(self._counts)
+        if self._size < capacity:
+            index = (self._start + self._size) % capacity
+            self._size += 1
+        elif self.mode == 'last_n':
+            index = self._start
+            self._start = (self._start + 1) % capacity
+        else:
+            self._grow()
+            index = self._size
+            self._size += 1
+
+        self._counts[index] = count
+        for j, i in enumerate(self._keep):
+            value = values[i]
+            self._values[index, j] = math.nan if value is None else value
+        if self._vectors is not None:
+            self._vectors[index] = vector
+
+    def _grow(self):
+        capacity = len(self._counts) * 2
+        self._counts = np.resize(self._counts, capacity)
+        values = np.empty((capacity, self._values.shape[1]), dtype=float)
+        values[:self._size] = self._values[:self._size]
+        self._values = values
+        if self._vectors is not None:
+            vectors = np.empty((capacity,) + self._vectors.shape[1:], dtype=float)
+            vectors[:self._size] = self._vectors[:self._size]
+            self._vectors = vectors
+
+    def _order(self):
+        if self._start == 0:
+            return slice(0, self._size)
+        return (self._start + np.arange(self._size)) % len(self._counts)
+
+    def columns(self):
+        """Columnas crudas (sin formatear) de las filas guardadas, en orden."""
+        order = self._order()
+        data = {'iteration': self._counts[order]}
+        for j, name in enumerate(self.names):
+            data[name] = self._values[order, j]
+        if self._vectors is not None:
+            data['vector'] = self._vectors[order]
+        if self._pending is not None:
+            count, values, vector = self._pending
+            data['iteration'] = np.append(data['iteration'], count)
+            for j, name in enumerate(self.names):
+                value = values[self._keep[j]]
+                data[name] = np.append(data[name], math.nan if value is None else value)
+            if self._vectors is not None:
+                data['vector'] = np.concatenate([data['vector'], [vector]])
+        return data
+
+    def rows(self):
+        """Filas formateadas, listas para serializar a JSON."""
+        data = self.columns()
+        counts = data['iteration'].tolist()
+        cols = [[fmt(v) for v in data[name].tolist()] for name, fmt in zip(self.names, self._formatters)]
+        # Los vectores quedan como filas de NumPy: el codificador de respuestas
+        # (methods.response) los serializa sin pasar por listas
+        vectors = data.get('vector')
+
+        rows = []
+        for i, count in enumerate(counts):
+            row = [count] + [col[i] for col in cols]
+            if vectors is not None:
+                row.append(vectors[i])
+            rows.append(row)
+        return rows
+
+    def latest_row(self):
+        """Última fila registrada, formateada, aunque el modo no la guarde."""
+        if self._latest is None:
+            return None
+        count, values, vector = self._latest
+        row = [count]
+        for i, fmt in zip(self._keep, self._formatters):
+            value = values[i]
+            row.append(fmt(math.nan if value is None else float(value)))
+        if self._vectors is not None:
+            row.append(np.asarray(vector, dtype=float).tolist())
+        return row
+
+    def last(self):
+        rows = self.rows()
+        return rows[-1] if rows else None
+
+    def describe(self):
+        return {
+            'mode': self.mode,
+            'param': self.param,
+            'columns': ['iteration'] + self.names + (['vector'] if self._vectors is not None else []),
+            'recorded': len(self),
+            'total': self.total,
+        }
+
+    def __len__(self):
+        return self._size + (1 if self._pending is not None else 0)
+
+    def __iter__(self):
+        return iter(self.rows())
+
+    def __getitem__(self, index):
+        return self.rows()[index]
+
+
+def serialize_history(results):
+    """Convierte el historial de un resultado en filas y agrega su descripción."""
+    history = results.get('iterations')
+    if isinstance(history, IterationHistory):
+        results['iterations'] = history.rows()
+        results['history'] = history.describe()
+    return results
@@ -0,0 +1,297 @@
+import importlib
+import itertools
+import json
+import threading
+import time
+import uuid
+from collections import deque
+
+from methods.processes import worker_context, stop
+
+# Límites de la cola de trabajos (compartida por el proceso)
+MAX_WORKERS = 2
+MAX_PENDING = 64
+JOB_TIMEOUT = 60.0
+MAX_TIMEOUT = 600.0
+JOB_TTL = 600.0
+MAX_WAIT = 30.0
+
+# Como mucho una actualización de progreso cada PROGRESS_INTERVAL segundos
+PROGRESS_INTERVAL = 0.1
+
+FINISHED = ('done', 'failed', 'timeout', 'cancelled')
+
+_NDJSON = 'application/x-ndjson'
+
+
+def _job_request(body, content_type, query):
+    """
+    Ajusta la petición para el trabajo: se pide la respuesta transmitida
+    (para informar el progreso) y, si no se indicó otra cosa, el historial
+    completo, como en la respuesta normal de la ruta.
+    """
+    query = dict(query)
+    if content_type.split(';')[0].strip() in ('application/json', ''):
+        data = json.loads(body or b'{}')
+        if isinstance(data, dict) and 'history' not in data:
+            data['history'] = None
+            body = json.dumps(data).encode('utf-8')
+    else:
+        query.setdefault('history', 'null')
+    return body, query
+
+
+def _run(app_module, path, body, content_type, query, conn):
+    """
+    Ejecuta la ruta dentro del proceso del trabajo con el cliente de pruebas
+    de Flask, de modo que el trabajo acepta lo mismo que la ruta original.
+
+    Envía por `conn` ('progress', iteraciones, fila) mientras la ruta
+    transmite sus iteraciones (siempre la última) y al final ('done',
+    código HTTP, respuesta).
+    """
+    try:
+        app = importlib.import_module(app_module).app
+        body, query = _job_request(body, content_type, query)
+        client = app.test_client()
+        response = client.post(path, data=body, content_type=content_type or 'application/json',
+                               query_string=query, headers={'Accept': _NDJSON}, buffered=False)
+        try:
+            if response.mimetype != _NDJSON:
+                conn.send(('done', response.status_code, json.loads(response.get_data())))
+                return
+
+            # Respuesta transmitida: una línea por iteración y el registro final.
+            # Las filas que no se enviaron por el límite de frecuencia quedan en
+            # `pending`, y la última se envía antes del resultado
+            last_sent = 0.0
+            pending = None
+            for count in itertools.count(1):
+                line = next(response.response, None)
+                if line is None:
+                    raise RuntimeError("The stream ended without a result.")
+                record = json.loads(line)
+                if record['type'] == 'iteration':
+                    pending = ('progress', count, record['row'])
+                    now = time.monotonic()
+                    if now - last_sent >= PROGRESS_INTERVAL:
+                        conn.send(pending)
+                        pending = None
+                        last_sent = now
+                    continue
+                if pending is not None:
+                    conn.send(pending)
+                if record['type'] == 'result':
+                    conn.send(('done', 200, {'result': record['result']}))
+                    return
+                else:
+                    conn.send(('done', 400, {'error': record['error']}))
+                    return
+        finally:
+            response.close()
+    except Exception as e:
+        conn.send(('done', 500, {'error': str(e)}))
+    finally:
+        conn.close()
+
+
+class Job:
+    def __init__(self, path, body, content_type, query, timeout):
+        self.id = uuid.uuid4().hex
+        self.path = path
+        self.body = body
+        self.content_type = content_type
+        self.query = query
+        self.timeout = timeout
+        self.status = 'queued'
+        self.iterations = 0
+        self.last_row = None
+        self.status_code = None
+        self.response = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.cancel_requested = False
+
+    def to_dict(self):
+        job = {
+            'id': self.id,
+            'path': self.path,
+            'status': self.status,
+            'progress': {'iterations': self.iterations, 'last_row': self.last_row},
+            'timeout': self.timeout,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+        }
+        if self.status in FINISHED:
+            job['status_code'] = self.status_code
+            job.update(self.response or {})
+        return job
+
+
+class JobQueue:
+    """
+    Cola de trabajos para los cálculos largos.
+
+    Los trabajos se atienden en orden de llegada con a lo sumo `max_workers`
+    en ejecución; cada uno corre en su propio proceso, así que se puede
+    terminar al vencer su tiempo límite o al cancelarlo sin afectar al
+    servidor. Los resultados se conservan `ttl` segundos después de terminar.
+
+    Los interpolantes registrados dentro de un trabajo quedan en el proceso
+    del trabajo, por lo que su id no sirve para /evaluate.
+
+    Args:
+        app_module (str): Módulo que define `app` (se importa en cada proceso)
+        max_workers (int): Trabajos en ejecución al mismo tiempo
+        max_pending (int): Trabajos en espera antes de rechazar nuevos
+        ttl (float): Segundos que se conserva un trabajo terminado
+    """
+
+    def __init__(self, app_module, max_workers=MAX_WORKERS, max_pending=MAX_PENDING, ttl=JOB_TTL):
+        self.app_module = app_module
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.ttl = ttl
+        self._jobs = {}
+        self._pending = deque()
+        self._running = 0
+        self._changed = threading.Condition()
+        self._dispatcher = None
+        self._context = None
+
+    def _start(self):
+        if self._dispatcher is None:
+            # Si el servidor de procesos aún no arrancó, precarga la aplicación
+            self._context = worker_context(self.app_module)
+            self._dispatcher = threading.Thread(target=self._dispatch, name='job-dispatcher', daemon=True)
+            self._dispatcher.start()
+
+    def _purge(self):
+        limit = time.time() - self.ttl
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job.finished_at is not None and job.finished_at < limit]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def submit(self, path, body, content_type, query, timeout=None):
+        """Encola un trabajo y devuelve su diccionario de estado."""
+        timeout = JOB_TIMEOUT if timeout is None else float(timeout)
+        if not 0 < timeout <= MAX_TIMEOUT:
+            raise ValueError(f"timeout must be between 0 and {MAX_TIMEOUT:g} seconds.")
+        job = Job(path, body, content_type, query, timeout)
+        with self._changed:
+            self._purge()
+            if len(self._pending) >= self.max_pending:
+                raise OverflowError("Too many pending jobs, try again later.")
+            self._start()
+            self._jobs[job.id] = job
+            self._pending.append(job)
+            self._changed.notify_all()
+            return job.to_dict()
+
+    def get(self, job_id, wait=0.0, since=None):
+        """
+        Estado de un trabajo. Con `wait` espera hasta que termine (o, si se
+        indica `since`, hasta que pase de ese número de iteraciones).
+        """
+        deadline = time.monotonic() + min(max(float(wait), 0.0), MAX_WAIT)
+        with self._changed:
+            self._purge()
+            job = self._jobs.get(job_id)
+            if job is None:
+                raise KeyError(f"No job with id '{job_id}' (it may have expired).")
+            while job.status not in FINISHED and (since is None or job.iterations <= since):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._changed.wait(remaining)
+            return job.to_dict()
+
+    def cancel(self, job_id):
+        """Cancela un trabajo en espera o termina el proceso de uno en ejecución."""
+        with self._changed:
+            job = self._jobs.get(job_id)
+            if job is None:
+                raise KeyError(f"No job with id '{job_id}' (it may have expired).")
+            if job.status == 'queued':
+                self._pending.remove(job)
+                self._finish(job, 'cancelled', None, {'error': 'Job cancelled.'})
+            elif job.status == 'running':
+                job.cancel_requested = True
+            return job.to_dict()
+
+    def stats(self):
+        with self._changed:
+            self._purge()
+            counts = {status: 0 for status in ('queued', 'running') + FINISHED}
+            for job in self._jobs.values():
+                counts[job.status] += 1
+            return {'jobs': counts, 'max_workers': self.max_workers, 'max_pending': self.max_pending,
+                    'ttl': self.ttl}
+
+    def _finish(self, job, status, status_code, response):
+        job.status = status
+        job.status_code = status_code
+        job.response = response
+        job.finished_at = time.time()
+        job.body = None
+        self._changed.notify_all()
+
+    def _dispatch(self):
+        while True:
+            with self._changed:
+                while not self._pending or self._running >= self.max_workers:
+                    self._changed.wait()
+                job = self._pending.popleft()
+                job.status = 'running'
+                job.started_at = time.time()
+                self._running += 1
+                self._changed.notify_all()
+            threading.Thread(target=self._supervise, args=(job,), name=f'job-{job.id[:8]}', daemon=True).start()
+
+    def _supervise(self, job):
+        """Arranca el proceso del trabajo y lo vigila hasta que termina."""
+        receiver, sender = self._context.Pipe(duplex=False)
+        process = self._context.Process(target=_run, args=(self.app_module, job.path, job.body, job.content_type,
+                                                           job.query, sender), daemon=True)
+        outcome = None
+        try:
+            process.start()
+            sender.close()
+            deadline = time.monotonic() + job.timeout
+            while outcome is None:
+                if job.cancel_requested:
+                    outcome = ('cancelled', None, {'error': 'Job cancelled.'})
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    outcome = ('timeout', None, {'error': f"Job exceeded its {job.timeout:g} s time limit."})
+                    break
+                if not receiver.poll(min(remaining, 0.2)):
+                    if not process.is_alive() and not receiver.poll():
+                        outcome = ('failed', 500, {'error': f"Worker exited with code {process.exitcode}."})
+                    continue
+                try:
+                    message = receiver.recv()
+                except EOFError:
+                    process.join(1.0)
+                    outcome = ('failed', 500, {'error': f"Worker exited with code {process.exitcode}."})
+                    break
+                if message[0] == 'progress':
+                    with self._changed:
+                        job.iterations, job.last_row = message[1], message[2]
+                        self._changed.notify_all()
+                else:
+                    status_code, response = message[1], message[2]
+                    outcome = ('done' if status_code < 400 else 'failed', status_code, response)
+        except Exception as e:
+            outcome = ('failed', 500, {'error': str(e)})
+        finally:
+            sender.close()
+            stop(process)
+            receiver.close()
+            with self._changed:
+                self._running -= 1
+                self._finish(job, *outcome)
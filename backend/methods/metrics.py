@@ -0,0 +1,208 @@
+import bisect
+import contextvars
+import functools
+import math
+import threading
+import time
+
+# Límites de los histogramas (el último cubo, +Inf, se agrega al exportar)
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+ITERATION_BUCKETS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 10000, 100000, 1000000)
+SIZE_BUCKETS = tuple(256 * 4 ** i for i in range(10))  # 256 B ... 64 MB
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Ruta (regla de Flask) de la petición en curso; se usa como etiqueta
+_route = contextvars.ContextVar('metrics_route', default='')
+# Etapas abiertas en el hilo actual, para descontar las anidadas
+_open = threading.local()
+
+
+class Histogram:
+    """
+    Histograma acumulativo por combinación de etiquetas, como los de Prometheus.
+
+    Args:
+        name (str): Nombre de la métrica
+        help (str): Descripción
+        labels (tuple): Nombres de las etiquetas
+        buckets (tuple): Límites superiores de los cubos, en orden creciente
+    """
+
+    def __init__(self, name, help, labels, buckets):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        self._series = {}  # valores de etiquetas -> [conteo por cubo..., suma, total]
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0] * (len(self.buckets) + 3)
+            series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def samples(self):
+        with self._lock:
+            series = {key: list(values) for key, values in self._series.items()}
+        for label_values, values in sorted(series.items()):
+            labels = dict(zip(self.labels, label_values))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), values):
+                cumulative += count
+                yield '_bucket', dict(labels, le=_number(bound)), cumulative
+            yield '_sum', labels, values[-2]
+            yield '_count', labels, values[-1]
+
+
+def _number(value):
+    if value == math.inf:
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return repr(value)
+    return str(value)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _line(name, labels, value):
+    if labels:
+        text = ','.join(f'{key}="{_escape(label)}"' for key, label in labels.items())
+        return f'{name}{{{text}}} {_number(value)}'
+    return f'{name} {_number(value)}'
+
+
+REQUEST_SECONDS = Histogram('methodlab_request_duration_seconds', 'Request latency until the body is fully sent.',
+                            ('route', 'method', 'status'), LATENCY_BUCKETS)
+STAGE_SECONDS = Histogram('methodlab_stage_duration_seconds',
+                          'Time spent in each stage of a request, excluding nested stages.',
+                          ('route', 'stage'), LATENCY_BUCKETS)
+ITERATIONS = Histogram('methodlab_iterations', 'Iterations performed by the iterative methods.',
+                       ('route',), ITERATION_BUCKETS)
+REQUEST_BYTES = Histogram('methodlab_request_bytes', 'Request body size.', ('route',), SIZE_BUCKETS)
+RESPONSE_BYTES = Histogram('methodlab_response_bytes', 'Response body size as sent (after compression).',
+                           ('route',), SIZE_BUCKETS)
+
+HISTOGRAMS = [REQUEST_SECONDS, STAGE_SECONDS, ITERATIONS, REQUEST_BYTES, RESPONSE_BYTES]
+
+# Funciones que al exportar devuelven [(nombre, tipo, ayuda, [(etiquetas, valor), ...]), ...]
+_collectors = []
+
+
+def set_route(route):
+    """Fija la ruta de la petición en curso (etiqueta de las etapas e iteraciones)."""
+    _route.set(route)
+
+
+def current_route():
+    return _route.get()
+
+
+class stage:
+    """
+    Mide una etapa (parse, compile, setup, iterate, plot, serialize...) de la
+    petición en curso. Se usa como `with stage('plot'):` o como decorador.
+
+    Las etapas pueden anidarse: el tiempo de una etapa interna se descuenta
+    de la externa, así que las etapas de una petición no se solapan.
+    `stage(None)` descuenta un bloque de la etapa externa sin registrarlo
+    (p. ej. el tiempo en que un generador espera a quien lo consume).
+    """
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        frames = getattr(_open, 'frames', None)
+        if frames is None:
+            frames = _open.frames = []
+        # [inicio, tiempo de las etapas anidadas]
+        self._frame = [time.perf_counter(), 0.0]
+        frames.append(self._frame)
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self._frame[0]
+        frames = _open.frames
+        # Un generador abandonado puede cerrar su etapa fuera de orden
+        index = next((i for i in range(len(frames) - 1, -1, -1) if frames[i] is self._frame), None)
+        if index is not None:
+            del frames[index]
+            if index:
+                frames[index - 1][1] += elapsed
+        if self.name is not None:
+            STAGE_SECONDS.observe(max(elapsed - self._frame[1], 0.0), _route.get(), self.name)
+        return False
+
+    def __call__(self, function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with stage(self.name):
+                return function(*args, **kwargs)
+        return wrapper
+
+
+def observe_iterations(results):
+    """Registra las iteraciones de un resultado con tabla de iteraciones (IterationHistory)."""
+    history = results.get('iterations') if isinstance(results, dict) else None
+    total = getattr(history, 'total', None)
+    if total:
+        # La primera fila es la iteración 0 (valor inicial)
+        ITERATIONS.observe(total - 1, _route.get())
+
+
+def observe_request(route, method, status, seconds, request_bytes, response_bytes):
+    REQUEST_SECONDS.observe(seconds, route, method, str(status))
+    if request_bytes is not None:
+        REQUEST_BYTES.observe(request_bytes, route)
+    if response_bytes is not None:
+        RESPONSE_BYTES.observe(response_bytes, route)
+
+
+def register_collector(collector):
+    """Agrega una función que produce métricas calculadas al exportar (p. ej. cachés)."""
+    _collectors.append(collector)
+    return collector
+
+
+def cache_collector(caches):
+    """
+    Colector para cachés LRUCache: `caches` es una función que devuelve
+    {nombre: stats()} y se consulta en cada exportación.
+    """
+    def collect():
+        stats = caches()
+        counters = (('hits', 'Cache lookups that found the entry.'),
+                    ('misses', 'Cache lookups that did not find the entry.'),
+                    ('evictions', 'Entries evicted to respect the cache limits.'))
+        gauges = (('entries', 'Entries currently stored.'),
+                  ('bytes', 'Estimated bytes currently stored.'),
+                  ('hit_rate', 'Fraction of lookups that were hits.'))
+        metrics = [(f'methodlab_cache_{key}_total', 'counter', help,
+                    [({'cache': name}, values[key]) for name, values in stats.items()]) for key, help in counters]
+        metrics += [(f'methodlab_cache_{key}', 'gauge', help,
+                     [({'cache': name}, values[key]) for name, values in stats.items()]) for key, help in gauges]
+        return metrics
+    return register_collector(collect)
+
+
+def render():
+    """Todas las métricas en el formato de texto de Prometheus."""
+    lines = []
+    for histogram in HISTOGRAMS:
+        lines.append(f'# HELP {histogram.name} {histogram.help}')
+        lines.append(f'# TYPE {histogram.name} histogram')
+        lines.extend(_line(histogram.name + suffix, labels, value) for suffix, labels, value in histogram.samples())
+    for collector in _collectors:
+        for name, kind, help, samples in collector():
+            lines.append(f'# HELP {name} {help}')
+            lines.append(f'# TYPE {name} {kind}')
+            lines.extend(_line(name, labels, value) for labels, value in samples)
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,135 @@
+import io
+import json
+
+import numpy as np
+
+from methods.metrics import stage
+
+NPY_TYPES = ('application/x-npy', 'application/npy')
+MSGPACK_TYPES = ('application/msgpack', 'application/x-msgpack')
+CSV_TYPES = ('text/csv', 'application/csv')
+
+
+class UnsupportedPayload(ValueError):
+    """El cuerpo de la petición no se puede leer (formato o dependencia no disponible)."""
+
+
+def _form_value(text):
+    # Los campos de formulario y de la URL llegan como texto: listas, números
+    # y booleanos se aceptan en JSON; lo demás se deja como texto
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+
+def _query_fields(args):
+    return {key: _form_value(value) for key, value in args.items()}
+
+
+def read_npy(stream):
+    """
+    Lee un arreglo .npy directamente desde el flujo, por bloques.
+
+    np.lib.format.read_array reserva el arreglo final y copia los bytes sobre
+    él, así que el pico de memoria es cercano al tamaño del arreglo.
+    """
+    array = np.lib.format.read_array(stream, allow_pickle=False)
+    if array.dtype != np.float64:
+        array = array.astype(np.float64)
+    return array
+
+
+def read_csv(stream):
+    """Lee números separados por comas (una fila por línea) como arreglo float."""
+    text = io.TextIOWrapper(stream, encoding='utf-8')
+    try:
+        array = np.loadtxt(text, delimiter=',', dtype=np.float64, ndmin=1)
+    finally:
+        text.detach()
+    return array
+
+
+def _msgpack_array(obj):
+    # {"dtype": "<f8", "shape": [...], "data": <bin>} -> arreglo sobre el mismo búfer
+    if isinstance(obj, dict) and set(obj) >= {'dtype', 'shape', 'data'} and isinstance(obj['data'], bytes):
+        array = np.frombuffer(obj['data'], dtype=np.dtype(obj['dtype']))
+        return array.reshape(obj['shape']).astype(np.float64, copy=False)
+    return obj
+
+
+def read_msgpack(body):
+    """
+    Decodifica un mapa msgpack; los arreglos llegan como {"dtype", "shape",
+    "data"} con los bytes crudos en "data" y se leen sin pasar por listas.
+    """
+    try:
+        import msgpack
+    except ImportError:
+        raise UnsupportedPayload("msgpack payloads require the 'msgpack' package on the server.")
+    data = msgpack.unpackb(body, raw=False, object_hook=_msgpack_array)
+    if not isinstance(data, dict):
+        raise UnsupportedPayload("The msgpack payload must be a map of fields.")
+    return data
+
+
+def _read_upload(storage):
+    name = (storage.filename or '').lower()
+    if name.endswith('.npy') or storage.mimetype in NPY_TYPES:
+        return read_npy(storage.stream)
+    if name.endswith('.csv') or storage.mimetype in CSV_TYPES:
+        return read_csv(storage.stream)
+    # Cualquier otro archivo se interpreta como JSON
+    return json.load(storage.stream)
+
+
+@stage('parse')
+def load_payload(request, array_field=None):
+    """
+    Lee los campos de una petición /calculate/* en cualquiera de los formatos
+    aceptados y devuelve un diccionario como el de request.get_json().
+
+    - application/json: como hasta ahora.
+    - application/x-npy: el cuerpo es un único arreglo .npy que se asigna a
+      `array_field` (o al campo indicado con ?field=...); los demás campos
+      van en la URL.
+    - multipart/form-data: cada archivo (.npy o .csv) es un campo arreglo con
+      el nombre de su parte; los campos de formulario son los escalares.
+    - application/msgpack: mapa con los campos; los arreglos pueden venir
+      como búferes crudos (ver read_msgpack).
+
+    Los valores de la URL y de los formularios se interpretan como JSON
+    cuando es posible ("1e-7", "[1, 2]", "true").
+    """
+    mimetype = request.mimetype
+    if mimetype in NPY_TYPES:
+        data = _query_fields(request.args)
+        field = data.pop('field', None) or array_field
+        if not field:
+            raise UnsupportedPayload("Indicate which field the .npy body holds with ?field=<name>.")
+        data[field] = read_npy(request.stream)
+        return data
+    if mimetype == 'multipart/form-data':
+        data = _query_fields(request.args)
+        data.update({key: _form_value(value) for key, value in request.form.items()})
+        for key, storage in request.files.items():
+            data[key] = _read_upload(storage)
+        return data
+    if mimetype in MSGPACK_TYPES:
+        data = _query_fields(request.args)
+        data.update(read_msgpack(request.get_data()))
+        return data
+    return request.get_json(force=True)
+
+
+def missing(*values):
+    """True si algún campo falta o está vacío (sirve para listas y arreglos)."""
+    for value in values:
+        if value is None:
+            return True
+        if isinstance(value, np.ndarray):
+            if value.size == 0:
+                return True
+        elif hasattr(value, '__len__') and len(value) == 0:
+            return True
+    return False
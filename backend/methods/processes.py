@@ -0,0 +1,47 @@
+import multiprocessing
+import os
+
+# Módulos que el servidor de procesos importa una sola vez; los procesos de
+# trabajo nacen de él ya con todo cargado. El script principal no se precarga:
+# el servidor lo ejecutaría al arrancar y, si el script no tiene la guarda
+# `if __name__ == "__main__"`, volvería a crear procesos sin fin. Como con
+# 'spawn', cada proceso lo importa como '__mp_main__' (sin ejecutar lo que
+# está bajo la guarda) y un script sin guarda falla con el error habitual
+# de multiprocessing
+_preload = set()
+
+
+def worker_context(*modules):
+    """
+    Contexto 'forkserver' compartido por los procesos de trabajo.
+
+    Los procesos no heredan los hilos del servidor (como ocurriría con fork)
+    ni vuelven a importar todo (como con spawn). Los módulos indicados se
+    agregan a la precarga; solo tienen efecto si se registran antes de
+    crear el primer proceso.
+    """
+    _preload.update(modules)
+    context = multiprocessing.get_context('forkserver')
+    context.set_forkserver_preload(sorted(_preload))
+    return context
+
+
+def rss_bytes(pid):
+    """Memoria residente del proceso en bytes (0 si no se puede leer, p. ej. fuera de Linux)."""
+    try:
+        with open(f'/proc/{pid}/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def stop(process, grace=1.0):
+    """Termina un proceso (SIGTERM y, si no responde, SIGKILL) y espera su salida."""
+    if process.pid is None:
+        return
+    if process.is_alive():
+        process.terminate()
+        process.join(grace)
+        if process.is_alive():
+            process.kill()
+    process.join()
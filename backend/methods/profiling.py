@@ -0,0 +1,253 @@
+import cProfile
+import functools
+import gzip
+import hmac
+import io
+import json
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+
+from flask import Response, make_response, request
+
+from methods.response import respond
+from methods.symbolic import profile_tasks
+
+# Perfilado bajo demanda: ?profile=cpu|memory con la cabecera X-Admin-Token.
+# Sin METHODLAB_ADMIN_TOKEN en el entorno está deshabilitado
+TOKEN_ENV = 'METHODLAB_ADMIN_TOKEN'
+TOKEN_HEADER = 'X-Admin-Token'
+
+PROFILE_KINDS = ('cpu', 'memory')
+SORT_KEYS = ('cumulative', 'tottime', 'calls')
+DEFAULT_TOP = 25
+MAX_TOP = 200
+# Marcos de pila guardados por asignación (más marcos, más costo)
+MEMORY_FRAMES = 16
+
+# tracemalloc es global al proceso y cProfile se mezcla con otros perfiladores:
+# un solo perfil a la vez
+_busy = threading.Lock()
+
+
+class ProfileError(Exception):
+    def __init__(self, message, status):
+        super().__init__(message)
+        self.status = status
+
+
+def _authorize():
+    token = os.environ.get(TOKEN_ENV)
+    if not token:
+        raise ProfileError(f"Profiling is disabled; set {TOKEN_ENV} on the server to enable it.", 403)
+    given = request.headers.get(TOKEN_HEADER, '')
+    if not hmac.compare_digest(given.encode(), token.encode()):
+        raise ProfileError(f"A valid {TOKEN_HEADER} header is required to profile a request.", 403)
+
+
+def _options():
+    kind = request.args.get('profile')
+    if kind not in PROFILE_KINDS:
+        raise ProfileError(f"Invalid profile: '{kind}'. Use 'cpu' or 'memory'.", 400)
+    sort = request.args.get('profile_sort', 'cumulative')
+    if sort not in SORT_KEYS:
+        raise ProfileError(f"Invalid profile_sort: '{sort}'. Use one of {', '.join(SORT_KEYS)}.", 400)
+    top = request.args.get('profile_top', DEFAULT_TOP, type=int)
+    raw = request.args.get('profile_raw', '').lower() in ('1', 'true', 'yes')
+    return kind, sort, min(max(top, 1), MAX_TOP), raw
+
+
+def _location(filename, line, name=None):
+    # Archivos del proyecto relativos al directorio de trabajo (más cortos)
+    try:
+        relative = os.path.relpath(filename)
+        if not relative.startswith('..'):
+            filename = relative
+    except ValueError:
+        pass
+    return f"{filename}:{line}" + (f"({name})" if name else "")
+
+
+class _WorkerStats:
+    """Estadísticas de cProfile recibidas de un proceso de trabajo, en la forma que acepta pstats.Stats."""
+
+    def __init__(self, stats):
+        self.stats = stats
+
+    def create_stats(self):
+        pass
+
+
+def cpu_stats(profiler, symbolic):
+    """Perfil del proceso más el de las tareas simbólicas que corrieron en el grupo de procesos."""
+    stats = pstats.Stats(profiler)
+    for task in symbolic['tasks']:
+        if task['stats']:
+            stats.add(_WorkerStats(task['stats']))
+    return stats
+
+
+def symbolic_report(symbolic):
+    """Tiempo de reloj de las llamadas al grupo de procesos simbólicos (methods.symbolic)."""
+    tasks = symbolic['tasks']
+    return {
+        'calls': len(tasks),
+        'time': sum(task['elapsed'] for task in tasks),
+        'merged': any(task['stats'] for task in tasks),
+        'tasks': [{'task': task['task'], 'elapsed': task['elapsed']} for task in tasks],
+    }
+
+
+def cpu_report(stats, sort, top):
+    """Funciones con más tiempo (acumulado o propio) o más llamadas."""
+    order = {'cumulative': 3, 'tottime': 2, 'calls': 1}[sort]
+    rows = sorted(stats.stats.items(), key=lambda item: item[1][order], reverse=True)[:top]
+    return {
+        'kind': 'cpu',
+        'sort': sort,
+        'total_calls': stats.total_calls,
+        'total_time': stats.total_tt,
+        'functions': [{
+            'function': _location(*func),
+            'calls': ncalls,
+            'primitive_calls': primitive,
+            'tottime': tottime,
+            'cumtime': cumtime,
+        } for func, (primitive, ncalls, tottime, cumtime, _) in rows],
+    }
+
+
+def memory_report(snapshot, peak, top):
+    """Líneas que más memoria asignaron y siguen vivas al terminar, y el pico."""
+    snapshot = snapshot.filter_traces([tracemalloc.Filter(False, tracemalloc.__file__)])
+    statistics = snapshot.statistics('lineno')
+    return {
+        'kind': 'memory',
+        'peak_bytes': peak,
+        'allocated_bytes': sum(stat.size for stat in statistics),
+        'sites': [{
+            'site': _location(stat.traceback[0].filename, stat.traceback[0].lineno),
+            'bytes': stat.size,
+            'blocks': stat.count,
+        } for stat in statistics[:top]],
+    }
+
+
+def _run_view(view, args, kwargs):
+    response = view(*args, **kwargs)
+    if not isinstance(response, Response):
+        response = make_response(response)
+    if response.is_streamed:
+        # El cuerpo transmitido se genera aquí para que el perfil lo incluya
+        response.set_data(b''.join(response.response))
+    return response
+
+
+def _json_body(response):
+    if response.mimetype != 'application/json':
+        return None
+    body = response.get_data()
+    encoding = response.headers.get('Content-Encoding')
+    if encoding == 'gzip':
+        body = gzip.decompress(body)
+    elif encoding == 'br':
+        import brotli
+        body = brotli.decompress(body)
+    data = json.loads(body)
+    return data if isinstance(data, dict) else None
+
+
+def _raw(kind, stats, snapshot):
+    """Perfil sin procesar: volcado de pstats (snakeviz, flameprof, gprof2dot) o instantánea de tracemalloc."""
+    buffer = io.BytesIO()
+    if kind == 'cpu':
+        import marshal
+        buffer.write(marshal.dumps(stats.stats))
+        filename = f"profile-{int(time.time())}.prof"
+    else:
+        import pickle
+        pickle.dump(snapshot, buffer, pickle.HIGHEST_PROTOCOL)
+        filename = f"snapshot-{int(time.time())}.tracemalloc"
+    return Response(buffer.getvalue(), mimetype='application/octet-stream',
+                    headers={'Content-Disposition': f'attachment; filename="{filename}"'})
+
+
+def profile_request(view, args, kwargs):
+    """
+    Ejecuta la ruta con cProfile (profile=cpu) o tracemalloc (profile=memory).
+
+    Devuelve la respuesta normal con el informe en la llave 'profile'; si la
+    respuesta no es un objeto JSON (binaria o transmitida), el informe va
+    junto con el código, tipo y tamaño de la respuesta original. Con
+    profile_raw=1 se devuelve el perfil sin procesar para otras herramientas
+    (pstats.Stats(archivo) o tracemalloc.Snapshot.load(archivo)).
+
+    sympify, diff y la generación de código de lambdify corren en el grupo
+    de procesos de methods.symbolic. Con profile=cpu esas tareas también se
+    perfilan en su proceso y sus funciones se suman al informe (aparecen
+    como raíces aparte; en este proceso solo se ve SymbolicPool.call
+    esperando). Con profile=memory no se puede medir la memoria del otro
+    proceso; 'symbolic' da al menos el tiempo de cada llamada.
+    """
+    _authorize()
+    kind, sort, top, raw = _options()
+    if not _busy.acquire(blocking=False):
+        raise ProfileError("Another request is being profiled, try again later.", 409)
+    try:
+        profiler = snapshot = None
+        started = time.perf_counter()
+        with profile_tasks(cpu=kind == 'cpu') as symbolic:
+            if kind == 'cpu':
+                profiler = cProfile.Profile()
+                profiler.enable()
+                try:
+                    response = _run_view(view, args, kwargs)
+                finally:
+                    profiler.disable()
+            else:
+                tracemalloc.start(MEMORY_FRAMES)
+                try:
+                    response = _run_view(view, args, kwargs)
+                    snapshot = tracemalloc.take_snapshot()
+                    peak = tracemalloc.get_traced_memory()[1]
+                finally:
+                    tracemalloc.stop()
+        elapsed = time.perf_counter() - started
+    finally:
+        _busy.release()
+
+    stats = cpu_stats(profiler, symbolic) if kind == 'cpu' else None
+    if raw:
+        return _raw(kind, stats, snapshot)
+
+    report = cpu_report(stats, sort, top) if kind == 'cpu' else memory_report(snapshot, peak, top)
+    report['wall_time'] = elapsed
+    report['symbolic'] = symbolic_report(symbolic)
+    data = _json_body(response)
+    if data is None:
+        data = {'response': {'status': response.status_code, 'mimetype': response.mimetype,
+                             'bytes': response.content_length}}
+    data['profile'] = report
+    return respond(data, response.status_code)
+
+
+def profiled(view):
+    """Envuelve una vista para aceptar ?profile= (sin el parámetro no cambia nada)."""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        if 'profile' not in request.args:
+            return view(*args, **kwargs)
+        try:
+            return profile_request(view, args, kwargs)
+        except ProfileError as pe:
+            return respond({'error': str(pe)}, pe.status)
+    return wrapper
+
+
+def enable_profiling(app):
+    """Agrega ?profile= a todas las rutas registradas en `app`."""
+    for endpoint, view in app.view_functions.items():
+        if endpoint != 'static':
+            app.view_functions[endpoint] = profiled(view)
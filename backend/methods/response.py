@@ -0,0 +1,140 @@
+import gzip
+import json
+import math
+
+import numpy as np
+from flask import Response, request
+
+from methods.metrics import stage
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - se usa el codificador estándar
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - solo se ofrece gzip
+    brotli = None
+
+# No vale la pena comprimir respuestas pequeñas
+COMPRESS_MIN_BYTES = 1024
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+
+def _default(obj):
+    """Tipos que el codificador no conoce: arreglos no contiguos, escalares, etc."""
+    if isinstance(obj, np.ndarray):
+        if orjson is not None and obj.dtype.kind in 'fiub':
+            return np.ascontiguousarray(obj)
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if hasattr(obj, 'tolist'):
+        return obj.tolist()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def _json_default(obj):
+    # Arreglos y escalares de NumPy, con NaN/inf como null igual que los floats de Python
+    return _finite(_default(obj))
+
+
+def _finite(value):
+    """Copia con los flotantes no finitos cambiados por None (el codificador estándar no los acepta)."""
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, dict):
+        return {k: _finite(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_finite(v) for v in value]
+    return value
+
+
+def round_floats(obj, digits):
+    """
+    Redondea a `digits` cifras significativas los flotantes de un resultado.
+
+    Los arreglos se redondean de forma vectorizada; el texto más corto que
+    produce el codificador para cada número reduce el tamaño de la respuesta.
+    """
+    if isinstance(obj, dict):
+        return {k: round_floats(v, digits) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [round_floats(v, digits) for v in obj]
+    if isinstance(obj, np.ndarray) and obj.dtype.kind == 'f':
+        with np.errstate(divide='ignore', invalid='ignore'):
+            magnitude = np.floor(np.log10(np.abs(obj)))
+            scale = 10.0 ** (digits - 1 - np.where(np.isfinite(magnitude), magnitude, 0))
+            return np.round(obj * scale) / scale
+    if isinstance(obj, float) and math.isfinite(obj) and obj != 0:
+        return round(obj, digits - 1 - int(math.floor(math.log10(abs(obj)))))
+    return obj
+
+
+def encode(obj, precision=None):
+    """
+    Serializa a JSON (bytes) con soporte directo para arreglos y escalares de
+    NumPy. Usa orjson si está instalado; si no, json con conversión a listas.
+    NaN e infinitos se envían como null.
+    """
+    if precision is not None:
+        obj = round_floats(obj, int(precision))
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default,
+                            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    # json solo llama a `default` con tipos que no conoce: los floats de Python
+    # se revisan antes, y allow_nan=False garantiza JSON válido
+    return json.dumps(_finite(obj), default=_json_default, separators=(',', ':'),
+                      allow_nan=False).encode('utf-8')
+
+
+def _accepted_encodings():
+    accepted = {}
+    for item in request.headers.get('Accept-Encoding', '').split(','):
+        name, _, params = item.strip().partition(';')
+        quality = 1.0
+        if params.strip().startswith('q='):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            accepted[name.lower()] = quality
+    return accepted
+
+
+def compress(body):
+    """Comprime según Accept-Encoding (br si está disponible, si no gzip)."""
+    if len(body) < COMPRESS_MIN_BYTES:
+        return body, None
+    accepted = _accepted_encodings()
+    if brotli is not None and accepted.get('br', 0) > 0:
+        return brotli.compress(body, quality=BROTLI_QUALITY), 'br'
+    if accepted.get('gzip', 0) > 0:
+        return gzip.compress(body, compresslevel=GZIP_LEVEL), 'gzip'
+    return body, None
+
+
+def respond(payload, status=200, precision=None):
+    """
+    Respuesta JSON usada por todas las rutas.
+
+    Args:
+        payload: Diccionario a enviar (puede contener arreglos de NumPy)
+        status (int): Código HTTP
+        precision (int): Cifras significativas de los flotantes. Por defecto
+            se toma de ?precision= en la URL; sin él se envían completos
+    """
+    if precision is None:
+        precision = request.args.get('precision', type=int)
+    with stage('serialize'):
+        body = encode(payload, precision)
+    with stage('compress'):
+        body, encoding = compress(body)
+    response = Response(body, status=status, mimetype='application/json')
+    response.vary.add('Accept-Encoding')
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    return response
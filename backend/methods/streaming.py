@@ -0,0 +1,67 @@
+from methods.history import serialize_history
+from methods.metrics import stage, observe_iterations
+from methods.response import encode
+
+
+def exhaust(generator):
+    """
+    Ejecuta un método generador hasta el final y devuelve su resultado.
+
+    Los métodos *_iter producen su tabla de iteraciones después de cada
+    fila registrada y devuelven el diccionario de resultados al terminar.
+    """
+    with stage('iterate'):
+        while True:
+            try:
+                next(generator)
+            except StopIteration as stop:
+                results = stop.value
+                break
+    observe_iterations(results)
+    return results
+
+
+def iteration_records(generator, error_phrases=()):
+    """
+    Recorre un método generador y produce registros listos para enviar.
+
+    Produce {"type": "iteration", "row": [...]} por cada iteración y al
+    final {"type": "result", "result": {...}}, o {"type": "error", ...} si
+    la conclusión contiene alguna de las frases de error o el método falla.
+    """
+    try:
+        with stage('iterate'):
+            while True:
+                try:
+                    history = next(generator)
+                except StopIteration as stop:
+                    results = stop.value
+                    break
+                # El envío de la fila no cuenta como tiempo de iteración
+                with stage(None):
+                    yield {"type": "iteration", "row": history.latest_row()}
+    except Exception as e:
+        yield {"type": "error", "error": str(e)}
+        return
+    observe_iterations(results)
+
+    conclusion = results.get('conclusion')
+    if conclusion and any(phrase in conclusion.lower() for phrase in error_phrases):
+        yield {"type": "error", "error": conclusion}
+        return
+    serialize_history(results)
+    yield {"type": "result", "result": results}
+
+
+STREAM_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'sse': 'text/event-stream',
+}
+
+
+def encode_record(record, stream_format, precision=None):
+    """Codifica un registro como una línea NDJSON o un evento SSE."""
+    payload = encode(record, precision)
+    if stream_format == 'sse':
+        return b"event: " + record['type'].encode() + b"\ndata: " + payload + b"\n\n"
+    return payload + b"\n"
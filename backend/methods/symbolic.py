@@ -0,0 +1,323 @@
+import contextlib
+import contextvars
+import multiprocessing
+import queue
+import threading
+import time
+
+from methods.metrics import stage
+from methods.processes import worker_context, rss_bytes, stop
+
+# Procesos dedicados al trabajo simbólico (sympify, diff, simplify)
+POOL_SIZE = 2
+# Límites por llamada: tiempo de reloj y memoria que puede crecer el proceso
+PARSE_TIMEOUT = 5.0
+DERIVATIVE_TIMEOUT = 10.0
+MAX_RSS_GROWTH = 256 * 1024 * 1024
+# Cada cuánto se revisa la memoria del proceso mientras se espera la respuesta
+POLL_INTERVAL = 0.05
+
+
+# Llamadas al grupo durante un perfil (ver profile_tasks); None fuera de un perfil
+_profiled = contextvars.ContextVar('symbolic_profiled', default=None)
+
+
+class SymbolicLimitError(ValueError):
+    """El trabajo simbólico superó su tiempo o memoria y se detuvo el proceso."""
+
+
+def _parse(text):
+    import sympy as sp
+    return sp.sympify(text)
+
+
+def _derivative(function_text, order):
+    """Derivada simplificada como texto; acepta los mismos formatos que /api/derivative."""
+    import sympy as sp
+    x = sp.Symbol('x')
+    try:
+        expr = sp.sympify(function_text)
+    except Exception:
+        # Intentar con transformaciones adicionales para funciones especiales
+        try:
+            function_sympy = function_text
+            for name in ('sin', 'cos', 'tan', 'exp', 'log', 'sqrt'):
+                function_sympy = function_sympy.replace(f'{name}(', f'sp.{name}(')
+            expr = eval(function_sympy, {'x': x, 'sp': sp})
+        except Exception:
+            expr = sp.sympify(function_text, locals={'x': x})
+    return str(sp.simplify(sp.diff(expr, x, order)))
+
+
+def _real_x():
+    # x real al derivar: con x compleja, Abs(x) se deriva a re(x), im(x) y
+    # Derivative(...) sin evaluar en lugar de sign(x)
+    import sympy as sp
+    return sp.Symbol('x', real=True)
+
+
+def _derivatives(text, order):
+    """[f, f', ..., f^(order)] sin simplificar (para compilarlas juntas), en x real."""
+    import sympy as sp
+    x = _real_x()
+    exprs = [sp.sympify(text, locals={'x': x})]
+    for _ in range(order):
+        exprs.append(sp.diff(exprs[-1], x))
+    return exprs
+
+
+def _compile(text, backend, order):
+    """
+    Código de lambdify para f (order=0) o para [f, f', ..., f^(order)] juntas
+    con cse. El código es None si usa nombres que no están en el módulo
+    `backend` (funciones que solo existen en SymPy); entonces quien llama
+    compila la expresión por su cuenta.
+    """
+    import dis
+    import importlib
+    import inspect
+    import sympy as sp
+    if order == 0:
+        f = sp.lambdify(sp.Symbol('x'), sp.sympify(text), backend)
+        texts = []
+    else:
+        exprs = _derivatives(text, order)
+        f = sp.lambdify(_real_x(), exprs, backend, cse=True)
+        texts = [str(expr) for expr in exprs[1:]]
+
+    module = importlib.import_module(backend)
+    names = {op.argval for op in dis.get_instructions(f) if op.opname == 'LOAD_GLOBAL'}
+    portable = all(name in f.__globals__ and getattr(module, name, None) is f.__globals__[name] for name in names)
+    return (inspect.getsource(f) if portable else None), texts
+
+
+TASKS = {
+    'parse': _parse,
+    'derivative': _derivative,
+    'derivatives': _derivatives,
+    'compile': _compile,
+}
+
+
+def _run(name, args, profile):
+    """Ejecuta una tarea; con `profile`, bajo cProfile, y devuelve también sus estadísticas."""
+    if not profile:
+        return TASKS[name](*args), None
+    import cProfile
+    profiler = cProfile.Profile()
+    try:
+        value = profiler.runcall(TASKS[name], *args)
+    finally:
+        profiler.create_stats()
+    return value, profiler.stats
+
+
+def prewarm():
+    """
+    La primera llamada de SymPy carga el analizador, diff y lambdify con sus
+    cachés; se hace en el servidor de procesos (methods.symbolic_preload).
+    """
+    _derivatives('sin(x)**2 + exp(x)/x', 1)
+    _compile('x**3 - x - 2', 'math', 0)
+    _compile('sin(x)**2 + exp(x)/x', 'math', 1)
+
+
+def _serve(conn):
+    """Ciclo del proceso de trabajo: recibe (tarea, argumentos, perfilar) y responde."""
+    try:
+        # El proceso nace del servidor ya precalentado (ver prewarm)
+        conn.send(('ready', None, None))
+        while True:
+            name, args, profile = conn.recv()
+            try:
+                value, stats = _run(name, args, profile)
+                conn.send(('ok', value, stats))
+            except (BrokenPipeError, EOFError):
+                raise
+            except Exception as e:
+                try:
+                    conn.send(('error', e, None))
+                except (BrokenPipeError, EOFError):
+                    raise
+                except Exception:
+                    # La excepción no se puede enviar tal cual
+                    conn.send(('error', ValueError(str(e)), None))
+    except (BrokenPipeError, EOFError):
+        # El servidor cerró la conexión (terminó o descartó el proceso): salir sin traza
+        return
+
+
+class _Worker:
+    def __init__(self, context):
+        self.conn, child = context.Pipe()
+        self.process = context.Process(target=_serve, args=(child,), daemon=True)
+        self.process.start()
+        child.close()
+        self.baseline = None
+
+    def ready(self):
+        """Espera a que el proceso termine de precalentarse."""
+        if self.baseline is None:
+            self.conn.recv()
+            self.baseline = rss_bytes(self.process.pid)
+        return self
+
+    def close(self):
+        stop(self.process)
+        self.conn.close()
+
+
+class SymbolicPool:
+    """
+    Procesos precalentados para sympify/diff/simplify sobre texto del usuario.
+
+    Una expresión patológica (exponentes enormes, anidamiento profundo) puede
+    ocupar la CPU por minutos o agotar la memoria, y un hilo de Flask no se
+    puede interrumpir. Aquí cada llamada corre en un proceso del grupo; si
+    supera el tiempo o el crecimiento de memoria permitidos, el proceso se
+    termina, se reemplaza por uno nuevo y se lanza SymbolicLimitError.
+
+    Dentro de un proceso daemon (p. ej. un trabajo de /jobs, que ya tiene su
+    propio límite) no se pueden crear procesos, así que se ejecuta en línea.
+    """
+
+    def __init__(self, size=POOL_SIZE, max_rss_growth=MAX_RSS_GROWTH):
+        self.size = size
+        self.max_rss_growth = max_rss_growth
+        # SymPy se carga una vez en el servidor de procesos; los trabajadores
+        # devuelven código o texto, así que este proceso no necesita importarlo
+        self._context = worker_context('methods.symbolic', 'methods.symbolic_preload', 'sympy')
+        self._idle = queue.Queue()
+        self._started = False
+        self._lock = threading.Lock()
+        # Verdadero mientras arrancan los procesos (una llamada tendría que esperar)
+        self.booting = False
+        self.calls = 0
+        self.timeouts = 0
+        self.memory_kills = 0
+        self.restarts = 0
+
+    def warm(self):
+        """Arranca los procesos del grupo (se hace solo en la primera llamada)."""
+        if not self._started:
+            self.booting = True
+        with self._lock:
+            try:
+                if not self._started:
+                    # Los procesos nacen del servidor de procesos ya precalentado
+                    # (el primero espera a que el servidor cargue SymPy)
+                    for _ in range(self.size):
+                        self._idle.put(_Worker(self._context))
+                    self._started = True
+            finally:
+                self.booting = False
+
+    @stage('symbolic')
+    def call(self, task, *args, timeout=PARSE_TIMEOUT):
+        if multiprocessing.current_process().daemon:
+            return TASKS[task](*args)
+        self.warm()
+
+        profiled = _profiled.get()
+        started = time.perf_counter()
+        worker = self._idle.get()
+        try:
+            worker.ready()
+            worker.conn.send((task, args, profiled is not None and profiled['cpu']))
+            deadline = time.monotonic() + timeout
+            while not worker.conn.poll(POLL_INTERVAL):
+                if time.monotonic() >= deadline:
+                    self.timeouts += 1
+                    raise SymbolicLimitError(
+                        f"Symbolic processing failed: it took longer than {timeout:g} s and was stopped.")
+                growth = rss_bytes(worker.process.pid) - worker.baseline
+                if growth > self.max_rss_growth:
+                    self.memory_kills += 1
+                    raise SymbolicLimitError(
+                        f"Symbolic processing failed: it used more than "
+                        f"{self.max_rss_growth // (1024 * 1024)} MB of memory and was stopped.")
+                if not worker.process.is_alive():
+                    raise SymbolicLimitError("Symbolic processing failed: the worker process exited.")
+            status, value, stats = worker.conn.recv()
+        except BaseException:
+            # Proceso interrumpido a mitad de una tarea: se recicla
+            worker.close()
+            self.restarts += 1
+            worker = _Worker(self._context).ready()
+            raise
+        finally:
+            self.calls += 1
+            self._idle.put(worker)
+
+        if profiled is not None:
+            profiled['tasks'].append({'task': task, 'elapsed': time.perf_counter() - started, 'stats': stats})
+        if status == 'error':
+            raise value
+        return value
+
+    def stats(self):
+        return {'size': self.size, 'calls': self.calls, 'timeouts': self.timeouts,
+                'memory_kills': self.memory_kills, 'restarts': self.restarts}
+
+
+_pool = SymbolicPool()
+
+
+def parse(text, timeout=PARSE_TIMEOUT):
+    """sympify en un proceso aislado, con límite de tiempo y memoria."""
+    return _pool.call('parse', text, timeout=timeout)
+
+
+def derivative(function_text, order=1, timeout=DERIVATIVE_TIMEOUT):
+    """Derivada simplificada (texto) en un proceso aislado."""
+    return _pool.call('derivative', function_text, order, timeout=timeout)
+
+
+def derivatives(text, order, timeout=DERIVATIVE_TIMEOUT):
+    """Expresiones de f y sus derivadas hasta `order`, en un proceso aislado."""
+    return _pool.call('derivatives', text, order, timeout=timeout)
+
+
+def compile_source(text, backend, order=0):
+    """
+    Código fuente de la función compilada (ver _compile) y los textos de las
+    derivadas, generados en un proceso aislado.
+    """
+    timeout = PARSE_TIMEOUT if order == 0 else DERIVATIVE_TIMEOUT
+    return _pool.call('compile', text, backend, order, timeout=timeout)
+
+
+@contextlib.contextmanager
+def profile_tasks(cpu=False):
+    """
+    Registra las llamadas al grupo hechas dentro del bloque (mismo contexto).
+
+    El trabajo simbólico corre en otro proceso, así que un perfil del proceso
+    actual solo ve la espera. Con `cpu`, cada tarea se ejecuta bajo cProfile
+    en el proceso de trabajo y sus estadísticas vuelven con el resultado.
+
+    Yields:
+        dict: 'tasks', lista de {'task', 'elapsed', 'stats'} (stats de
+            cProfile, o None sin `cpu` o si la tarea corrió en línea)
+    """
+    profiled = {'cpu': cpu, 'tasks': []}
+    token = _profiled.set(profiled)
+    try:
+        yield profiled
+    finally:
+        _profiled.reset(token)
+
+
+def warm_pool():
+    """Arranca los procesos del grupo sin esperar a la primera llamada."""
+    if not multiprocessing.current_process().daemon:
+        _pool.warm()
+
+
+def pool_booting():
+    """Indica si el grupo está arrancando; una llamada ahora esperaría a que termine."""
+    return _pool.booting
+
+
+def pool_stats():
+    return _pool.stats()
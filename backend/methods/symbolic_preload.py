@@ -0,0 +1,16 @@
+"""
+Precalentamiento de SymPy en el servidor de procesos.
+
+Se importa solo como precarga del servidor (ver SymbolicPool): deja
+cargados el analizador, diff y lambdify con sus cachés, y cada proceso del
+grupo nace de él ya precalentado. Así el precalentamiento se hace una vez y
+no en cada proceso, que con una sola CPU se lo disputarían.
+"""
+import logging
+
+from methods.symbolic import prewarm
+
+try:
+    prewarm()
+except Exception as e:  # El servidor de procesos debe arrancar aunque falle
+    logging.getLogger(__name__).warning("SymPy pre-warm failed: %s", e)
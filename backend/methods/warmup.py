@@ -0,0 +1,228 @@
+import importlib
+import logging
+import multiprocessing
+import os
+import sys
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Dependencias pesadas que las rutas importan en su primera llamada
+HEAVY_MODULES = (
+    'scipy.sparse',
+    'scipy.linalg',
+    'scipy.sparse.linalg',
+    'methods.cap2.Jacobi',
+    'methods.cap2.GaussSeidel',
+    'methods.cap2.Sor',
+    'scipy.interpolate',
+    'matplotlib.pyplot',
+)
+
+# Expresiones frecuentes que se dejan compiladas en la caché
+COMMON_EXPRESSIONS = (
+    'x**2 - 2',
+    'x**3 - x - 1',
+    'sin(x)',
+    'cos(x) - x',
+    'exp(x) - 2',
+    'exp(-x) - x',
+    'log(x) - 1',
+)
+
+# METHODLAB_WARMUP: 'pool' (por defecto) arranca el grupo de procesos
+# simbólicos; '1' hace el precalentamiento completo (warm_up); 'post_fork'
+# lo deja al gancho de gunicorn; '0' no arranca nada
+WARMUP_ENV = 'METHODLAB_WARMUP'
+WARMUP_MODES = ('0', 'pool', '1', 'post_fork')
+
+_report = {'app_import_ms': None, 'modules': {}, 'warm_up': None, 'first_request': None}
+_thread = None
+# Edad del proceso al importar la app (s) y perf_counter en ese momento
+_process_age = None
+_app_ready = None
+
+
+def _age():
+    """Segundos desde que arrancó este proceso (None si no se puede leer, p. ej. fuera de Linux)."""
+    try:
+        with open('/proc/self/stat') as stat:
+            started = int(stat.read().rsplit(')', 1)[1].split()[19]) / os.sysconf('SC_CLK_TCK')
+        with open('/proc/uptime') as uptime:
+            return float(uptime.read().split()[0]) - started
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def record_app_import(started):
+    """Guarda cuánto tardó en importarse la aplicación (desde `started`, perf_counter)."""
+    global _process_age, _app_ready
+    _report['app_import_ms'] = round((time.perf_counter() - started) * 1000, 1)
+    _process_age = _age()
+    _app_ready = time.perf_counter()
+
+
+def record_first_request(path, duration):
+    """Guarda la primera petición atendida: ruta, duración y tiempo desde el arranque del proceso."""
+    if _report['first_request'] is not None or _app_ready is None:
+        return
+    since_import = time.perf_counter() - _app_ready
+    _report['first_request'] = {
+        'path': path,
+        'duration_ms': round(duration * 1000, 1),
+        'after_app_import_ms': round(since_import * 1000, 1),
+        # Arranque en frío: desde que nació el proceso hasta la primera respuesta
+        'cold_start_ms': round((_process_age + since_import) * 1000, 1) if _process_age is not None else None,
+    }
+
+
+def worker_process():
+    """
+    Indica si este proceso lo creó multiprocessing: un trabajador, o el
+    servidor de procesos (forkserver) mientras precarga la aplicación.
+    Ahí no se precalienta: el proceso no atiende peticiones.
+    """
+    if multiprocessing.parent_process() is not None:
+        return True
+    frame = sys._getframe()
+    while frame is not None:
+        if frame.f_globals.get('__name__', '').startswith('multiprocessing.'):
+            return True
+        frame = frame.f_back
+    return False
+
+
+def timed_import(name):
+    """Importa un módulo y registra su costo en ms (0 si ya estaba cargado)."""
+    started = time.perf_counter()
+    if name == 'matplotlib.pyplot' and name not in sys.modules:
+        import matplotlib
+        matplotlib.use('Agg')  # Usar backend no interactivo
+    module = importlib.import_module(name)
+    _report['modules'].setdefault(name, round((time.perf_counter() - started) * 1000, 1))
+    return module
+
+
+def warm_up(modules=HEAVY_MODULES, expressions=COMMON_EXPRESSIONS):
+    """
+    Arranca el grupo de procesos simbólicos, deja compiladas las expresiones
+    frecuentes e importa las dependencias pesadas, en ese orden (primero lo
+    que necesitan las rutas del capítulo 1). Los errores solo se registran.
+    """
+    from methods.expression_cache import get_function
+    from methods.symbolic import warm_pool
+
+    started = time.perf_counter()
+    steps = {}
+    try:
+        step = time.perf_counter()
+        warm_pool()
+        steps['symbolic_pool_ms'] = round((time.perf_counter() - step) * 1000, 1)
+
+        step = time.perf_counter()
+        for text in expressions:
+            get_function(text)
+        steps['expressions_ms'] = round((time.perf_counter() - step) * 1000, 1)
+
+        for name in modules:
+            timed_import(name)
+    except Exception as e:
+        logger.warning("Warm-up stopped: %s", e)
+        steps['error'] = str(e)
+
+    steps['total_ms'] = round((time.perf_counter() - started) * 1000, 1)
+    _report['warm_up'] = steps
+    logger.info("Startup report: %s", startup_report())
+
+
+def start_warm_up():
+    """Ejecuta warm_up en un hilo de fondo para no retrasar el arranque del servidor."""
+    global _thread
+    if _thread is None:
+        _thread = threading.Thread(target=warm_up, name='warm-up', daemon=True)
+        _thread.start()
+    return _thread
+
+
+def warm_pool_in_background():
+    """Arranca solo el grupo de procesos simbólicos (lo que necesita el capítulo 1) en un hilo."""
+    global _thread
+    if _thread is None:
+        def boot():
+            from methods.symbolic import warm_pool
+
+            started = time.perf_counter()
+            try:
+                warm_pool()
+                _report['warm_up'] = {'symbolic_pool_ms': round((time.perf_counter() - started) * 1000, 1)}
+            except Exception as e:
+                logger.warning("Symbolic pool warm-up failed: %s", e)
+                _report['warm_up'] = {'error': str(e)}
+
+        _thread = threading.Thread(target=boot, name='warm-up', daemon=True)
+        _thread.start()
+    return _thread
+
+
+def install(app, started, serving=True):
+    """
+    Registra el arranque de la aplicación y precalienta según METHODLAB_WARMUP.
+
+    Se llama al importar la app, así que funciona igual con el servidor de
+    desarrollo que con un servidor WSGI que importa la app en cada worker.
+    No precalienta si `serving` es falso (el proceso padre del recargador)
+    ni en procesos de multiprocessing (ver worker_process).
+
+    Con `gunicorn --preload` la app se importa en el proceso maestro antes
+    de crear los workers, y los procesos arrancados ahí no sirven en ellos:
+    usar METHODLAB_WARMUP=post_fork y en gunicorn.conf.py
+    `from methods.warmup import post_fork`.
+
+    Args:
+        app (Flask): Aplicación; se mide su primera petición atendida
+        started (float): perf_counter al empezar a importar la aplicación
+        serving (bool): Si este proceso atenderá peticiones
+    """
+    from flask import g, request
+
+    record_app_import(started)
+
+    @app.before_request
+    def first_request_started():
+        if _report['first_request'] is None:
+            g.first_request_started = time.perf_counter()
+
+    @app.after_request
+    def first_request_done(response):
+        if _report['first_request'] is None and 'first_request_started' in g:
+            record_first_request(request.path, time.perf_counter() - g.first_request_started)
+        return response
+
+    mode = os.environ.get(WARMUP_ENV, 'pool')
+    if mode not in WARMUP_MODES:
+        logger.warning("Unknown %s=%r; use one of %s", WARMUP_ENV, mode, ', '.join(WARMUP_MODES))
+        return
+    if not serving or worker_process():
+        return
+    if mode == '1':
+        start_warm_up()
+    elif mode == 'pool':
+        warm_pool_in_background()
+
+
+def post_fork(server, worker):
+    """Gancho de gunicorn: precalentamiento completo en cada worker ya creado."""
+    start_warm_up()
+
+
+def startup_report():
+    """Tiempo de importación de la aplicación, de cada módulo pesado, del precalentamiento y de la primera petición."""
+    heavy = {name: name in sys.modules for name in HEAVY_MODULES}
+    return {
+        'app_import_ms': _report['app_import_ms'],
+        'modules': dict(_report['modules']),
+        'loaded': heavy,
+        'warm_up': _report['warm_up'],
+        'first_request': _report['first_request'],
+    }
@@ -0,0 +1,57 @@
+import sys
+sys.path.append('.')
+
+import numpy as np
+import pytest
+
+from methods.cap3.divided_differences import NewtonInterpolant
+
+
+def test_extend_matches_rebuild():
+    # Agregar nodos uno a uno o en lote da la misma forma de Newton que construirla de nuevo
+    rng = np.random.default_rng(0)
+    x = rng.permutation(np.linspace(-2, 3, 12))
+    y = np.sin(x) + x ** 2
+    P = NewtonInterpolant(x[:4], y[:4])
+    P.append(x[4], y[4])
+    added = P.extend(x[5:], y[5:])
+    full = NewtonInterpolant(x, y)
+    np.testing.assert_allclose(P.coef, full.coef, rtol=1e-9, atol=1e-12)
+    np.testing.assert_allclose(added, full.coef[5:], rtol=1e-9, atol=1e-12)
+    t = np.linspace(-2, 3, 50)
+    np.testing.assert_allclose(P(t), full(t), rtol=1e-9, atol=1e-9)
+    np.testing.assert_allclose(P(x), y, atol=1e-8)
+
+
+@pytest.mark.parametrize('x_new', [[5, 5], [5, 1], [6, 2]])
+def test_extend_rejects_duplicates_without_changes(x_new):
+    # Un x repetido en el lote o con un nodo existente no agrega ningún nodo
+    P = NewtonInterpolant([0, 1, 2], [1, 2, 5])
+    coef = P.coef.copy()
+    with pytest.raises(ValueError, match="ya es un nodo"):
+        P.extend(x_new, [1.0] * len(x_new))
+    assert len(P) == 3
+    np.testing.assert_array_equal(P.coef, coef)
+    P.append(5, 26)
+    assert len(P) == 4
+
+
+def test_newton_append_route():
+    from main import app
+
+    client = app.test_client()
+    created = client.post('/calculate/newton_interpolation',
+                          json={'x_values': [0, 1, 2], 'y_values': [1, 2, 5]}).get_json()
+    interpolant_id = created['result']['id']
+
+    failed = client.post(f'/calculate/newton_interpolation/{interpolant_id}/append',
+                         json={'x_values': [5, 5], 'y_values': [26, 26]})
+    assert failed.status_code == 400
+    added = client.post(f'/calculate/newton_interpolation/{interpolant_id}/append',
+                        json={'x_values': [5], 'y_values': [26]})
+    assert added.status_code == 200
+    assert added.get_json()['result']['points'] == 4
+
+    missing = client.post('/calculate/newton_interpolation/unknown/append',
+                          json={'x_values': [5], 'y_values': [26]})
+    assert missing.status_code == 404
@@ -0,0 +1,62 @@
+import sys
+sys.path.append('.')
+
+import numpy as np
+import pytest
+
+from main import app
+
+X = [0.0, 1.0, 2.0, 3.0]
+Y = [[1.0, 2.0, 5.0, 10.0], [0.0, 1.0, 8.0, 27.0]]
+
+
+def register(y_values):
+    response = app.test_client().post('/calculate/vandermonde',
+                                      json={'x_values': X, 'y_values': y_values, 'register': True, 'plot': False})
+    assert response.status_code == 200
+    return response.get_json()['result']['id']
+
+
+def test_multi_series_json():
+    interpolant_id = register(Y)
+    result = app.test_client().post(f'/evaluate/{interpolant_id}',
+                                    json={'x': [0.5, 1.5, 2.5], 'derivatives': [1]}).get_json()['result']
+    assert result['points'] == 3
+    t = np.array([0.5, 1.5, 2.5])
+    np.testing.assert_allclose(result['values'], np.column_stack([t ** 2 + 1, t ** 3]), atol=1e-9)
+    np.testing.assert_allclose(result['derivatives']['1'], np.column_stack([2 * t, 3 * t ** 2]), atol=1e-9)
+
+
+def test_multi_series_binary():
+    interpolant_id = register(Y)
+    t = np.array([0.5, 1.5, 2.5])
+    response = app.test_client().post(f'/evaluate/{interpolant_id}?derivatives=1', data=t.astype('<f8').tobytes(),
+                                      content_type='application/octet-stream')
+    assert response.headers['X-Shape'] == '2,3,2'
+    assert response.headers['X-Series'] == '2'
+    assert response.headers['X-Columns'] == 'values,derivative_1'
+    table = np.frombuffer(response.data, dtype='<f8').reshape(2, 3, 2)
+    np.testing.assert_allclose(table[0], np.column_stack([t ** 2 + 1, t ** 3]), atol=1e-9)
+    np.testing.assert_allclose(table[1], np.column_stack([2 * t, 3 * t ** 2]), atol=1e-9)
+
+
+def test_single_series_binary_shape_unchanged():
+    interpolant_id = register(Y[0])
+    t = np.array([0.5, 1.5, 2.5])
+    response = app.test_client().post(f'/evaluate/{interpolant_id}', data=t.astype('<f8').tobytes(),
+                                      content_type='application/octet-stream')
+    assert response.headers['X-Shape'] == '1,3'
+    assert response.headers['X-Series'] == '1'
+    np.testing.assert_allclose(np.frombuffer(response.data, dtype='<f8'), t ** 2 + 1, atol=1e-9)
+
+
+@pytest.mark.parametrize('route', ['lagrange', 'newton_interpolation', 'spline_lineal',
+                                   'spline_cubico', 'vandermonde'])
+def test_invalid_point_reports_element(route):
+    # El mensaje de los métodos (qué elemento es inválido) llega por HTTP
+    client = app.test_client()
+    for x_values, shown in (([0, 1, 'a'], "x[2] = 'a'"), ([0, [1, 2], 3], "x[1] = '[1, 2]'")):
+        result = client.post(f'/calculate/{route}', json={'x_values': x_values, 'y_values': [1, 2, 3],
+                                                          'plot': False}).get_json()['result']
+        assert not result['success']
+        assert shown in result['error']
@@ -0,0 +1,76 @@
+import sys
+sys.path.append('.')
+
+import numpy as np
+import pytest
+
+from methods.history import IterationHistory, raw, scientific2
+
+COLUMNS = [('x', raw), ('error', raw)]
+
+
+def fill(history, rows, vector=False):
+    for i in range(rows):
+        history.append(i, float(i) / 2, 1.0 / (i + 1), vector=np.full(3, float(i)) if vector else None)
+    return history
+
+
+def test_full_keeps_every_row():
+    # Más filas que la capacidad inicial: el historial crece
+    history = fill(IterationHistory(COLUMNS, 'full', vector_size=3), 200, vector=True)
+    columns = history.columns()
+    assert history.total == 200 and len(history) == 200
+    np.testing.assert_array_equal(columns['iteration'], np.arange(200))
+    np.testing.assert_array_equal(columns['vector'][:, 0], np.arange(200.0))
+
+
+@pytest.mark.parametrize('rows', [5, 20, 137])
+def test_last_n_keeps_latest_rows(rows):
+    history = fill(IterationHistory(COLUMNS, {'mode': 'last_n', 'n': 20}, vector_size=3), rows, vector=True)
+    kept = list(range(max(0, rows - 20), rows))
+    assert history.total == rows
+    assert [row[0] for row in history.rows()] == kept
+    np.testing.assert_array_equal(history.columns()['vector'][:, 0], np.array(kept, dtype=float))
+    assert history.describe()['recorded'] == len(kept)
+
+
+@pytest.mark.parametrize('rows', [1, 30, 31, 95])
+def test_every_k_keeps_multiples_and_last(rows):
+    history = fill(IterationHistory(COLUMNS, {'mode': 'every_k', 'k': 10}), rows)
+    expected = list(range(0, rows, 10))
+    if expected[-1] != rows - 1:
+        expected.append(rows - 1)
+    assert history.total == rows
+    assert [row[0] for row in history.rows()] == expected
+    np.testing.assert_array_equal(history.columns()['x'], np.array(expected) / 2)
+
+
+def test_summary_keeps_only_error_column():
+    history = fill(IterationHistory(COLUMNS, 'summary', vector_size=3), 75, vector=True)
+    columns = history.columns()
+    assert history.total == 75
+    assert set(columns) == {'iteration', 'error'}
+    np.testing.assert_array_equal(columns['error'], 1.0 / (np.arange(75) + 1))
+    assert history.describe()['columns'] == ['iteration', 'error']
+
+
+def test_empty_cells_and_latest_row():
+    history = IterationHistory([('x', raw), ('error', scientific2)], {'mode': 'every_k', 'k': 5})
+    history.append(0, 1.0, None)
+    history.append(1, 2.0, 0.5)
+    assert history.rows()[0] == [0, 1.0, '']
+    assert history.latest_row() == [1, 2.0, '5.00e-01']
+
+
+def test_invalid_option():
+    with pytest.raises(ValueError):
+        IterationHistory(COLUMNS, 'sometimes')
+
+
+def test_endpoint_root_rows_keep_plain_numbers():
+    from methods.cap1.Biseccion import bisection_method
+    from methods.cap1.ReglaFalsa import false_position_method
+
+    for method in (bisection_method, false_position_method):
+        rows = method('x**2 - 1', 1.0, 3.0, 1e-6, 50)['iterations'].rows()
+        assert rows == [[0, 1.0, 1.0, 3.0, 0.0, 0]]
@@ -0,0 +1,21 @@
+import sys
+sys.path.append('.')
+
+from main import app
+
+SYSTEM = {'matrixA': [[4, -1, 0], [-1, 4, -1], [0, -1, 4]], 'vectorB': [15, 10, 10],
+          'vectorX0': [0, 0, 0], 'norm_type': 2, 'tol': 1e-7, 'max_count': 100}
+
+
+def test_finished_job_reports_last_iteration():
+    # El progreso de un trabajo terminado corresponde a la última fila, aunque
+    # las actualizaciones se envíen como mucho una vez por PROGRESS_INTERVAL
+    client = app.test_client()
+    submitted = client.post('/jobs/calculate/jacobi', json=SYSTEM)
+    assert submitted.status_code == 202
+    job = client.get(f"/jobs/{submitted.get_json()['job']['id']}?wait=30").get_json()['job']
+    assert job['status'] == 'done'
+    rows = job['result']['iterations']
+    assert len(rows) > 2
+    assert job['progress']['iterations'] == len(rows)
+    assert job['progress']['last_row'] == rows[-1]
@@ -0,0 +1,66 @@
+import sys
+sys.path.append('.')
+
+import numpy as np
+from scipy import sparse
+
+from methods.cap2.operators import matrix_key, clear_operators
+from methods.cap2.Jacobi import jacobi_method
+from methods.cap2.GaussSeidel import gaussSeidel_method
+
+
+def system(n=20):
+    A = 4 * np.eye(n) - np.eye(n, k=1) - np.eye(n, k=-1)
+    return A, np.arange(1.0, n + 1), np.zeros(n)
+
+
+def solve(method, A, b, x0):
+    results = method(A, b, x0, 1e-10, 1000, 2, history='summary')
+    return results, results['final_solution']
+
+
+def test_repeated_matrix_hits():
+    clear_operators()
+    A, b, x0 = system()
+    first, _ = solve(jacobi_method, A, b, x0)
+    second, _ = solve(jacobi_method, A.copy(), b, x0)
+    assert not first['operator_cache']['hit']
+    assert second['operator_cache']['hit']
+    assert first['operator_cache']['matrix'] == second['operator_cache']['matrix']
+
+
+def test_matrix_changed_in_place_misses():
+    clear_operators()
+    A, b, x0 = system()
+    solve(jacobi_method, A, b, x0)
+    A[0, 1] = -2.0
+    results, x = solve(jacobi_method, A, b, x0)
+    assert not results['operator_cache']['hit']
+    np.testing.assert_allclose(A @ x, b, atol=1e-8)
+
+
+def test_dense_and_sparse_do_not_share_operators():
+    clear_operators()
+    A, b, x0 = system()
+    S = sparse.csr_matrix(A)
+    assert matrix_key(A) != matrix_key(S)
+    dense, x_dense = solve(gaussSeidel_method, A, b, x0)
+    sparse_results, x_sparse = solve(gaussSeidel_method, S, b, x0)
+    assert not dense['operator_cache']['hit']
+    assert not sparse_results['operator_cache']['hit']
+    np.testing.assert_allclose(x_sparse, x_dense, atol=1e-9)
+    # Y en el otro orden
+    assert solve(gaussSeidel_method, S, b, x0)[0]['operator_cache']['hit']
+    assert solve(gaussSeidel_method, A, b, x0)[0]['operator_cache']['hit']
+
+
+def test_sparse_key_is_canonical():
+    # Índices desordenados o duplicados no cambian la huella
+    A, _, _ = system(6)
+    S = sparse.csr_matrix(A)
+    coo = sparse.coo_matrix(A)
+    rows = np.concatenate([coo.row, [0]])
+    cols = np.concatenate([coo.col, [0]])
+    data = np.concatenate([coo.data - np.where((coo.row == 0) & (coo.col == 0), 1.0, 0.0), [1.0]])
+    duplicated = sparse.csr_matrix((data, (rows, cols)), shape=A.shape)
+    assert matrix_key(duplicated) == matrix_key(S)
@@ -0,0 +1,82 @@
+import sys
+sys.path.append('.')
+
+import math
+
+import numpy as np
+
+from methods.cap1.PuntoFijo import fixed_point_method, delta_squared
+from methods.expression_cache import get_function
+
+F = 'x**3 - x - 2'
+G = 'x - 0.001*(x**3 - x - 2)'
+
+
+def f(x):
+    return x ** 3 - x - 2
+
+
+def g(x):
+    return x - 0.001 * (x ** 3 - x - 2)
+
+
+def reference_table(x0, tol, max_count):
+    # Iteración de punto fijo como la hacía el método antes de la aceleración,
+    # con las mismas funciones compiladas para comparar valores exactos
+    f, g = get_function(F), get_function(G)
+    rows = [(0, x0, g(x0), f(x0), math.nan)]
+    err, fx, count = tol + 1, f(x0), 0
+    while err > tol and fx != 0 and count < max_count:
+        x_next = g(x0)
+        err = abs(x_next - x0)
+        fx = f(x_next)
+        count += 1
+        x0 = x_next
+        rows.append((count, x0, g(x0), fx, err))
+    return np.array(rows)
+
+
+def test_none_matches_plain_iteration():
+    results = fixed_point_method(F, G, 1.5, 1e-10, 5000)
+    columns = results['iterations'].columns()
+    table = np.column_stack([columns['iteration'], columns['x'], columns['g(x)'], columns['f(x)'], columns['error']])
+    expected = reference_table(1.5, 1e-10, 5000)
+    assert table.shape == expected.shape
+    np.testing.assert_array_equal(table, expected)
+    # Un g por iteración (más el de x0)
+    count = len(expected) - 1
+    assert results['evaluations']['g'] == count + 1
+
+
+def test_steffensen_converges_quadratically():
+    plain = fixed_point_method(F, G, 1.5, 1e-10, 5000)
+    results = fixed_point_method(F, G, 1.5, 1e-10, 5000, acceleration='steffensen')
+    count = results['iterations'].total - 1
+    assert count <= 5 < plain['iterations'].total - 1
+    # Dos g por iteración (más el de x0)
+    assert results['evaluations']['g'] == 2 * count + 1
+    x = results['iterations'].columns()['x'][-1]
+    assert abs(f(x)) < 1e-9
+    # Los errores caen cuadráticamente
+    errors = results['iterations'].columns()['error'][1:]
+    assert errors[-1] < errors[-2] ** 1.5
+
+
+def test_aitken_extrapolates_plain_sequence():
+    results = fixed_point_method(F, G, 1.5, 1e-10, 5000, acceleration='aitken')
+    x = results['iterations'].columns()['x']
+    sequence = [1.5, g(1.5), g(g(1.5))]
+    assert math.isclose(x[1], delta_squared(*sequence), rel_tol=1e-9)
+    assert results['evaluations']['g'] == results['iterations'].total
+    assert abs(f(x[-1])) < 1e-6
+
+
+def test_delta_squared():
+    # Sucesión geométrica: Aitken da el límite exacto
+    assert math.isclose(delta_squared(2.0, 1.5, 1.25), 1.0)
+    assert delta_squared(1.0, 1.0, 1.0) is None
+
+
+def test_invalid_acceleration():
+    results = fixed_point_method(F, G, 1.5, 1e-10, 50, acceleration='newton')
+    assert results['conclusion'].startswith('Invalid acceleration')
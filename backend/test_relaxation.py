@@ -0,0 +1,64 @@
+import sys
+sys.path.append('.')
+
+import numpy as np
+from scipy.linalg import solve_triangular
+
+from methods.cap2.relaxation import choose_omega, sor_splitting
+from methods.cap2.Sor import sor_method
+
+
+def poisson_1d(n):
+    return 2 * np.eye(n) - np.eye(n, k=1) - np.eye(n, k=-1)
+
+
+def exact_radius(A, omega):
+    M, N = sor_splitting(A, omega)
+    return max(abs(np.linalg.eigvals(solve_triangular(M, N, lower=True))))
+
+
+def test_young_omega_matches_brute_force():
+    # Poisson 1D es consistentemente ordenada: el óptimo es el de Young
+    A = poisson_1d(30)
+    choice = choose_omega(A)
+    assert choice['method'] == 'young'
+    assert abs(choice['jacobi_spectral_radius'] - np.cos(np.pi / 31)) < 1e-10
+
+    omegas = np.linspace(1.0, 1.99, 199)
+    radii = [exact_radius(A, omega) for omega in omegas]
+    best = omegas[int(np.argmin(radii))]
+    assert abs(choice['value'] - best) <= omegas[1] - omegas[0]
+    assert exact_radius(A, choice['value']) <= min(radii) + 1e-6
+
+
+def test_auto_omega_iterations_near_best_of_sweep():
+    A = poisson_1d(30)
+    b = np.ones(30)
+    x0 = np.zeros(30)
+    auto = sor_method(A, b, x0, 1e-8, 10000, 2, 'auto', history='summary')
+    counts = [sor_method(A, b, x0, 1e-8, 10000, 2, omega, history='summary')['iterations'].total - 1
+              for omega in np.linspace(1.0, 1.95, 20)]
+    assert auto['iterations'].total - 1 <= min(counts)
+
+
+def test_search_when_jacobi_diverges():
+    # Jacobi diverge (rho_J > 1) pero SOR con omega < 1 converge: se usa la búsqueda
+    rng = np.random.default_rng(1)
+    B = rng.random((40, 40))
+    A = B + B.T + np.diag(np.full(40, 30.0))
+    choice = choose_omega(A)
+    assert choice['jacobi_spectral_radius'] > 1
+    assert choice['method'] == 'search'
+    assert exact_radius(A, choice['value']) < 1
+
+
+def test_sweep_reports_best_omega():
+    from methods.cap2.Sor import sor_sweep
+
+    A = poisson_1d(30)
+    result = sor_sweep(A, np.ones(30), np.zeros(30), 1e-8, 10000, 2, [1.0, 1.5, 'auto'], workers=2)
+    rows = result['sweep']
+    assert [row['omega'] for row in rows][:2] == [1.0, 1.5]
+    assert all(row['converged'] for row in rows)
+    assert result['best'] == min(rows, key=lambda row: row['iterations'])
+    assert result['best']['omega'] == result['estimate']['value']
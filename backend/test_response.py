@@ -0,0 +1,37 @@
+import sys
+sys.path.append('.')
+
+import json
+
+import numpy as np
+import pytest
+
+from methods import response
+
+NAN = float('nan')
+INF = float('inf')
+PAYLOAD = {'a': NAN, 'c': [INF, 1.5], 'd': (np.array([NAN, 2.0]), np.float64(-INF)), 'e': np.array([[1, 2]])}
+EXPECTED = {'a': None, 'c': [None, 1.5], 'd': [[None, 2.0], None], 'e': [[1, 2]]}
+
+
+def test_encode_non_finite_as_null():
+    assert json.loads(response.encode(PAYLOAD)) == EXPECTED
+
+
+def test_fallback_encoder_matches(monkeypatch):
+    # Sin orjson: json estándar, también con NaN/inf como null (JSON válido)
+    monkeypatch.setattr(response, 'orjson', None)
+    body = response.encode(PAYLOAD)
+    assert b'NaN' not in body and b'Infinity' not in body
+    assert json.loads(body) == EXPECTED
+
+
+@pytest.mark.skipif(response.brotli is None, reason="brotli no está instalado")
+def test_brotli_negotiation():
+    import brotli
+    from main import app
+
+    body = {'function_text': 'x**2 - 2', 'a': 0, 'b': 2, 'tol': 1e-12, 'max_count': 100}
+    reply = app.test_client().post('/calculate/bisection', json=body, headers={'Accept-Encoding': 'gzip, br'})
+    assert reply.headers['Content-Encoding'] == 'br'
+    assert 'result' in json.loads(brotli.decompress(reply.data))
@@ -0,0 +1,50 @@
+import sys
+sys.path.append('.')
+
+import math
+
+from methods.expression_cache import get_derivatives
+
+
+def test_piecewise_derivative_is_real():
+    # Con x real, Abs(x) se deriva a sign(x) y no a expresiones con re(x), im(x)
+    f, texts = get_derivatives('Abs(x) - 1', 1)
+    assert texts == ['sign(x)']
+    assert f(-3.0) == [2.0, -1.0]
+    assert f(2.0) == [1.0, 1.0]
+
+
+def test_smooth_derivatives_unchanged():
+    f, texts = get_derivatives('x**3 - exp(-x)', 2)
+    assert texts == ['3*x**2 + exp(-x)', '6*x - exp(-x)']
+    value, first, second = f(1.0)
+    assert math.isclose(first, 3 + math.exp(-1))
+    assert math.isclose(second, 6 - math.exp(-1))
+
+
+def test_simple_expressions_match_lambdify():
+    # Lo que se compila sin SymPy mientras arranca el grupo da la misma función
+    from methods.expression_cache import _compile_simple, get_function
+
+    for text in ('x**3 - x - 2', 'x - 0.001*(x**3 - x - 2)', 'exp(-x) - sin(x)/3', 'log(x) + x**-2',
+                 'sqrt(x) - cos(2*x)'):
+        simple, compiled = _compile_simple(text, 'math'), get_function(text)
+        for x in (0.5, 1.0, 1.7, 3.2):
+            assert math.isclose(simple(x), compiled(x), rel_tol=1e-12)
+
+
+def test_simple_expressions_rejected():
+    from methods.expression_cache import _compile_simple
+
+    for text in ('x**(1/2)', 'Abs(x)', 'y + 1', 'log(x, 2)', 'pi*x', '2x', "__import__('os')", 'x' * 300):
+        assert _compile_simple(text, 'math') is None
+
+
+def test_simple_function_not_cached_while_booting(monkeypatch):
+    from methods import expression_cache
+
+    monkeypatch.setattr(expression_cache, 'pool_booting', lambda: True)
+    entries = expression_cache.cache_stats()['functions']['entries']
+    f = expression_cache.get_function('x**2 - 7*x')
+    assert f(2.0) == -10.0
+    assert expression_cache.cache_stats()['functions']['entries'] == entries
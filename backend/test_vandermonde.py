@@ -0,0 +1,31 @@
+import sys
+sys.path.append('.')
+
+import numpy as np
+
+from methods.cap3.Vandermonde import bjorck_pereyra, vandermonde_interpolation
+
+
+def test_bjorck_pereyra_matches_dense_solve():
+    # Coeficientes menor grado primero, como V a = y con V[i, j] = x_i^j
+    rng = np.random.default_rng(1)
+    x = np.sort(rng.uniform(-1, 1, 9))
+    y = rng.standard_normal(9)
+    V = np.vander(x, increasing=True)
+    np.testing.assert_allclose(bjorck_pereyra(x, y), np.linalg.solve(V, y), rtol=1e-8, atol=1e-10)
+
+
+def test_bjorck_pereyra_several_right_hand_sides():
+    x = np.array([-2.0, -0.5, 0.3, 1.0, 2.5])
+    Y = np.column_stack([np.cos(x), x ** 3 - x, np.ones_like(x)])
+    V = np.vander(x, increasing=True)
+    np.testing.assert_allclose(bjorck_pereyra(x, Y), np.linalg.solve(V, Y), rtol=1e-9, atol=1e-12)
+
+
+def test_solvers_agree_in_route_function():
+    x = [0, 1, 2, 3]
+    y = [1, 2, 5, 10]
+    fast = vandermonde_interpolation(x, y, solver='bjorck_pereyra', plot=False)
+    dense = vandermonde_interpolation(x, y, solver='dense', plot=False)
+    assert fast['success'] and dense['success']
+    np.testing.assert_allclose(fast['polynomial'], dense['polynomial'], atol=1e-12)